@@ -3,20 +3,224 @@ import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
 import numpy as np
-from itertools import combinations
-from collections import Counter
-from datetime import datetime
-
-# URL del CSV en GitHub
-DATA_URL = "https://raw.githubusercontent.com/BayaslianSantiago/streamlit-dashboard/refs/heads/main/datos.csv"
+from datetime import date, datetime
+from src import bcg_matrix, data_processing, market_basket, picadas, pronosticos, visualizations
 
 @st.cache_data(ttl=3600)
 def cargar_datos():
-    """Carga los datos desde GitHub y prepara columnas temporales"""
-    df = pd.read_csv(DATA_URL)
-    df['fecha_hora'] = pd.to_datetime(df['fecha_hora'])
-    df = df.sort_values('fecha_hora').reset_index(drop=True)
-    return df
+    """Carga los datos desde GitHub (vía snapshot local) y devuelve (df, version)"""
+    return data_processing.cargar_datos()
+
+@st.cache_resource(max_entries=2)
+def cargar_cubo(version_datos):
+    """
+    Cubo de ventas (fecha, media hora, producto) con columnas de calendario.
+    Se mantiene incrementalmente junto al snapshot y lo comparten todas las pestañas.
+    """
+    return data_processing.preparar_cubo(data_processing.leer_cubo_ventas())
+
+@st.cache_resource(max_entries=2)
+def preparar_datos_temporales(version_datos, _df):
+    """
+    Etapa cacheada de enriquecimiento temporal, compartida entre sesiones.
+    La clave es la versión de los datos; el frame devuelto no se modifica.
+    """
+    return data_processing.preparar_columnas_temporales(_df)
+
+@st.cache_resource(max_entries=2)
+def cargar_dimension_productos(version_datos, _productos):
+    """Atributos por producto (tipo, tamaño, familia, precio), una fila por nombre distinto"""
+    return data_processing.construir_dimension_productos(_productos)
+
+@st.cache_resource
+def cargar_cache_figuras():
+    """Figuras ya armadas, compartidas entre sesiones (LRU con tope de memoria)"""
+    return visualizations.CacheFiguras()
+
+@st.cache_resource(max_entries=2)
+def construir_acumulados_diarios(version_datos, _cubo):
+    """Sumas acumuladas por día (total, por producto y de las picadas) para consultar cualquier rango de fechas"""
+    return data_processing.AcumuladosDiarios(_cubo, grupos={'picadas': picadas.PRODUCTOS_PICADAS})
+
+@st.cache_resource(max_entries=4)
+def construir_indice_periodos(version_datos, columna, _df):
+    """Índice (año, mes) -> rango de filas sobre un frame ordenado por `columna`"""
+    return data_processing.IndicePeriodos(_df[columna])
+
+@st.cache_data
+def calcular_reporte_memoria(version_datos, _df):
+    """Memoria por columna del esquema compacto frente al esquema anterior"""
+    return data_processing.reporte_memoria(_df)
+
+@st.cache_resource(max_entries=4)
+def cargar_historial_bcg(version_datos, umbral, _cubo):
+    """
+    Clasificación BCG de todos los meses, persistida en disco. Al llegar datos
+    nuevos solo se recalculan los meses que cambiaron.
+    """
+    cantidades, presencia = bcg_matrix.ventas_por_mes(_cubo)
+    return bcg_matrix.cargar_historial_bcg(cantidades, presencia, data_processing.CACHE_DIR, umbral)
+
+@st.cache_data(max_entries=16)
+def calcular_datos_bcg(version_datos, periodo, _cubo, _cubo_periodo, mes=None, fecha_mitad=None, umbral='mediana'):
+    """
+    Clasificación BCG del período; la comparten Análisis de Productos y Búsqueda Detallada.
+    Un mes se busca en el historial precalculado; sin mes se compara la primera
+    mitad del período contra la segunda (corte en fecha_mitad).
+    """
+    if mes is not None:
+        historial = cargar_historial_bcg(version_datos, umbral, _cubo)
+        bcg_data = historial[historial['mes'] == mes].drop(columns='mes').reset_index(drop=True)
+        return (bcg_data,
+                bcg_matrix.calcular_umbral(bcg_data['participacion'], umbral),
+                bcg_matrix.calcular_umbral(bcg_data['tasa_crecimiento'], umbral))
+    
+    inicio_franja = _cubo_periodo['fecha'] + pd.to_timedelta(_cubo_periodo['media_hora'], unit='h')
+    corte = inicio_franja.searchsorted(fecha_mitad, side='left')
+    
+    matriz = bcg_matrix.calcular_matriz_bcg(
+        _cubo_periodo.groupby('producto', observed=True)['cantidad'].sum(),
+        _cubo_periodo.iloc[:corte].groupby('producto', observed=True)['cantidad'].sum(),
+        _cubo_periodo.iloc[corte:].groupby('producto', observed=True)['cantidad'].sum(),
+        umbral_participacion=umbral,
+        umbral_crecimiento=umbral
+    )
+    return matriz.datos, matriz.umbral_participacion, matriz.umbral_crecimiento
+
+@st.cache_resource(max_entries=4)
+def canastas_por_mes(version_datos, excluidos, brecha):
+    """Canastas ya minadas de cada mes, por (año, mes); se completa a demanda y la comparten las sesiones"""
+    return market_basket.AlmacenParticiones()
+
+@st.cache_resource(max_entries=8)
+def calcular_canastas(version_datos, periodo, excluidos, brecha, meses, _df, _indice, desde=None, hasta=None):
+    """
+    Canastas del período [desde, hasta) como matriz dispersa transacción × producto,
+    el índice de co-ocurrencias Xᵀ·X de las transacciones con más de un producto
+    y la hora de inicio de cada transacción. Una transacción agrupa los renglones
+    separados por a lo sumo `brecha` segundos.
+    
+    Solo se minan (en paralelo) los meses completos que no están en canastas_por_mes
+    y los tramos de los meses que el rango corta, que no se guardan; el período se
+    arma combinando las particiones.
+    """
+    catalogo = pd.Index(_df['producto'].cat.categories)
+    minados = canastas_por_mes(version_datos, excluidos, brecha)
+    
+    def columnas(df_tramo):
+        df_tramo = df_tramo[~df_tramo['producto'].isin(excluidos)]
+        return df_tramo['fecha_hora'].to_numpy(), df_tramo['producto'].to_numpy(dtype=object)
+    
+    tramos = {}
+    for año, mes in meses:
+        inicio = pd.Timestamp(year=año, month=mes, day=1)
+        fin = inicio + pd.offsets.MonthBegin()
+        if (desde is not None and desde > inicio) or (hasta is not None and hasta < fin):
+            tramos[(año, mes)] = columnas(_indice.recortar(_df, max(desde or inicio, inicio), min(hasta or fin, fin)))
+    completos = [clave for clave in meses if clave not in tramos]
+    pendientes = {clave: columnas(_indice.mes(_df, *clave)) for clave in minados.faltantes(completos)}
+    minadas = market_basket.minar_particiones({**pendientes, **tramos}, catalogo, brecha)
+    minados.agregar({clave: minadas[clave] for clave in pendientes})
+    particiones = dict(zip(completos, minados.obtener(completos)))
+    particiones.update({clave: minadas[clave] for clave in tramos})
+    combinado = market_basket.combinar_particiones([particiones[clave] for clave in meses], catalogo)
+    indice = market_basket.IndiceCoocurrencias(combinado.coocurrencia, catalogo)
+    return combinado.canastas, indice, combinado.horas
+
+@st.cache_resource(max_entries=16)
+def calcular_itemsets(version_datos, periodo, excluidos, brecha, soporte_minimo, tamaño_maximo, _canastas, _filas):
+    """Conjuntos frecuentes (Eclat) sobre las canastas seleccionadas por _filas"""
+    return market_basket.itemsets_frecuentes(_canastas, soporte_minimo, tamaño_maximo, filas=_filas)
+
+@st.cache_resource(max_entries=16)
+def calcular_reglas(version_datos, periodo, excluidos, brecha, soporte_minimo, tamaño_maximo, _itemsets, total):
+    """Reglas de asociación con sus métricas; ordenar y filtrar no las recalcula"""
+    return market_basket.reglas_asociacion(_itemsets, total)
+
+@st.cache_resource(max_entries=8)
+def calcular_pares_aproximados(version_datos, periodo, excluidos, brecha, capacidad, _canastas, _filas):
+    """Top 20 pares con el resumen de memoria fija y su cota de error"""
+    return market_basket.top_pares_aproximados(_canastas, k=20, capacidad=capacidad, filas=_filas)
+
+@st.cache_resource(max_entries=8)
+def construir_recomendador(version_datos, periodo, excluidos, brecha, metodo, _indice, total):
+    """Recomendador producto → producto del período (similitud precalculada y truncada)"""
+    return market_basket.RecomendadorProductos(_indice.coocurrencia, _indice.productos, total, metodo=metodo)
+
+@st.cache_resource(max_entries=2)
+def construir_pronosticador_picadas(version_datos, productos, _ventas):
+    """Matriz de tasas producto × día de la semana de las picadas"""
+    return pronosticos.PronosticadorPicadas(_ventas, productos)
+
+@st.cache_resource(max_entries=2)
+def calcular_resumen_picadas(version_datos, productos, _ventas, _dimension):
+    """Agregados de picadas (producto, tipo, tamaño, día, hora, fecha) en una pasada"""
+    return picadas.ResumenPicadas(_ventas, _dimension)
+
+@st.cache_resource(max_entries=4)
+def construir_pronostico_franjas(version_datos, semanas_historia, brecha, _df):
+    """
+    Demanda por día de la semana × media hora desde las últimas semanas de datos.
+    Las transacciones se arman con market_basket.sesionizar y la misma ventana
+    (`brecha` segundos) que el Análisis de Canastas, pero sobre todos los
+    renglones: para los turnos cuenta cualquier cliente, aunque solo lleve
+    productos excluidos de las canastas.
+    """
+    transacciones = market_basket.sesionizar(_df['fecha_hora'], brecha)
+    fechas, valores = pronosticos.matriz_franjas(_df['fecha_hora'], _df['cantidad'], transacciones)
+    return pronosticos.PronosticoFranjas(fechas, valores, semanas_historia)
+
+@st.cache_resource(max_entries=2)
+def calcular_series_picadas(version_datos, productos, _ventas):
+    """Serie diaria de unidades de cada picada (días contiguos con ceros)"""
+    return pronosticos.series_diarias(_ventas, productos)
+
+def _guardar_control(clave):
+    st.session_state[clave] = st.session_state[f"_{clave}"]
+
+def _admite(valor, argumentos):
+    """Si un valor guardado sigue siendo válido para las opciones o los límites actuales del widget"""
+    if 'options' in argumentos:
+        return valor in list(argumentos['options'])
+    comparable = lambda v: pd.Timestamp(v) if isinstance(v, date) else v
+    minimo, maximo = argumentos.get('min_value'), argumentos.get('max_value')
+    return all((minimo is None or comparable(v) >= comparable(minimo)) and
+               (maximo is None or comparable(v) <= comparable(maximo))
+               for v in (valor if isinstance(valor, tuple) else (valor,)))
+
+def control(widget, etiqueta, clave, **argumentos):
+    """
+    Dibuja un widget cuyo valor sobrevive a los cambios de pestaña. Las pestañas
+    perezosas no dibujan los widgets de las pestañas cerradas y Streamlit descarta
+    su estado, así que el valor se guarda aparte en st.session_state[clave]: el
+    widget (key "_clave") parte de ese valor y lo actualiza en on_change. value o
+    index son el valor inicial, que se usa también si el guardado ya no es válido.
+    """
+    guardado = st.session_state.get(clave)
+    if guardado is not None and _admite(guardado, argumentos):
+        if 'options' in argumentos and widget is not st.select_slider:
+            argumentos['index'] = list(argumentos['options']).index(guardado)
+        else:
+            argumentos['value'] = guardado
+    return widget(etiqueta, key=f"_{clave}", on_change=_guardar_control, args=(clave,), **argumentos)
+
+def serie_para_grafico(ventas_tiempo, clave):
+    """
+    Serie diaria (fecha, cantidad) lista para graficar. Si tiene más puntos de
+    los que entran en el ancho del gráfico se reduce con LTTB, y un slider
+    acota el rango: al acercarse vuelven a verse todos los días.
+    """
+    puntos = visualizations.maximo_puntos()
+    if len(ventas_tiempo) <= puntos:
+        return ventas_tiempo
+    primera, ultima = ventas_tiempo['fecha'].iloc[0].date(), ventas_tiempo['fecha'].iloc[-1].date()
+    desde, hasta = control(st.slider, "Rango visible:", clave, min_value=primera, max_value=ultima,
+                           value=(primera, ultima), format="DD/MM/YYYY")
+    visibles = ventas_tiempo[ventas_tiempo['fecha'].between(pd.Timestamp(desde), pd.Timestamp(hasta))]
+    reducida = visualizations.reducir_serie(visibles, 'fecha', 'cantidad', puntos)
+    if len(reducida) < len(visibles):
+        st.caption(f"Se muestran {len(reducida):,} de {len(visibles):,} días; acota el rango para ver todos los puntos")
+    return reducida
 
 # --- INTERFAZ STREAMLIT ---
 st.set_page_config(page_title="Análisis Fiambrería", page_icon="📊", layout="wide")
@@ -24,7 +228,7 @@ st.title("📊 Dashboard de Ventas - Fiambrería")
 
 # Cargar datos automáticamente
 try:
-    df_limpio = cargar_datos()
+    df_limpio, version_datos = cargar_datos()
     
     # Mostrar info básica
     col1, col2, col3 = st.columns(3)
@@ -42,17 +246,13 @@ try:
     # --- SELECTOR DE MES ---
     st.subheader("🔍 Selecciona el período a analizar")
     
-    # Preparar datos temporales
-    df_temp = df_limpio.copy()
-    df_temp['hora_num'] = df_temp['fecha_hora'].dt.hour
-    df_temp['minuto'] = df_temp['fecha_hora'].dt.minute
-    df_temp['media_hora'] = df_temp['hora_num'] + (df_temp['minuto'] >= 30).astype(int) * 0.5
-    df_temp['dia_semana'] = df_temp['fecha_hora'].dt.day_name()
-    df_temp['mes_num'] = df_temp['fecha_hora'].dt.month
-    df_temp['año'] = df_temp['fecha_hora'].dt.year
-    df_temp['semana_del_mes'] = ((df_temp['fecha_hora'].dt.day - 1) // 7) + 1
-    df_temp['fecha'] = df_temp['fecha_hora'].dt.date
-    df_temp['dia_mes'] = df_temp['fecha_hora'].dt.day
+    # Preparar datos temporales (tipos compactos: día de la semana como 0-6)
+    df_temp = preparar_datos_temporales(version_datos, df_limpio)
+    indice_periodos = construir_indice_periodos(version_datos, 'fecha_hora', df_temp)
+    cubo = cargar_cubo(version_datos)
+    indice_cubo = construir_indice_periodos(version_datos, 'fecha', cubo)
+    acumulados = construir_acumulados_diarios(version_datos, cubo)
+    figuras = cargar_cache_figuras()
     
     # Diccionario de meses
     meses_español = {
@@ -62,18 +262,18 @@ try:
     }
     
     dias_español = {
-        'Monday': 'Lunes', 'Tuesday': 'Martes', 'Wednesday': 'Miércoles', 
-        'Thursday': 'Jueves', 'Friday': 'Viernes', 'Saturday': 'Sábado', 'Sunday': 'Domingo'
+        0: 'Lunes', 1: 'Martes', 2: 'Miércoles', 
+        3: 'Jueves', 4: 'Viernes', 5: 'Sábado', 6: 'Domingo'
     }
     
-    dias_orden = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+    dias_orden = list(dias_español)
     
     # Obtener meses disponibles con datos
-    meses_con_datos = df_temp.groupby(['año', 'mes_num'])['cantidad'].sum()
+    meses_con_datos = cubo.groupby(['año', 'mes_num'])['cantidad'].sum()
     meses_con_datos = meses_con_datos[meses_con_datos > 0].reset_index()
     
     # Crear opciones de selección
-    meses_opciones = ['📊 Todos los datos']
+    meses_opciones = ['📊 Todos los datos', '📆 Rango de fechas']
     for _, row in meses_con_datos.iterrows():
         mes_nombre = meses_español[row['mes_num']]
         año = int(row['año'])
@@ -85,28 +285,77 @@ try:
         help="Selecciona un mes específico o analiza todos los datos juntos"
     )
     
-    # Filtrar datos según selección
+    # Filtrar datos según selección; [desde_sel, hasta_sel) delimita el período
+    desde_sel, hasta_sel = None, None
+    clave_periodo = periodo_seleccionado
     if periodo_seleccionado == '📊 Todos los datos':
-        df_analisis = df_temp.copy()
+        df_analisis = df_temp
+        cubo_analisis = cubo
         titulo_periodo = "Todo el período"
         mes_num_sel = None
         año_sel = None
+    elif periodo_seleccionado == '📆 Rango de fechas':
+        primera_fecha, ultima_fecha = cubo['fecha'].iloc[0].date(), cubo['fecha'].iloc[-1].date()
+        rango_sel = st.date_input(
+            "Rango de fechas:",
+            value=(primera_fecha, ultima_fecha),
+            min_value=primera_fecha,
+            max_value=ultima_fecha,
+            format="DD/MM/YYYY",
+            key="rango_fechas"
+        )
+        # Mientras se elige la segunda fecha el rango tiene un solo día
+        inicio_rango, fin_rango = (rango_sel[0], rango_sel[-1]) if rango_sel else (primera_fecha, ultima_fecha)
+        desde_sel, hasta_sel = pd.Timestamp(inicio_rango), pd.Timestamp(fin_rango) + pd.Timedelta(days=1)
+        
+        df_analisis = indice_periodos.recortar(df_temp, desde_sel, hasta_sel)
+        cubo_analisis = indice_cubo.recortar(cubo, desde_sel, hasta_sel)
+        titulo_periodo = f"{inicio_rango:%d/%m/%Y} - {fin_rango:%d/%m/%Y}"
+        clave_periodo = f"{inicio_rango} - {fin_rango}"
+        mes_num_sel = None
+        año_sel = None
     else:
         partes = periodo_seleccionado.split()
         mes_nombre = partes[0]
         año_sel = int(partes[1])
         mes_num_sel = [k for k, v in meses_español.items() if v == mes_nombre][0]
         
-        df_analisis = df_temp[(df_temp['mes_num'] == mes_num_sel) & (df_temp['año'] == año_sel)].copy()
+        df_analisis = indice_periodos.mes(df_temp, año_sel, mes_num_sel)
+        cubo_analisis = indice_cubo.mes(cubo, año_sel, mes_num_sel)
         titulo_periodo = periodo_seleccionado
+        desde_sel = pd.Timestamp(year=año_sel, month=mes_num_sel, day=1)
+        hasta_sel = desde_sel + pd.offsets.MonthBegin()
     
     st.info(f"📋 Analizando **{len(df_analisis):,} registros** del período: **{titulo_periodo}**")
     
+    with st.expander("💾 Ver Uso de Memoria del Dataset", expanded=False):
+        if st.checkbox("Calcular reporte de memoria", key="check_reporte_memoria"):
+            reporte = calcular_reporte_memoria(version_datos, df_temp)
+            total = reporte.iloc[-1]
+            st.caption(f"Esquema compacto: {total['Ahora (bytes)'] / 1e6:.1f} MB "
+                       f"(antes {total['Antes (bytes)'] / 1e6:.1f} MB, -{total['Reducción (%)']}%)")
+            st.dataframe(reporte, use_container_width=True, hide_index=True)
+    
     st.divider()
     
+    # Períodos a comparar para la tasa de crecimiento (BCG)
+    if mes_num_sel is None:
+        fecha_mitad = None
+        if not df_analisis.empty:
+            fecha_min = df_analisis['fecha_hora'].iloc[0]
+            fecha_mitad = fecha_min + (df_analisis['fecha_hora'].iloc[-1] - fecha_min) / 2
+        mes_bcg = None
+        periodo_comparacion = "Primera mitad vs Segunda mitad"
+    else:
+        fecha_mitad = None
+        mes_bcg = pd.Period(year=año_sel, month=mes_num_sel, freq='M')
+        mes_anterior = mes_bcg - 1
+        periodo_comparacion = f"{meses_español[mes_anterior.month]} {mes_anterior.year} vs {titulo_periodo}"
+    
     # --- TABS PRINCIPALES ---
     if not df_analisis.empty:
         
+        # Pestañas con estado: solo se ejecuta el contenido de la pestaña abierta
         tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
             "📈 Resumen General", 
             "🔥 Análisis de Horarios", 
@@ -114,1700 +363,2077 @@ try:
             "🔍 Búsqueda Detallada",
             "🛒 Análisis de Canastas",
             "🎉 Fechas Especiales"
-        ])
+        ], key="tabs_principal", on_change="rerun")
         
         # ========== TAB 1: RESUMEN GENERAL ==========
-        with tab1:
-            st.markdown("### 📊 Métricas Principales")
-            
-            # Métricas clave
-            ventas_hora_dia = df_analisis.groupby(['dia_semana', 'hora_num'])['cantidad'].sum().reset_index()
-            idx_max = ventas_hora_dia['cantidad'].idxmax()
-            hora_pico = int(ventas_hora_dia.loc[idx_max, 'hora_num'])
-            dia_pico = dias_español[ventas_hora_dia.loc[idx_max, 'dia_semana']]
-            cantidad_pico = int(ventas_hora_dia.loc[idx_max, 'cantidad'])
-            total_vendido = df_analisis['cantidad'].sum()
-            
-            col1, col2, col3, col4 = st.columns(4)
-            with col1:
-                st.metric("🕐 Hora Pico", f"{hora_pico}:00 hs", help="Hora con más ventas")
-            with col2:
-                st.metric("📅 Día Pico", dia_pico, help="Día con más ventas")
-            with col3:
-                st.metric("🔥 Ventas en Pico", f"{cantidad_pico} unidades", help="Cantidad vendida en el momento pico")
-            with col4:
-                st.metric("📦 Total Vendido", f"{int(total_vendido):,} unidades", help="Total de unidades en el período")
-            
-            st.divider()
-            
-            # Gráfico de ventas por día
-            st.markdown("### 📅 Ventas por Día de la Semana")
-            ventas_por_dia = df_analisis.groupby('dia_semana')['cantidad'].sum().reset_index()
-            ventas_por_dia['dia_español'] = ventas_por_dia['dia_semana'].map(dias_español)
-            ventas_por_dia = ventas_por_dia.set_index('dia_semana').reindex(dias_orden).reset_index()
-            
-            fig_dias = go.Figure(data=[
-                go.Bar(
-                    x=[dias_español[d] for d in ventas_por_dia['dia_semana']],
-                    y=ventas_por_dia['cantidad'],
-                    marker_color='#1E90FF',
-                    text=ventas_por_dia['cantidad'],
-                    textposition='auto'
-                )
-            ])
-            fig_dias.update_layout(
-                height=400,
-                xaxis_title="Día de la Semana",
-                yaxis_title="Unidades Vendidas",
-                showlegend=False
-            )
-            st.plotly_chart(fig_dias, use_container_width=True)
-            
-            # Gráfico de ventas por hora
-            st.markdown("### 🕐 Ventas por Hora del Día")
-            ventas_por_hora = df_analisis.groupby('hora_num')['cantidad'].sum().reset_index()
-            
-            fig_horas = go.Figure(data=[
-                go.Scatter(
-                    x=ventas_por_hora['hora_num'],
-                    y=ventas_por_hora['cantidad'],
-                    mode='lines+markers',
-                    line=dict(color='#32CD32', width=3),
-                    marker=dict(size=8),
-                    fill='tozeroy',
-                    fillcolor='rgba(50,205,50,0.2)'
-                )
-            ])
-            fig_horas.update_layout(
-                height=400,
-                xaxis_title="Hora del Día",
-                yaxis_title="Unidades Vendidas",
-                showlegend=False,
-                xaxis=dict(dtick=2)
-            )
-            st.plotly_chart(fig_horas, use_container_width=True)
-        
-        # ========== TAB 2: ANÁLISIS DE HORARIOS ==========
-        with tab2:
-            st.markdown("### 🔥 Heatmap de Ventas por Media Hora")
-            st.caption("Intensidad de ventas por día de la semana cada 30 minutos")
-            
-            # Crear matriz por media hora
-            ventas_media_hora = df_analisis.groupby(['dia_semana', 'media_hora'])['cantidad'].sum().reset_index()
-            ventas_matriz_mh = ventas_media_hora.pivot(index='dia_semana', columns='media_hora', values='cantidad').fillna(0)
-            
-            # Reordenar y traducir
-            ventas_matriz_mh = ventas_matriz_mh.reindex([d for d in dias_orden if d in ventas_matriz_mh.index])
-            ventas_matriz_mh.index = [dias_español[d] for d in ventas_matriz_mh.index]
-            
-            # Crear etiquetas para el eje X
-            etiquetas_horas = [f"{int(h)}:{('00' if h % 1 == 0 else '30')}" for h in ventas_matriz_mh.columns]
-            
-            fig_heatmap_mh = go.Figure(data=go.Heatmap(
-                z=ventas_matriz_mh.values,
-                x=etiquetas_horas,
-                y=ventas_matriz_mh.index,
-                colorscale='YlOrRd',
-                text=ventas_matriz_mh.values.astype(int),
-                texttemplate='%{text}',
-                textfont={"size": 9},
-                colorbar=dict(title="Unidades<br>vendidas")
-            ))
-            
-            fig_heatmap_mh.update_layout(
-                xaxis_title="Hora del Día",
-                yaxis_title="Día de la Semana",
-                height=500,
-                xaxis=dict(tickangle=-45)
-            )
-            
-            st.plotly_chart(fig_heatmap_mh, use_container_width=True)
-            
-            # Heatmap por semana del mes (solo si es un mes específico)
-            if mes_num_sel is not None:
-                with st.expander("📅 Ver Heatmap por Semana del Mes", expanded=False):
-                    st.caption("Intensidad de ventas por semana y día de la semana")
-                    
-                    ventas_semana = df_analisis.groupby(['semana_del_mes', 'dia_semana'])['cantidad'].sum().reset_index()
-                    ventas_matriz_sem = ventas_semana.pivot(index='semana_del_mes', columns='dia_semana', values='cantidad').fillna(0)
-                    
-                    # Reordenar columnas por día de la semana
-                    dias_disponibles = [d for d in dias_orden if d in ventas_matriz_sem.columns]
-                    ventas_matriz_sem = ventas_matriz_sem[dias_disponibles]
-                    ventas_matriz_sem.columns = [dias_español[d] for d in ventas_matriz_sem.columns]
-                    
-                    # Renombrar índice
-                    ventas_matriz_sem.index = [f"Semana {int(s)}" for s in ventas_matriz_sem.index]
-                    
-                    fig_heatmap_sem = go.Figure(data=go.Heatmap(
-                        z=ventas_matriz_sem.values,
-                        x=ventas_matriz_sem.columns,
-                        y=ventas_matriz_sem.index,
-                        colorscale='Viridis',
-                        text=ventas_matriz_sem.values.astype(int),
-                        texttemplate='%{text}',
-                        textfont={"size": 12},
-                        colorbar=dict(title="Unidades<br>vendidas")
-                    ))
-                    
-                    fig_heatmap_sem.update_layout(
-                        xaxis_title="Día de la Semana",
-                        yaxis_title="Semana del Mes",
-                        height=400
-                    )
-                    
-                    st.plotly_chart(fig_heatmap_sem, use_container_width=True)
-        
-        # ========== TAB 3: ANÁLISIS DE PRODUCTOS ==========
-        with tab3:
-            # Calcular datos BCG
-            ventas_por_producto = df_analisis.groupby('producto')['cantidad'].sum().reset_index()
-            ventas_por_producto['participacion'] = (ventas_por_producto['cantidad'] / ventas_por_producto['cantidad'].sum()) * 100
-            
-            # Calcular tasa de crecimiento
-            if periodo_seleccionado == '📊 Todos los datos':
-                fecha_mitad = df_analisis['fecha_hora'].min() + (df_analisis['fecha_hora'].max() - df_analisis['fecha_hora'].min()) / 2
-                df_periodo1 = df_analisis[df_analisis['fecha_hora'] < fecha_mitad]
-                df_periodo2 = df_analisis[df_analisis['fecha_hora'] >= fecha_mitad]
-                periodo_comparacion = "Primera mitad vs Segunda mitad"
-            else:
-                mes_actual = mes_num_sel
-                año_actual = año_sel
-                
-                if mes_actual == 1:
-                    mes_anterior = 12
-                    año_anterior = año_actual - 1
-                else:
-                    mes_anterior = mes_actual - 1
-                    año_anterior = año_actual
-                
-                df_periodo1 = df_temp[(df_temp['mes_num'] == mes_anterior) & (df_temp['año'] == año_anterior)]
-                df_periodo2 = df_analisis.copy()
-                mes_ant_nombre = meses_español[mes_anterior]
-                periodo_comparacion = f"{mes_ant_nombre} {año_anterior} vs {titulo_periodo}"
-            
-            ventas_p1 = df_periodo1.groupby('producto')['cantidad'].sum()
-            ventas_p2 = df_periodo2.groupby('producto')['cantidad'].sum()
-            
-            crecimiento = pd.DataFrame({
-                'producto': ventas_p2.index,
-                'ventas_periodo1': ventas_p2.index.map(lambda x: ventas_p1.get(x, 0)),
-                'ventas_periodo2': ventas_p2.values
-            })
-            
-            crecimiento['tasa_crecimiento'] = crecimiento.apply(
-                lambda row: ((row['ventas_periodo2'] - row['ventas_periodo1']) / row['ventas_periodo1'] * 100) 
-                if row['ventas_periodo1'] > 0 else 100,
-                axis=1
-            )
-            
-            bcg_data = ventas_por_producto.merge(crecimiento[['producto', 'tasa_crecimiento']], on='producto')
-            
-            participacion_media = bcg_data['participacion'].median()
-            crecimiento_medio = bcg_data['tasa_crecimiento'].median()
-            
-            def clasificar_bcg(row):
-                if row['participacion'] >= participacion_media and row['tasa_crecimiento'] >= crecimiento_medio:
-                    return '⭐ Estrella'
-                elif row['participacion'] >= participacion_media and row['tasa_crecimiento'] < crecimiento_medio:
-                    return '🐄 Vaca Lechera'
-                elif row['participacion'] < participacion_media and row['tasa_crecimiento'] >= crecimiento_medio:
-                    return '❓ Interrogante'
-                else:
-                    return '🐕 Perro'
-            
-            bcg_data['categoria'] = bcg_data.apply(clasificar_bcg, axis=1)
-            
-            # Subtabs dentro de Análisis de Productos
-            subtab1, subtab2, subtab3 = st.tabs(["📊 Matriz BCG", "🏆 Ranking", "📋 Resumen por Categoría"])
-            
-            with subtab1:
-                st.markdown("### 📊 Matriz BCG - Boston Consulting Group")
-                st.caption("Clasifica tus productos según participación de mercado y crecimiento")
-                
-                # Filtrar productos relevantes
-                bcg_data_plot = bcg_data[
-                    (bcg_data['participacion'] >= 0.5) | 
-                    (bcg_data['cantidad'].rank(ascending=False) <= 40)
-                ].copy()
-                
-                st.info(f"📌 Mostrando {len(bcg_data_plot)} productos más relevantes de {len(bcg_data)} totales")
-                
-                bcg_data_plot['tasa_crecimiento_plot'] = bcg_data_plot['tasa_crecimiento'].clip(-100, 300)
-                
-                # GRÁFICO BCG
-                fig_bcg = go.Figure()
-                
-                categorias = {
-                    '⭐ Estrella': '#FFD700',
-                    '🐄 Vaca Lechera': '#32CD32',
-                    '❓ Interrogante': '#1E90FF',
-                    '🐕 Perro': '#DC143C'
-                }
-                
-                top_por_categoria = 8
-                
-                for cat, color in categorias.items():
-                    df_cat = bcg_data_plot[bcg_data_plot['categoria'] == cat].nlargest(top_por_categoria, 'cantidad')
-                    if not df_cat.empty:
-                        sizes = 15 + (df_cat['cantidad'] / bcg_data_plot['cantidad'].max()) * 35
-                        
-                        fig_bcg.add_trace(go.Scatter(
-                            x=df_cat['participacion'],
-                            y=df_cat['tasa_crecimiento_plot'],
-                            mode='markers',
-                            name=cat,
-                            marker=dict(
-                                size=sizes,
-                                color=color,
-                                line=dict(width=1, color='white'),
-                                opacity=0.7
-                            ),
-                            text=df_cat['producto'],
-                            hovertemplate='<b>%{text}</b><br>' +
-                                          'Participación: %{x:.2f}%<br>' +
-                                          'Crecimiento: %{y:.1f}%<br>' +
-                                          '<extra></extra>'
-                        ))
-                
-                # Líneas divisorias
-                fig_bcg.add_hline(y=crecimiento_medio, line_dash="dash", line_color="gray", line_width=2)
-                fig_bcg.add_vline(x=participacion_media, line_dash="dash", line_color="gray", line_width=2)
-                
-                # Etiquetas de cuadrantes
-                max_x = bcg_data_plot['participacion'].max()
-                min_x = bcg_data_plot['participacion'].min()
-                max_y = bcg_data_plot['tasa_crecimiento_plot'].max()
-                min_y = bcg_data_plot['tasa_crecimiento_plot'].min()
-                
-                fig_bcg.add_annotation(x=participacion_media + (max_x - participacion_media) * 0.5, 
-                                       y=crecimiento_medio + (max_y - crecimiento_medio) * 0.9,
-                                       text="⭐ ESTRELLAS", showarrow=False,
-                                       font=dict(size=14, color='gray'))
-                
-                fig_bcg.add_annotation(x=participacion_media + (max_x - participacion_media) * 0.5,
-                                       y=min_y + (crecimiento_medio - min_y) * 0.1,
-                                       text="🐄 VACAS LECHERAS", showarrow=False,
-                                       font=dict(size=14, color='gray'))
-                
-                fig_bcg.add_annotation(x=min_x + (participacion_media - min_x) * 0.5,
-                                       y=crecimiento_medio + (max_y - crecimiento_medio) * 0.9,
-                                       text="❓ INTERROGANTES", showarrow=False,
-                                       font=dict(size=14, color='gray'))
-                
-                fig_bcg.add_annotation(x=min_x + (participacion_media - min_x) * 0.5,
-                                       y=min_y + (crecimiento_medio - min_y) * 0.1,
-                                       text="🐕 PERROS", showarrow=False,
-                                       font=dict(size=14, color='gray'))
-                
-                fig_bcg.update_layout(
-                    height=600,
-                    showlegend=True,
-                    legend=dict(
-                        orientation="v",
-                        yanchor="top",
-                        y=1,
-                        xanchor="left",
-                        x=1.02,
-                        font=dict(size=12)
-                    ),
-                    plot_bgcolor='white',
-                    xaxis=dict(
-                        title="Participación de Mercado (%)",
-                        gridcolor='lightgray',
-                        showgrid=True
-                    ),
-                    yaxis=dict(
-                        title="Tasa de Crecimiento (%)",
-                        gridcolor='lightgray',
-                        showgrid=True
-                    )
-                )
-                
-                st.plotly_chart(fig_bcg, use_container_width=True)
-                st.info(f"📊 **Comparación:** {periodo_comparacion}")
-            
-            with subtab2:
-                st.markdown("### 🏆 Ranking de Productos")
-                
-                # Opciones de ranking
-                col1, col2, col3 = st.columns([2, 1, 1])
-                
-                with col1:
-                    criterio_ranking = st.selectbox(
-                        "Ordenar por:",
-                        ["📊 Unidades Vendidas", "📈 Participación de Mercado (%)", "🔥 Tasa de Crecimiento (%)", "🏷️ Categoría BCG"],
-                        help="Selecciona el criterio para ordenar los productos"
-                    )
-                
-                with col2:
-                    orden = st.radio("Orden:", ["⬇️ Mayor a Menor", "⬆️ Menor a Mayor"], horizontal=True)
-                
-                with col3:
-                    limite = st.selectbox("Mostrar:", [10, 20, 50, 100, "Todos"], index=1)
-                
-                # Preparar datos para el ranking
-                ranking_data = bcg_data.copy()
-                
-                # Definir columna de ordenamiento
-                if criterio_ranking == "📊 Unidades Vendidas":
-                    col_orden = 'cantidad'
-                elif criterio_ranking == "📈 Participación de Mercado (%)":
-                    col_orden = 'participacion'
-                elif criterio_ranking == "🔥 Tasa de Crecimiento (%)":
-                    col_orden = 'tasa_crecimiento'
-                else:
-                    col_orden = 'categoria'
-                
-                # Ordenar datos
-                ascending = True if orden == "⬆️ Menor a Mayor" else False
-                ranking_data = ranking_data.sort_values(col_orden, ascending=ascending).reset_index(drop=True)
-                
-                # Aplicar límite
-                if limite != "Todos":
-                    ranking_data = ranking_data.head(limite)
-                
-                # Agregar columna de ranking
-                ranking_data.insert(0, '#', range(1, len(ranking_data) + 1))
-                
-                # Preparar tabla para mostrar
-                tabla_ranking = ranking_data[['#', 'producto', 'cantidad', 'participacion', 'tasa_crecimiento', 'categoria']].copy()
-                tabla_ranking.columns = ['#', 'Producto', 'Unidades Vendidas', 'Participación (%)', 'Crecimiento (%)', 'Categoría BCG']
-                
-                # Formatear números
-                tabla_ranking['Unidades Vendidas'] = tabla_ranking['Unidades Vendidas'].apply(lambda x: f"{int(x):,}")
-                tabla_ranking['Participación (%)'] = tabla_ranking['Participación (%)'].apply(lambda x: f"{x:.2f}%")
-                tabla_ranking['Crecimiento (%)'] = tabla_ranking['Crecimiento (%)'].apply(lambda x: f"{x:+.1f}%")
-                
-                # Mostrar tabla
-                st.dataframe(
-                    tabla_ranking,
-                    use_container_width=True,
-                    hide_index=True,
-                    column_config={
-                        "#": st.column_config.NumberColumn("#", help="Posición en el ranking", width="small"),
-                        "Producto": st.column_config.TextColumn("Producto", width="large"),
-                        "Categoría BCG": st.column_config.TextColumn("Categoría BCG", width="medium")
-                    }
-                )
-                
-                # Estadísticas del ranking
-                with st.expander("📊 Ver Estadísticas del Ranking", expanded=False):
-                    col1, col2, col3, col4 = st.columns(4)
-                    
-                    productos_mostrados = len(tabla_ranking)
-                    total_unidades = ranking_data['cantidad'].sum()
-                    participacion_total = ranking_data['participacion'].sum()
-                    promedio_crecimiento = ranking_data['tasa_crecimiento'].mean()
-                    
-                    with col1:
-                        st.metric("📦 Productos", f"{productos_mostrados}")
-                    with col2:
-                        st.metric("🛒 Unidades Totales", f"{int(total_unidades):,}")
-                    with col3:
-                        st.metric("📈 Participación Total", f"{participacion_total:.1f}%")
-                    with col4:
-                        st.metric("📊 Crecimiento Promedio", f"{promedio_crecimiento:+.1f}%")
-            
-            with subtab3:
-                st.markdown("### 📋 Resumen por Categoría BCG")
-                
-                resumen_categorias = bcg_data.groupby('categoria').agg({
-                    'producto': 'count',
-                    'cantidad': 'sum',
-                    'participacion': 'sum'
-                }).reset_index()
-                resumen_categorias.columns = ['Categoría', 'Cantidad de Productos', 'Unidades Vendidas', 'Participación Total (%)']
-                resumen_categorias['Participación Total (%)'] = resumen_categorias['Participación Total (%)'].round(2)
-                
-                st.dataframe(resumen_categorias, use_container_width=True, hide_index=True)
+        if tab1.open:
+            with tab1:
+                st.markdown("### 📊 Métricas Principales")
                 
-                # Gráficos de distribución
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    fig_dist_cat = go.Figure(data=[
-                        go.Pie(
-                            labels=resumen_categorias['Categoría'],
-                            values=resumen_categorias['Cantidad de Productos'],
-                            hole=0.4,
-                            marker=dict(colors=['#FFD700', '#32CD32', '#1E90FF', '#DC143C'])
-                        )
-                    ])
-                    fig_dist_cat.update_layout(title="Productos por Categoría", height=350)
-                    st.plotly_chart(fig_dist_cat, use_container_width=True)
-                
-                with col2:
-                    fig_dist_ventas = go.Figure(data=[
-                        go.Pie(
-                            labels=resumen_categorias['Categoría'],
-                            values=resumen_categorias['Unidades Vendidas'],
-                            hole=0.4,
-                            marker=dict(colors=['#FFD700', '#32CD32', '#1E90FF', '#DC143C'])
-                        )
-                    ])
-                    fig_dist_ventas.update_layout(title="Ventas por Categoría", height=350)
-                    st.plotly_chart(fig_dist_ventas, use_container_width=True)
-                
-                # Top productos por categoría
-                with st.expander("⭐ Ver Top Productos por Categoría", expanded=False):
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        st.markdown("#### ⭐ Top 5 Estrellas")
-                        estrellas = bcg_data[bcg_data['categoria'] == '⭐ Estrella'].nlargest(5, 'cantidad')[['producto', 'cantidad', 'tasa_crecimiento']]
-                        if not estrellas.empty:
-                            estrellas['tasa_crecimiento'] = estrellas['tasa_crecimiento'].round(1).astype(str) + '%'
-                            st.dataframe(estrellas, use_container_width=True, hide_index=True)
-                        else:
-                            st.info("No hay productos en esta categoría")
-                    
-                    with col2:
-                        st.markdown("#### 🐕 Top 5 Perros (considerar eliminar)")
-                        perros = bcg_data[bcg_data['categoria'] == '🐕 Perro'].nsmallest(5, 'cantidad')[['producto', 'cantidad', 'tasa_crecimiento']]
-                        if not perros.empty:
-                            perros['tasa_crecimiento'] = perros['tasa_crecimiento'].round(1).astype(str) + '%'
-                            st.dataframe(perros, use_container_width=True, hide_index=True)
-                        else:
-                            st.info("No hay productos en esta categoría")
-        
-        # ========== TAB 4: BÚSQUEDA DETALLADA ==========
-        with tab4:
-            st.markdown("### 🔍 Buscador de Productos")
-            st.caption("Busca y analiza cualquier producto en detalle")
-            
-            # Selector de producto
-            productos_disponibles = sorted(df_analisis['producto'].unique())
-            producto_seleccionado = st.selectbox(
-                "Selecciona un producto:",
-                productos_disponibles,
-                help="Elige un producto para ver su análisis completo"
-            )
-            
-            if producto_seleccionado:
-                # Filtrar datos del producto
-                df_producto = df_analisis[df_analisis['producto'] == producto_seleccionado].copy()
-                
-                # Obtener información BCG del producto
-                info_bcg = bcg_data[bcg_data['producto'] == producto_seleccionado].iloc[0]
-                
-                # Métricas principales del producto
-                st.markdown(f"### 📦 {producto_seleccionado}")
+                # Métricas clave
+                ventas_hora_dia = cubo_analisis.groupby(['dia_semana', 'hora_num'])['cantidad'].sum().reset_index()
+                idx_max = ventas_hora_dia['cantidad'].idxmax()
+                hora_pico = int(ventas_hora_dia.loc[idx_max, 'hora_num'])
+                dia_pico = dias_español[ventas_hora_dia.loc[idx_max, 'dia_semana']]
+                cantidad_pico = int(ventas_hora_dia.loc[idx_max, 'cantidad'])
+                total_vendido = acumulados.total(desde_sel, hasta_sel)
+                promedio_diario = acumulados.promedio_diario(desde_sel, hasta_sel)
                 
                 col1, col2, col3, col4, col5 = st.columns(5)
-                
                 with col1:
-                    st.metric("🏷️ Categoría BCG", info_bcg['categoria'])
+                    st.metric("🕐 Hora Pico", f"{hora_pico}:00 hs", help="Hora con más ventas")
                 with col2:
-                    st.metric("📊 Unidades Vendidas", f"{int(info_bcg['cantidad']):,}")
+                    st.metric("📅 Día Pico", dia_pico, help="Día con más ventas")
                 with col3:
-                    st.metric("📈 Participación", f"{info_bcg['participacion']:.2f}%")
+                    st.metric("🔥 Ventas en Pico", f"{cantidad_pico} unidades", help="Cantidad vendida en el momento pico")
                 with col4:
-                    st.metric("📉 Crecimiento", f"{info_bcg['tasa_crecimiento']:.1f}%")
+                    st.metric("📦 Total Vendido", f"{int(total_vendido):,} unidades", help="Total de unidades en el período")
                 with col5:
-                    ranking = bcg_data['cantidad'].rank(ascending=False)[bcg_data['producto'] == producto_seleccionado].values[0]
-                    st.metric("🏆 Ranking", f"#{int(ranking)}")
+                    st.metric("📆 Promedio Diario", f"{promedio_diario:,.1f} unidades",
+                              help=f"Unidades por día con ventas ({acumulados.dias_activos(desde_sel, hasta_sel)} días)")
                 
                 st.divider()
                 
-                # Gráficos del producto en dos columnas
-                col1, col2 = st.columns(2)
+                # Gráfico de ventas por día
+                st.markdown("### 📅 Ventas por Día de la Semana")
+                clave_figura = ('ventas_dia_semana', version_datos, clave_periodo)
                 
-                with col1:
-                    # Ventas por día de la semana
-                    st.markdown("#### 📅 Ventas por Día de la Semana")
-                    ventas_dia = df_producto.groupby('dia_semana')['cantidad'].sum().reset_index()
-                    ventas_dia['dia_semana'] = ventas_dia['dia_semana'].map(dias_español)
-                    ventas_dia = ventas_dia.set_index('dia_semana').reindex([dias_español[d] for d in dias_orden if d in df_producto['dia_semana'].unique()])
+                def figura_dias():
+                    ventas_por_dia = cubo_analisis.groupby('dia_semana')['cantidad'].sum().reset_index()
+                    ventas_por_dia['dia_español'] = ventas_por_dia['dia_semana'].map(dias_español)
+                    ventas_por_dia = ventas_por_dia.set_index('dia_semana').reindex(dias_orden).reset_index()
                     
                     fig_dias = go.Figure(data=[
-                        go.Bar(x=ventas_dia.index, y=ventas_dia['cantidad'].values, 
-                               marker_color='#1E90FF',
-                               text=ventas_dia['cantidad'].values,
-                               textposition='auto')
+                        go.Bar(
+                            x=[dias_español[d] for d in ventas_por_dia['dia_semana']],
+                            y=ventas_por_dia['cantidad'],
+                            marker_color='#1E90FF',
+                            text=ventas_por_dia['cantidad'],
+                            textposition='auto'
+                        )
                     ])
                     fig_dias.update_layout(
-                        height=350,
-                        xaxis_title="Día",
-                        yaxis_title="Unidades",
+                        height=400,
+                        xaxis_title="Día de la Semana",
+                        yaxis_title="Unidades Vendidas",
                         showlegend=False
                     )
-                    st.plotly_chart(fig_dias, use_container_width=True)
+                    return fig_dias
                 
-                with col2:
-                    # Ventas por hora
-                    st.markdown("#### 🕐 Ventas por Hora del Día")
-                    ventas_hora = df_producto.groupby('hora_num')['cantidad'].sum().reset_index()
+                fig_dias = figuras.obtener_o_construir(clave_figura, figura_dias)
+                st.plotly_chart(fig_dias, use_container_width=True)
+                
+                # Gráfico de ventas por hora
+                st.markdown("### 🕐 Ventas por Hora del Día")
+                clave_figura = ('ventas_hora', version_datos, clave_periodo)
+                
+                def figura_horas():
+                    ventas_por_hora = cubo_analisis.groupby('hora_num')['cantidad'].sum().reset_index()
                     
                     fig_horas = go.Figure(data=[
-                        go.Scatter(x=ventas_hora['hora_num'], y=ventas_hora['cantidad'],
-                                  mode='lines+markers',
-                                  line=dict(color='#32CD32', width=3),
-                                  marker=dict(size=8),
-                                  fill='tozeroy',
-                                  fillcolor='rgba(50,205,50,0.2)')
+                        go.Scatter(
+                            x=ventas_por_hora['hora_num'],
+                            y=ventas_por_hora['cantidad'],
+                            mode='lines+markers',
+                            line=dict(color='#32CD32', width=3),
+                            marker=dict(size=8),
+                            fill='tozeroy',
+                            fillcolor='rgba(50,205,50,0.2)'
+                        )
                     ])
                     fig_horas.update_layout(
-                        height=350,
-                        xaxis_title="Hora",
-                        yaxis_title="Unidades",
+                        height=400,
+                        xaxis_title="Hora del Día",
+                        yaxis_title="Unidades Vendidas",
                         showlegend=False,
                         xaxis=dict(dtick=2)
                     )
-                    st.plotly_chart(fig_horas, use_container_width=True)
+                    return fig_horas
                 
-                # Tendencia temporal
-                with st.expander("📈 Ver Tendencia de Ventas en el Tiempo", expanded=True):
-                    df_producto_tiempo = df_producto.copy()
-                    df_producto_tiempo['fecha'] = df_producto_tiempo['fecha_hora'].dt.date
-                    ventas_tiempo = df_producto_tiempo.groupby('fecha')['cantidad'].sum().reset_index()
+                fig_horas = figuras.obtener_o_construir(clave_figura, figura_horas)
+                st.plotly_chart(fig_horas, use_container_width=True)
+            
+        # ========== TAB 2: ANÁLISIS DE HORARIOS ==========
+        if tab2.open:
+            with tab2:
+                st.markdown("### 🔥 Heatmap de Ventas por Media Hora")
+                st.caption("Intensidad de ventas por día de la semana cada 30 minutos")
+                
+                clave_figura = ('heatmap_media_hora', version_datos, clave_periodo)
+                
+                def figura_heatmap_mh():
+                    # Crear matriz por media hora
+                    ventas_media_hora = cubo_analisis.groupby(['dia_semana', 'media_hora'])['cantidad'].sum().reset_index()
+                    ventas_matriz_mh = ventas_media_hora.pivot(index='dia_semana', columns='media_hora', values='cantidad').fillna(0)
+                    
+                    # Reordenar y traducir
+                    ventas_matriz_mh = ventas_matriz_mh.reindex([d for d in dias_orden if d in ventas_matriz_mh.index])
+                    ventas_matriz_mh.index = [dias_español[d] for d in ventas_matriz_mh.index]
+                    
+                    # Crear etiquetas para el eje X
+                    etiquetas_horas = [f"{int(h)}:{('00' if h % 1 == 0 else '30')}" for h in ventas_matriz_mh.columns]
+                    
+                    fig_heatmap_mh = go.Figure(data=go.Heatmap(
+                        z=ventas_matriz_mh.values,
+                        x=etiquetas_horas,
+                        y=ventas_matriz_mh.index,
+                        colorscale='YlOrRd',
+                        text=ventas_matriz_mh.values.astype(int),
+                        texttemplate='%{text}',
+                        textfont={"size": 9},
+                        colorbar=dict(title="Unidades<br>vendidas")
+                    ))
                     
-                    fig_tendencia = go.Figure(data=[
-                        go.Scatter(x=ventas_tiempo['fecha'], y=ventas_tiempo['cantidad'],
-                                  mode='lines+markers',
-                                  line=dict(color='#FFD700', width=2),
-                                  marker=dict(size=6),
-                                  fill='tozeroy',
-                                  fillcolor='rgba(255,215,0,0.2)')
-                    ])
-                    fig_tendencia.update_layout(
-                        height=300,
-                        xaxis_title="Fecha",
-                        yaxis_title="Unidades Vendidas",
-                        showlegend=False
+                    fig_heatmap_mh.update_layout(
+                        xaxis_title="Hora del Día",
+                        yaxis_title="Día de la Semana",
+                        height=500,
+                        xaxis=dict(tickangle=-45)
                     )
-                    st.plotly_chart(fig_tendencia, use_container_width=True)
+                    return fig_heatmap_mh
                 
-                # Estadísticas adicionales
-                with st.expander("📊 Ver Estadísticas Detalladas", expanded=False):
-                    col1, col2, col3 = st.columns(3)
-                    
-                    with col1:
-                        st.markdown("##### 📊 Estadísticas")
-                        promedio_diario = df_producto_tiempo.groupby('fecha')['cantidad'].sum().mean()
-                        st.write(f"**Promedio diario:** {promedio_diario:.1f} unidades")
-                        st.write(f"**Máximo en un día:** {df_producto_tiempo.groupby('fecha')['cantidad'].sum().max():.0f} unidades")
-                        st.write(f"**Mínimo en un día:** {df_producto_tiempo.groupby('fecha')['cantidad'].sum().min():.0f} unidades")
-                    
-                    with col2:
-                        st.markdown("##### 🕐 Hora Pico")
-                        hora_pico_prod = ventas_hora.loc[ventas_hora['cantidad'].idxmax(), 'hora_num']
-                        cantidad_hora_pico = ventas_hora['cantidad'].max()
-                        st.write(f"**Mejor hora:** {int(hora_pico_prod)}:00 hs")
-                        st.write(f"**Ventas en pico:** {int(cantidad_hora_pico)} unidades")
-                    
-                    with col3:
-                        st.markdown("##### 📅 Día Pico")
-                        dia_pico_prod = ventas_dia.idxmax()
-                        cantidad_dia_pico = ventas_dia.max()
-                        st.write(f"**Mejor día:** {dia_pico_prod}")
-                        st.write(f"**Ventas en pico:** {int(cantidad_dia_pico)} unidades")
-        
-        # ========== TAB 5: ANÁLISIS DE CANASTAS ==========
-        with tab5:
-            st.markdown("### 🛒 Análisis de Canastas de Compra")
-            st.caption("Descubre qué productos se compran juntos en la misma transacción")
-            
-            # Productos a excluir del análisis
-            PRODUCTOS_EXCLUIR = ["BAGUETTES CHICOS"]
-            
-            # Agrupar productos vendidos en la misma fecha y hora (misma transacción)
-            df_transacciones = df_analisis.copy()
-            df_transacciones['transaccion_id'] = df_transacciones['fecha_hora'].astype(str)
-            
-            # Filtrar productos excluidos
-            df_transacciones_filtrado = df_transacciones[~df_transacciones['producto'].isin(PRODUCTOS_EXCLUIR)]
-            
-            # Crear canastas: productos agrupados por transacción
-            canastas = df_transacciones_filtrado.groupby('transaccion_id')['producto'].apply(list).reset_index()
-            canastas['num_productos'] = canastas['producto'].apply(len)
-            
-            # Filtrar solo transacciones con más de 1 producto
-            canastas_multiples = canastas[canastas['num_productos'] > 1].copy()
-            
-            # Métricas generales
-            st.markdown("#### 📊 Estadísticas Generales")
-            st.caption(f"⚠️ Productos excluidos del análisis: {', '.join(PRODUCTOS_EXCLUIR)}")
-            
-            col1, col2, col3, col4 = st.columns(4)
-            
-            total_transacciones = len(canastas)
-            transacciones_multiples = len(canastas_multiples)
-            pct_multiples = (transacciones_multiples / total_transacciones * 100) if total_transacciones > 0 else 0
-            promedio_productos = canastas['num_productos'].mean()
-            
-            with col1:
-                st.metric(
-                    "🛒 Total Transacciones",
-                    f"{total_transacciones:,}",
-                    help="Número total de compras registradas"
-                )
-            
-            with col2:
-                st.metric(
-                    "📦 Transacciones Múltiples",
-                    f"{transacciones_multiples:,}",
-                    delta=f"{pct_multiples:.1f}%",
-                    help="Compras con más de 1 producto"
-                )
-            
-            with col3:
-                st.metric(
-                    "📊 Promedio Productos/Venta",
-                    f"{promedio_productos:.1f}",
-                    help="Cantidad promedio de productos por transacción"
-                )
-            
-            with col4:
-                max_productos = canastas['num_productos'].max()
-                st.metric(
-                    "🎯 Máximo en una Venta",
-                    f"{max_productos}",
-                    help="Mayor cantidad de productos en una sola transacción"
+                fig_heatmap_mh = figuras.obtener_o_construir(clave_figura, figura_heatmap_mh)
+                
+                st.plotly_chart(fig_heatmap_mh, use_container_width=True)
+                
+                # Proyección para planificar turnos (siempre desde los datos más recientes)
+                st.markdown("### 👥 Proyección de Demanda por Media Hora")
+                st.caption("Unidades y transacciones esperadas para las próximas semanas, con bandas del 10% y 90%. "
+                           "Se proyecta desde las últimas semanas de datos, sin importar el período elegido. "
+                           "Las transacciones usan la ventana de agrupación del Análisis de Canastas.")
+                
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    semanas_proyeccion = control(st.number_input, "Semanas a proyectar:", "semanas_proyeccion",
+                                                 min_value=1, max_value=8, value=2)
+                with col2:
+                    semanas_historia = control(st.slider, "Semanas de historia:", "semanas_historia_franjas",
+                                               min_value=4, max_value=26, value=12,
+                                               help="Semanas recientes con las que se estima cada franja")
+                with col3:
+                    metrica_proyeccion = control(st.radio, "Métrica:", "metrica_proyeccion",
+                                                 options=["unidades", "transacciones"], format_func=str.capitalize,
+                                                 horizontal=True)
+                
+                # Misma ventana de agrupación de transacciones que el Análisis de Canastas
+                brecha_franjas = st.session_state.get("slider_brecha_transaccion", 0)
+                pronostico_franjas = construir_pronostico_franjas(version_datos, semanas_historia, brecha_franjas, df_temp)
+                proyeccion = pronostico_franjas.predecir(int(semanas_proyeccion))
+                inicios_semana = proyeccion.groupby('semana')['fecha'].agg(['min', 'max'])
+                semana_proyeccion = control(
+                    st.selectbox,
+                    "Semana:",
+                    "semana_proyeccion",
+                    options=inicios_semana.index,
+                    format_func=lambda s: f"Semana {s} ({inicios_semana.loc[s, 'min']:%d/%m} - {inicios_semana.loc[s, 'max']:%d/%m})"
                 )
-            
-            st.divider()
-            
-            if len(canastas_multiples) == 0:
-                st.warning("⚠️ No se encontraron transacciones con múltiples productos en el período seleccionado")
-            else:
-                # Subtabs para diferentes análisis
-                subtab1, subtab2 = st.tabs(["🔗 Productos Frecuentes", "🔍 Buscar por Producto"])
                 
-                with subtab1:
-                    st.markdown("#### 🔗 Productos que se Compran Juntos")
-                    
-                    # Calcular todas las combinaciones de pares
-                    pares = []
-                    for productos in canastas_multiples['producto']:
-                        if len(productos) >= 2:
-                            for combo in combinations(sorted(productos), 2):
-                                pares.append(combo)
-                    
-                    # Contar frecuencia de cada par
-                    contador_pares = Counter(pares)
-                    top_pares = contador_pares.most_common(20)
-                    
-                    if len(top_pares) > 0:
-                        # Selector de cantidad a mostrar
-                        max_disponible = min(20, len(top_pares))
-                        if max_disponible > 5:
-                            num_mostrar = st.slider(
-                                "Cantidad de combinaciones a mostrar:",
-                                min_value=5,
-                                max_value=max_disponible,
-                                value=min(10, max_disponible),
-                                step=5,
-                                key="slider_pares"
-                            )
-                        else:
-                            num_mostrar = max_disponible
-                            st.info(f"Mostrando {num_mostrar} combinaciones disponibles")
-                        
-                        # Crear dataframe de pares
-                        df_pares = pd.DataFrame(top_pares[:num_mostrar], columns=['Par', 'Frecuencia'])
-                        df_pares['Producto 1'] = df_pares['Par'].apply(lambda x: x[0])
-                        df_pares['Producto 2'] = df_pares['Par'].apply(lambda x: x[1])
-                        
-                        # Calcular soporte
-                        df_pares['Soporte (%)'] = (df_pares['Frecuencia'] / len(canastas_multiples) * 100).round(2)
+                proyeccion_semana = proyeccion[proyeccion['semana'] == semana_proyeccion]
+                clave_figura = ('proyeccion_franjas', version_datos, semanas_proyeccion, semanas_historia, metrica_proyeccion, semana_proyeccion)
+                
+                def figura_proyeccion():
+                    banda_baja, banda_alta = f"{metrica_proyeccion}_p10", f"{metrica_proyeccion}_p90"
+                    matrices = {columna: proyeccion_semana.pivot(index='dia_semana', columns='media_hora', values=columna)
+                                for columna in (metrica_proyeccion, banda_baja, banda_alta)}
+                    esperado = matrices[metrica_proyeccion]
+                    etiquetas_proyeccion = [f"{int(h)}:{('00' if h % 1 == 0 else '30')}" for h in esperado.columns]
+                    
+                    fig_proyeccion = go.Figure(data=go.Heatmap(
+                        z=esperado.values,
+                        x=etiquetas_proyeccion,
+                        y=[dias_español[d] for d in esperado.index],
+                        customdata=np.dstack([matrices[banda_baja].values, matrices[banda_alta].values]),
+                        colorscale='Blues',
+                        text=esperado.values.round(0).astype(int),
+                        texttemplate='%{text}',
+                        textfont={"size": 9},
+                        hovertemplate="%{y} %{x}<br>Esperado: %{z:.1f}<br>Banda: %{customdata[0]:.1f} - %{customdata[1]:.1f}<extra></extra>",
+                        colorbar=dict(title=f"{metrica_proyeccion.capitalize()}<br>esperadas")
+                    ))
+                    fig_proyeccion.update_layout(
+                        xaxis_title="Hora del Día",
+                        yaxis_title="Día de la Semana",
+                        height=500,
+                        xaxis=dict(tickangle=-45)
+                    )
+                    return fig_proyeccion
+                
+                fig_proyeccion = figuras.obtener_o_construir(clave_figura, figura_proyeccion)
+                st.plotly_chart(fig_proyeccion, use_container_width=True)
+                
+                with st.expander("📋 Ver Tabla de Proyección", expanded=False):
+                    tabla_proyeccion = pd.DataFrame({
+                        'Fecha': proyeccion_semana['fecha'].dt.strftime('%d/%m/%Y'),
+                        'Día': proyeccion_semana['dia_semana'].map(dias_español),
+                        'Franja': [f"{int(h)}:{('00' if h % 1 == 0 else '30')}" for h in proyeccion_semana['media_hora']],
+                        'Unidades': proyeccion_semana['unidades'].round(1),
+                        'Unidades (10% - 90%)': proyeccion_semana['unidades_p10'].round(1).astype(str) + ' - '
+                                                + proyeccion_semana['unidades_p90'].round(1).astype(str),
+                        'Transacciones': proyeccion_semana['transacciones'].round(1),
+                        'Transacciones (10% - 90%)': proyeccion_semana['transacciones_p10'].round(1).astype(str) + ' - '
+                                                     + proyeccion_semana['transacciones_p90'].round(1).astype(str),
+                    })
+                    st.dataframe(tabla_proyeccion, use_container_width=True, hide_index=True)
+                
+                # Heatmap por semana del mes (solo si es un mes específico)
+                if mes_num_sel is not None:
+                    with st.expander("📅 Ver Heatmap por Semana del Mes", expanded=False):
+                        st.caption("Intensidad de ventas por semana y día de la semana")
                         
-                        # Gráfico de barras
-                        df_pares['Combinación'] = df_pares.apply(
-                            lambda row: f"{row['Producto 1'][:20]} + {row['Producto 2'][:20]}", 
-                            axis=1
-                        )
+                        clave_figura = ('heatmap_semana_mes', version_datos, clave_periodo)
                         
-                        fig_pares = go.Figure(data=[
-                            go.Bar(
-                                y=df_pares['Combinación'][::-1],
-                                x=df_pares['Frecuencia'][::-1],
-                                orientation='h',
-                                marker_color='#1E90FF',
-                                text=df_pares['Frecuencia'][::-1],
-                                textposition='auto',
-                                hovertemplate='<b>%{y}</b><br>Frecuencia: %{x}<extra></extra>'
+                        def figura_heatmap_sem():
+                            ventas_semana = cubo_analisis.groupby(['semana_del_mes', 'dia_semana'])['cantidad'].sum().reset_index()
+                            ventas_matriz_sem = ventas_semana.pivot(index='semana_del_mes', columns='dia_semana', values='cantidad').fillna(0)
+                            
+                            # Reordenar columnas por día de la semana
+                            dias_disponibles = [d for d in dias_orden if d in ventas_matriz_sem.columns]
+                            ventas_matriz_sem = ventas_matriz_sem[dias_disponibles]
+                            ventas_matriz_sem.columns = [dias_español[d] for d in ventas_matriz_sem.columns]
+                            
+                            # Renombrar índice
+                            ventas_matriz_sem.index = [f"Semana {int(s)}" for s in ventas_matriz_sem.index]
+                            
+                            fig_heatmap_sem = go.Figure(data=go.Heatmap(
+                                z=ventas_matriz_sem.values,
+                                x=ventas_matriz_sem.columns,
+                                y=ventas_matriz_sem.index,
+                                colorscale='Viridis',
+                                text=ventas_matriz_sem.values.astype(int),
+                                texttemplate='%{text}',
+                                textfont={"size": 12},
+                                colorbar=dict(title="Unidades<br>vendidas")
+                            ))
+                            
+                            fig_heatmap_sem.update_layout(
+                                xaxis_title="Día de la Semana",
+                                yaxis_title="Semana del Mes",
+                                height=400
                             )
-                        ])
-                        
-                        fig_pares.update_layout(
-                            title="Top Combinaciones de Productos",
-                            xaxis_title="Frecuencia (veces que se compraron juntos)",
-                            yaxis_title="",
-                            height=max(400, num_mostrar * 40),
-                            showlegend=False
-                        )
+                            return fig_heatmap_sem
                         
-                        st.plotly_chart(fig_pares, use_container_width=True)
+                        fig_heatmap_sem = figuras.obtener_o_construir(clave_figura, figura_heatmap_sem)
                         
-                        # Tabla detallada
-                        st.markdown("#### 📋 Tabla Detallada de Combinaciones")
-                        
-                        tabla_pares = df_pares[['Producto 1', 'Producto 2', 'Frecuencia', 'Soporte (%)']].copy()
-                        st.dataframe(tabla_pares, use_container_width=True, hide_index=True)
-                        
-                        st.divider()
-                        
-                        # Análisis de triples
-                        st.markdown("#### 🎯 Combinaciones de 3 Productos")
-                        
-                        triples = []
-                        for productos in canastas_multiples['producto']:
-                            if len(productos) >= 3:
-                                for combo in combinations(sorted(productos), 3):
-                                    triples.append(combo)
-                        
-                        if len(triples) > 0:
-                            contador_triples = Counter(triples)
-                            top_triples = contador_triples.most_common(10)
-                            
-                            df_triples = pd.DataFrame(top_triples, columns=['Triple', 'Frecuencia'])
-                            df_triples['Producto 1'] = df_triples['Triple'].apply(lambda x: x[0])
-                            df_triples['Producto 2'] = df_triples['Triple'].apply(lambda x: x[1])
-                            df_triples['Producto 3'] = df_triples['Triple'].apply(lambda x: x[2])
-                            df_triples['Soporte (%)'] = (df_triples['Frecuencia'] / len(canastas_multiples) * 100).round(2)
-                            
-                            tabla_triples = df_triples[['Producto 1', 'Producto 2', 'Producto 3', 'Frecuencia', 'Soporte (%)']].copy()
-                            st.dataframe(tabla_triples, use_container_width=True, hide_index=True)
-                        else:
-                            st.info("No se encontraron transacciones con 3 o más productos diferentes")
-                        
-                        st.divider()
-                        
-                        # RECOMENDACIONES AUTOMÁTICAS
-                        st.markdown("#### 💡 Recomendaciones de Negocio")
+                        st.plotly_chart(fig_heatmap_sem, use_container_width=True)
+            
+        # ========== TAB 3: ANÁLISIS DE PRODUCTOS ==========
+        if tab3.open:
+            with tab3:
+                umbral_bcg = control(
+                    st.radio,
+                    "Umbral de los cuadrantes:",
+                    "umbral_bcg",
+                    options=["mediana", "media"],
+                    format_func=str.capitalize,
+                    horizontal=True,
+                    help="Valor de participación y crecimiento que separa los cuadrantes"
+                )
+                bcg_data, participacion_media, crecimiento_medio = calcular_datos_bcg(
+                    version_datos, clave_periodo, cubo, cubo_analisis, mes_bcg, fecha_mitad, umbral_bcg)
+                
+                # Subtabs dentro de Análisis de Productos
+                subtab1, subtab2, subtab3, subtab4 = st.tabs(["📊 Matriz BCG", "🏆 Ranking", "📋 Resumen por Categoría", "🔄 Transiciones"],
+                                                             key="tabs_productos", on_change="rerun")
+                
+                if subtab1.open:
+                    with subtab1:
+                        st.markdown("### 📊 Matriz BCG - Boston Consulting Group")
+                        st.caption("Clasifica tus productos según participación de mercado y crecimiento")
                         
-                        top_combo = df_pares.iloc[0]
+                        # Filtrar productos relevantes
+                        bcg_data_plot = bcg_data[
+                            (bcg_data['participacion'] >= 0.5) | 
+                            (bcg_data['cantidad'].rank(ascending=False) <= 40)
+                        ].copy()
                         
-                        col1, col2 = st.columns(2)
+                        st.info(f"📌 Mostrando {len(bcg_data_plot)} productos más relevantes de {len(bcg_data)} totales")
                         
-                        with col1:
-                            st.success(f"**🏆 COMBO MÁS POPULAR**")
-                            st.markdown(f"**{top_combo['Producto 1']}** + **{top_combo['Producto 2']}**")
-                            st.info(f"Se compran juntos en {top_combo['Frecuencia']} ocasiones ({top_combo['Soporte (%)']}%)")
-                            st.markdown("**Acciones sugeridas:**\n- Crear promoción de combo\n- Colocar productos cercanos\n- Destacar en marketing")
+                        bcg_data_plot['tasa_crecimiento_plot'] = bcg_data_plot['tasa_crecimiento'].clip(-100, 300)
                         
-                        with col2:
-                            st.success(f"**🎯 OPORTUNIDADES**")
-                            st.markdown(f"Identificadas **{num_mostrar}** combinaciones frecuentes")
-                            st.info("Productos con alta afinidad que se pueden potenciar")
-                            st.markdown("**Acciones sugeridas:**\n- Entrenar al personal\n- Crear paquetes promocionales\n- Señalización en PDV")
+                        # GRÁFICO BCG
+                        clave_figura = ('matriz_bcg', version_datos, clave_periodo, umbral_bcg)
                         
-                        # Análisis por horario
-                        with st.expander("🕐 Ver Análisis de Canastas por Horario", expanded=False):
-                            st.markdown("##### Tamaño de Canasta por Hora del Día")
+                        def figura_bcg():
+                            fig_bcg = go.Figure()
                             
-                            df_trans_hora = df_transacciones_filtrado.copy()
-                            df_trans_hora['hora'] = df_trans_hora['fecha_hora'].dt.hour
-                            df_trans_hora['transaccion_id'] = df_trans_hora['fecha_hora'].astype(str)
+                            categorias = {
+                                '⭐ Estrella': '#FFD700',
+                                '🐄 Vaca Lechera': '#32CD32',
+                                '❓ Interrogante': '#1E90FF',
+                                '🐕 Perro': '#DC143C'
+                            }
                             
-                            productos_por_hora = df_trans_hora.groupby(['transaccion_id', 'hora']).size().reset_index(name='productos_en_canasta')
-                            promedio_por_hora = productos_por_hora.groupby('hora')['productos_en_canasta'].mean().reset_index()
+                            top_por_categoria = 8
                             
-                            fig_hora = go.Figure(data=[
-                                go.Scatter(
-                                    x=promedio_por_hora['hora'],
-                                    y=promedio_por_hora['productos_en_canasta'],
-                                    mode='lines+markers',
-                                    line=dict(color='#32CD32', width=3),
-                                    marker=dict(size=8),
-                                    fill='tozeroy',
-                                    fillcolor='rgba(50,205,50,0.2)'
-                                )
-                            ])
-                            
-                            fig_hora.update_layout(
-                                xaxis_title="Hora del Día",
-                                yaxis_title="Promedio de Productos por Venta",
-                                height=350,
-                                showlegend=False,
-                                xaxis=dict(dtick=2)
-                            )
+                            for cat, color in categorias.items():
+                                df_cat = bcg_data_plot[bcg_data_plot['categoria'] == cat].nlargest(top_por_categoria, 'cantidad')
+                                if not df_cat.empty:
+                                    sizes = 15 + (df_cat['cantidad'] / bcg_data_plot['cantidad'].max()) * 35
                             
-                            st.plotly_chart(fig_hora, use_container_width=True)
+                                    fig_bcg.add_trace(go.Scatter(
+                                        x=df_cat['participacion'],
+                                        y=df_cat['tasa_crecimiento_plot'],
+                                        mode='markers',
+                                        name=cat,
+                                        marker=dict(
+                                            size=sizes,
+                                            color=color,
+                                            line=dict(width=1, color='white'),
+                                            opacity=0.7
+                                        ),
+                                        text=df_cat['producto'],
+                                        hovertemplate='<b>%{text}</b><br>' +
+                                                      'Participación: %{x:.2f}%<br>' +
+                                                      'Crecimiento: %{y:.1f}%<br>' +
+                                                      '<extra></extra>'
+                                    ))
                             
-                            hora_max_canasta = promedio_por_hora.loc[promedio_por_hora['productos_en_canasta'].idxmax()]
-                            st.info(f"💡 A las **{int(hora_max_canasta['hora'])}:00** los clientes compran más productos por transacción (promedio: {hora_max_canasta['productos_en_canasta']:.2f} productos)")
-                    
-                    else:
-                        st.info("No se encontraron suficientes pares de productos para analizar")
-                
-                with subtab2:
-                    st.markdown("#### 🔍 Buscar Combinaciones por Producto")
-                    st.caption("Selecciona un producto para ver con qué otros productos se compra frecuentemente")
-                    
-                    # Selector de producto
-                    productos_en_canastas = sorted(df_transacciones_filtrado['producto'].unique())
-                    producto_buscar = st.selectbox(
-                        "Selecciona un producto:",
-                        productos_en_canastas,
-                        help="Elige un producto para ver sus combinaciones",
-                        key="selector_producto_canasta"
-                    )
-                    
-                    if producto_buscar:
-                        # Filtrar pares que contienen el producto seleccionado
-                        pares_producto = []
-                        for productos in canastas_multiples['producto']:
-                            if producto_buscar in productos and len(productos) >= 2:
-                                for otro_producto in productos:
-                                    if otro_producto != producto_buscar:
-                                        pares_producto.append(otro_producto)
-                        
-                        if len(pares_producto) > 0:
-                            contador_producto = Counter(pares_producto)
-                            top_combinaciones = contador_producto.most_common(15)
+                            # Líneas divisorias
+                            fig_bcg.add_hline(y=crecimiento_medio, line_dash="dash", line_color="gray", line_width=2)
+                            fig_bcg.add_vline(x=participacion_media, line_dash="dash", line_color="gray", line_width=2)
                             
-                            df_combinaciones = pd.DataFrame(top_combinaciones, columns=['Producto Combinado', 'Frecuencia'])
-                            df_combinaciones['Soporte (%)'] = (df_combinaciones['Frecuencia'] / len(canastas_multiples) * 100).round(2)
+                            # Etiquetas de cuadrantes
+                            max_x = bcg_data_plot['participacion'].max()
+                            min_x = bcg_data_plot['participacion'].min()
+                            max_y = bcg_data_plot['tasa_crecimiento_plot'].max()
+                            min_y = bcg_data_plot['tasa_crecimiento_plot'].min()
                             
-                            # Métricas del producto
-                            col1, col2, col3 = st.columns(3)
+                            fig_bcg.add_annotation(x=participacion_media + (max_x - participacion_media) * 0.5, 
+                                                   y=crecimiento_medio + (max_y - crecimiento_medio) * 0.9,
+                                                   text="⭐ ESTRELLAS", showarrow=False,
+                                                   font=dict(size=14, color='gray'))
                             
-                            total_apariciones = len([p for p in canastas_multiples['producto'] if producto_buscar in p])
+                            fig_bcg.add_annotation(x=participacion_media + (max_x - participacion_media) * 0.5,
+                                                   y=min_y + (crecimiento_medio - min_y) * 0.1,
+                                                   text="🐄 VACAS LECHERAS", showarrow=False,
+                                                   font=dict(size=14, color='gray'))
                             
-                            with col1:
-                                st.metric("🛒 Aparece en Transacciones", f"{total_apariciones:,}")
-                            with col2:
-                                st.metric("🔗 Productos Únicos Combinados", f"{len(contador_producto)}")
-                            with col3:
-                                combo_mas_frecuente = df_combinaciones.iloc[0]['Producto Combinado']
-                                st.metric("⭐ Combinación #1", combo_mas_frecuente[:30])
+                            fig_bcg.add_annotation(x=min_x + (participacion_media - min_x) * 0.5,
+                                                   y=crecimiento_medio + (max_y - crecimiento_medio) * 0.9,
+                                                   text="❓ INTERROGANTES", showarrow=False,
+                                                   font=dict(size=14, color='gray'))
                             
-                            st.divider()
+                            fig_bcg.add_annotation(x=min_x + (participacion_media - min_x) * 0.5,
+                                                   y=min_y + (crecimiento_medio - min_y) * 0.1,
+                                                   text="🐕 PERROS", showarrow=False,
+                                                   font=dict(size=14, color='gray'))
                             
-                            # Gráfico de barras
-                            max_combinaciones = min(15, len(df_combinaciones))
-                            if max_combinaciones > 5:
-                                num_mostrar_busqueda = st.slider(
-                                    "Cantidad a mostrar:",
-                                    min_value=5,
-                                    max_value=max_combinaciones,
-                                    value=min(10, max_combinaciones),
-                                    step=5,
-                                    key="slider_busqueda"
-                                )
-                            else:
-                                num_mostrar_busqueda = max_combinaciones
-                                st.info(f"Mostrando {num_mostrar_busqueda} combinaciones disponibles")
-                            
-                            df_combinaciones_plot = df_combinaciones.head(num_mostrar_busqueda)
-                            
-                            fig_combinaciones = go.Figure(data=[
-                                go.Bar(
-                                    y=df_combinaciones_plot['Producto Combinado'][::-1],
-                                    x=df_combinaciones_plot['Frecuencia'][::-1],
-                                    orientation='h',
-                                    marker_color='#32CD32',
-                                    text=df_combinaciones_plot['Frecuencia'][::-1],
-                                    textposition='auto',
-                                    hovertemplate='<b>%{y}</b><br>Frecuencia: %{x}<br>Soporte: %{customdata:.2f}%<extra></extra>',
-                                    customdata=df_combinaciones_plot['Soporte (%)'][::-1]
+                            fig_bcg.update_layout(
+                                height=600,
+                                showlegend=True,
+                                legend=dict(
+                                    orientation="v",
+                                    yanchor="top",
+                                    y=1,
+                                    xanchor="left",
+                                    x=1.02,
+                                    font=dict(size=12)
+                                ),
+                                plot_bgcolor='white',
+                                xaxis=dict(
+                                    title="Participación de Mercado (%)",
+                                    gridcolor='lightgray',
+                                    showgrid=True
+                                ),
+                                yaxis=dict(
+                                    title="Tasa de Crecimiento (%)",
+                                    gridcolor='lightgray',
+                                    showgrid=True
                                 )
-                            ])
-                            
-                            fig_combinaciones.update_layout(
-                                title=f"Productos que se compran con '{producto_buscar}'",
-                                xaxis_title="Frecuencia",
-                                yaxis_title="",
-                                height=max(400, num_mostrar_busqueda * 40),
-                                showlegend=False
                             )
-                            
-                            st.plotly_chart(fig_combinaciones, use_container_width=True)
-                            
-                            # Tabla detallada
-                            st.markdown("#### 📋 Tabla Detallada")
-                            st.dataframe(df_combinaciones_plot, use_container_width=True, hide_index=True)
-                            
-                            # Recomendaciones específicas
-                            st.markdown("#### 💡 Recomendaciones Específicas")
-                            
-                            top_3 = df_combinaciones.head(3)
-                            
-                            st.success(f"**Productos Top para Cross-Selling con '{producto_buscar}':**")
-                            for idx, row in top_3.iterrows():
-                                st.markdown(f"• **{row['Producto Combinado']}** - {row['Frecuencia']} veces ({row['Soporte (%)']}% de las transacciones)")
-                            
-                            st.info(f"💼 **Estrategia sugerida:** Cuando un cliente compre '{producto_buscar}', el personal debería sugerir estos productos para incrementar el ticket promedio.")
+                            return fig_bcg
                         
-                        else:
-                            st.warning(f"No se encontraron combinaciones para el producto '{producto_buscar}' en el período seleccionado.")
-     # ========== TAB 6: ANÁLISIS DE PICADAS ==========
-        with tab6:
-            st.markdown("### 🍽️ Análisis Inteligente de Picadas")
-            st.caption("Predicciones, tendencias y recomendaciones para optimizar la producción de picadas")
-            
-            # Lista de productos de picadas
-            PRODUCTOS_PICADAS = [
-                'TABLA SAN FRANCISCO CHICA', 'TABLA SAN FRANCISCO MEDIANA', 'TABLA SAN FRANCISCO GRANDE',
-                'TABLA CRIOLLA CHICA', 'TABLA CRIOLLA MEDIANA', 'TABLA CRIOLLA GRANDE',
-                'TABLA ITALIANA CHICA', 'TABLA ITALIANA MEDIANA', 'TABLA ITALIANA GRANDE',
-                'TABLA PAMPEANA CHICA', 'TABLA PAMPEANA MEDIANA', 'TABLA PAMPEANA GRANDE',
-                'TABLA IBERICA CHICA', 'TABLA IBERICA MEDIANA', 'TABLA IBERICA GRANDE',
-                'TABLA DE QUESOS CHICA', 'TABLA DE QUESOS MEDIANA', 'TABLA DE QUESOS GRANDE',
-                'TABLA CHACARERA CHICA', 'TABLA CHACARERA MEDIANA', 'TABLA CHACARERA GRANDE',
-                'TABLA TRADICIONAL CHICA', 'TABLA TRADICIONAL MEDIANA', 'TABLA TRADICIONAL GRANDE'
-            ]
-            
-            # Filtrar datos de picadas
-            df_picadas = df_temp[df_temp['producto'].isin(PRODUCTOS_PICADAS)].copy()
-            
-            if df_picadas.empty:
-                st.warning("⚠️ No se encontraron datos de picadas en el período seleccionado")
-            else:
-                # Crear tabs secundarios
-                subtab1, subtab2, subtab3, subtab4 = st.tabs([
-                    "📅 Predicción por Fechas",
-                    "📊 Análisis General",
-                    "🕐 Horarios Óptimos",
-                    "💡 Recomendaciones"
-                ])
-                
-                # ========== SUBTAB 1: PREDICCIÓN POR FECHAS ==========
-                with subtab1:
-                    st.markdown("#### 📅 Predicción de Ventas por Rango de Fechas")
-                    st.caption("Selecciona un período futuro para predecir cuántas picadas necesitarás")
-                    
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        fecha_inicio_pred = st.date_input(
-                            "Fecha Inicio:",
-                            value=df_picadas['fecha'].max() + pd.Timedelta(days=1),
-                            min_value=df_picadas['fecha'].min(),
-                            key="fecha_inicio_pred"
-                        )
-                    
-                    with col2:
-                        fecha_fin_pred = st.date_input(
-                            "Fecha Fin:",
-                            value=df_picadas['fecha'].max() + pd.Timedelta(days=7),
-                            min_value=fecha_inicio_pred,
-                            key="fecha_fin_pred"
-                        )
+                        fig_bcg = figuras.obtener_o_construir(clave_figura, figura_bcg)
+                        
+                        st.plotly_chart(fig_bcg, use_container_width=True)
+                        st.info(f"📊 **Comparación:** {periodo_comparacion}")
                     
-                    if st.button("🔮 Generar Predicción", type="primary"):
-                        # Convertir a datetime
-                        fecha_inicio_pred = pd.to_datetime(fecha_inicio_pred)
-                        fecha_fin_pred = pd.to_datetime(fecha_fin_pred)
+                if subtab2.open:
+                    with subtab2:
+                        st.markdown("### 🏆 Ranking de Productos")
+                        
+                        # Opciones de ranking
+                        col1, col2, col3 = st.columns([2, 1, 1])
                         
-                        # Calcular días de la semana en el rango
-                        dias_rango = pd.date_range(fecha_inicio_pred, fecha_fin_pred)
-                        dias_semana_rango = [dia.day_name() for dia in dias_rango]
-                        contador_dias = Counter(dias_semana_rango)
+                        with col1:
+                            criterio_ranking = control(
+                                st.selectbox,
+                                "Ordenar por:",
+                                "criterio_ranking",
+                                options=["📊 Unidades Vendidas", "📈 Participación de Mercado (%)", "🔥 Tasa de Crecimiento (%)", "🏷️ Categoría BCG"],
+                                help="Selecciona el criterio para ordenar los productos"
+                            )
                         
-                        st.markdown(f"### 📊 Predicción para {len(dias_rango)} días ({fecha_inicio_pred.strftime('%d/%m/%Y')} - {fecha_fin_pred.strftime('%d/%m/%Y')})")
+                        with col2:
+                            orden = control(st.radio, "Orden:", "orden_ranking",
+                                            options=["⬇️ Mayor a Menor", "⬆️ Menor a Mayor"], horizontal=True)
                         
-                        # Calcular promedio por día de la semana y por tipo de picada
-                        df_picadas_pred = df_picadas.copy()
-                        df_picadas_pred['tipo_picada'] = df_picadas_pred['producto'].str.extract(r'TABLA (.+?) (CHICA|MEDIANA|GRANDE)')[0]
-                        df_picadas_pred['tamaño'] = df_picadas_pred['producto'].str.extract(r'(CHICA|MEDIANA|GRANDE)')[0]
+                        with col3:
+                            limite = control(st.selectbox, "Mostrar:", "limite_ranking",
+                                             options=[10, 20, 50, 100, "Todos"], index=1)
                         
-                        # Promedio por día de semana y producto
-                        ventas_por_dia_producto = df_picadas_pred.groupby(['dia_semana', 'producto'])['cantidad'].sum().reset_index()
-                        dias_por_semana = df_picadas_pred.groupby('dia_semana')['fecha'].nunique()
+                        # Preparar datos para el ranking
+                        ranking_data = bcg_data.copy()
                         
-                        promedios = {}
-                        for dia in contador_dias.keys():
-                            if dia in dias_por_semana.index:
-                                productos_dia = ventas_por_dia_producto[ventas_por_dia_producto['dia_semana'] == dia]
-                                for _, row in productos_dia.iterrows():
-                                    producto = row['producto']
-                                    promedio = row['cantidad'] / dias_por_semana[dia]
-                                    if producto not in promedios:
-                                        promedios[producto] = {}
-                                    promedios[producto][dia] = promedio
+                        # Definir columna de ordenamiento
+                        if criterio_ranking == "📊 Unidades Vendidas":
+                            col_orden = 'cantidad'
+                        elif criterio_ranking == "📈 Participación de Mercado (%)":
+                            col_orden = 'participacion'
+                        elif criterio_ranking == "🔥 Tasa de Crecimiento (%)":
+                            col_orden = 'tasa_crecimiento'
+                        else:
+                            col_orden = 'categoria'
                         
-                        # Calcular predicción
-                        predicciones = {}
-                        for producto in PRODUCTOS_PICADAS:
-                            total_pred = 0
-                            for dia, count in contador_dias.items():
-                                if producto in promedios and dia in promedios[producto]:
-                                    total_pred += promedios[producto][dia] * count
-                            if total_pred > 0:
-                                predicciones[producto] = total_pred
+                        # Ordenar datos
+                        ascending = True if orden == "⬆️ Menor a Mayor" else False
+                        ranking_data = ranking_data.sort_values(col_orden, ascending=ascending).reset_index(drop=True)
                         
-                        if predicciones:
-                            # Crear DataFrame de predicciones
-                            df_pred = pd.DataFrame(list(predicciones.items()), columns=['Producto', 'Cantidad Estimada'])
-                            df_pred['Cantidad Estimada'] = df_pred['Cantidad Estimada'].round(0).astype(int)
-                            df_pred = df_pred.sort_values('Cantidad Estimada', ascending=False)
-                            
-                            # Extraer tipo y tamaño
-                            df_pred['Tipo'] = df_pred['Producto'].str.extract(r'TABLA (.+?) (CHICA|MEDIANA|GRANDE)')[0]
-                            df_pred['Tamaño'] = df_pred['Producto'].str.extract(r'(CHICA|MEDIANA|GRANDE)')[0]
-                            
-                            # Métricas generales
-                            col1, col2, col3 = st.columns(3)
+                        # Aplicar límite
+                        if limite != "Todos":
+                            ranking_data = ranking_data.head(limite)
+                        
+                        # Agregar columna de ranking
+                        ranking_data.insert(0, '#', range(1, len(ranking_data) + 1))
+                        
+                        # Preparar tabla para mostrar
+                        tabla_ranking = ranking_data[['#', 'producto', 'cantidad', 'participacion', 'tasa_crecimiento', 'categoria']].copy()
+                        tabla_ranking.columns = ['#', 'Producto', 'Unidades Vendidas', 'Participación (%)', 'Crecimiento (%)', 'Categoría BCG']
+                        
+                        # Formatear números
+                        tabla_ranking['Unidades Vendidas'] = tabla_ranking['Unidades Vendidas'].apply(lambda x: f"{int(x):,}")
+                        tabla_ranking['Participación (%)'] = tabla_ranking['Participación (%)'].apply(lambda x: f"{x:.2f}%")
+                        tabla_ranking['Crecimiento (%)'] = tabla_ranking['Crecimiento (%)'].apply(lambda x: f"{x:+.1f}%")
+                        
+                        # Mostrar tabla
+                        st.dataframe(
+                            tabla_ranking,
+                            use_container_width=True,
+                            hide_index=True,
+                            column_config={
+                                "#": st.column_config.NumberColumn("#", help="Posición en el ranking", width="small"),
+                                "Producto": st.column_config.TextColumn("Producto", width="large"),
+                                "Categoría BCG": st.column_config.TextColumn("Categoría BCG", width="medium")
+                            }
+                        )
+                        
+                        # Estadísticas del ranking
+                        with st.expander("📊 Ver Estadísticas del Ranking", expanded=False):
+                            col1, col2, col3, col4 = st.columns(4)
                             
-                            total_picadas = df_pred['Cantidad Estimada'].sum()
-                            promedio_diario = total_picadas / len(dias_rango)
-                            producto_top = df_pred.iloc[0]['Producto']
+                            productos_mostrados = len(tabla_ranking)
+                            total_unidades = ranking_data['cantidad'].sum()
+                            participacion_total = ranking_data['participacion'].sum()
+                            promedio_crecimiento = ranking_data['tasa_crecimiento'].mean()
                             
                             with col1:
-                                st.metric("🍽️ Total Picadas Estimadas", f"{int(total_picadas):,}")
+                                st.metric("📦 Productos", f"{productos_mostrados}")
                             with col2:
-                                st.metric("📊 Promedio Diario", f"{promedio_diario:.1f}")
+                                st.metric("🛒 Unidades Totales", f"{int(total_unidades):,}")
                             with col3:
-                                st.metric("⭐ Más Demandada", producto_top.split('TABLA ')[1][:20])
+                                st.metric("📈 Participación Total", f"{participacion_total:.1f}%")
+                            with col4:
+                                st.metric("📊 Crecimiento Promedio", f"{promedio_crecimiento:+.1f}%")
+                    
+                if subtab3.open:
+                    with subtab3:
+                        st.markdown("### 📋 Resumen por Categoría BCG")
+                        
+                        resumen_categorias = bcg_data.groupby('categoria').agg({
+                            'producto': 'count',
+                            'cantidad': 'sum',
+                            'participacion': 'sum'
+                        }).reset_index()
+                        resumen_categorias.columns = ['Categoría', 'Cantidad de Productos', 'Unidades Vendidas', 'Participación Total (%)']
+                        resumen_categorias['Participación Total (%)'] = resumen_categorias['Participación Total (%)'].round(2)
+                        
+                        st.dataframe(resumen_categorias, use_container_width=True, hide_index=True)
+                        
+                        # Gráficos de distribución
+                        col1, col2 = st.columns(2)
+                        
+                        with col1:
+                            clave_figura = ('bcg_productos_categoria', version_datos, clave_periodo, umbral_bcg)
                             
-                            st.divider()
+                            def figura_dist_cat():
+                                fig_dist_cat = go.Figure(data=[
+                                    go.Pie(
+                                        labels=resumen_categorias['Categoría'],
+                                        values=resumen_categorias['Cantidad de Productos'],
+                                        hole=0.4,
+                                        marker=dict(colors=['#FFD700', '#32CD32', '#1E90FF', '#DC143C'])
+                                    )
+                                ])
+                                fig_dist_cat.update_layout(title="Productos por Categoría", height=350)
+                                return fig_dist_cat
                             
-                            # Gráfico por tipo de picada
-                            st.markdown("#### 📊 Distribución por Tipo de Picada")
+                            fig_dist_cat = figuras.obtener_o_construir(clave_figura, figura_dist_cat)
+                            st.plotly_chart(fig_dist_cat, use_container_width=True)
+                        
+                        with col2:
+                            clave_figura = ('bcg_ventas_categoria', version_datos, clave_periodo, umbral_bcg)
                             
-                            ventas_por_tipo = df_pred.groupby('Tipo')['Cantidad Estimada'].sum().reset_index()
-                            ventas_por_tipo = ventas_por_tipo.sort_values('Cantidad Estimada', ascending=False)
+                            def figura_dist_ventas():
+                                fig_dist_ventas = go.Figure(data=[
+                                    go.Pie(
+                                        labels=resumen_categorias['Categoría'],
+                                        values=resumen_categorias['Unidades Vendidas'],
+                                        hole=0.4,
+                                        marker=dict(colors=['#FFD700', '#32CD32', '#1E90FF', '#DC143C'])
+                                    )
+                                ])
+                                fig_dist_ventas.update_layout(title="Ventas por Categoría", height=350)
+                                return fig_dist_ventas
                             
-                            fig_tipo = go.Figure(data=[
-                                go.Bar(
-                                    x=ventas_por_tipo['Tipo'],
-                                    y=ventas_por_tipo['Cantidad Estimada'],
-                                    marker_color='#FFD700',
-                                    text=ventas_por_tipo['Cantidad Estimada'],
-                                    textposition='auto'
-                                )
-                            ])
+                            fig_dist_ventas = figuras.obtener_o_construir(clave_figura, figura_dist_ventas)
+                            st.plotly_chart(fig_dist_ventas, use_container_width=True)
+                        
+                        # Top productos por categoría
+                        with st.expander("⭐ Ver Top Productos por Categoría", expanded=False):
+                            col1, col2 = st.columns(2)
                             
-                            fig_tipo.update_layout(
-                                xaxis_title="Tipo de Picada",
-                                yaxis_title="Unidades Estimadas",
-                                height=400,
-                                showlegend=False
-                            )
+                            with col1:
+                                st.markdown("#### ⭐ Top 5 Estrellas")
+                                estrellas = bcg_data[bcg_data['categoria'] == '⭐ Estrella'].nlargest(5, 'cantidad')[['producto', 'cantidad', 'tasa_crecimiento']]
+                                if not estrellas.empty:
+                                    estrellas['tasa_crecimiento'] = estrellas['tasa_crecimiento'].round(1).astype(str) + '%'
+                                    st.dataframe(estrellas, use_container_width=True, hide_index=True)
+                                else:
+                                    st.info("No hay productos en esta categoría")
                             
-                            st.plotly_chart(fig_tipo, use_container_width=True)
+                            with col2:
+                                st.markdown("#### 🐕 Top 5 Perros (considerar eliminar)")
+                                perros = bcg_data[bcg_data['categoria'] == '🐕 Perro'].nsmallest(5, 'cantidad')[['producto', 'cantidad', 'tasa_crecimiento']]
+                                if not perros.empty:
+                                    perros['tasa_crecimiento'] = perros['tasa_crecimiento'].round(1).astype(str) + '%'
+                                    st.dataframe(perros, use_container_width=True, hide_index=True)
+                                else:
+                                    st.info("No hay productos en esta categoría")
+                
+                if subtab4.open:
+                    with subtab4:
+                        st.markdown("### 🔄 Transiciones entre Cuadrantes")
+                        st.caption("Cómo cambió la categoría BCG de cada producto entre dos meses")
+                        
+                        historial_bcg = cargar_historial_bcg(version_datos, umbral_bcg, cubo)
+                        meses_historial = sorted(historial_bcg['mes'].unique())
+                        
+                        if len(meses_historial) < 2:
+                            st.info("Se necesitan al menos dos meses con ventas para comparar")
+                        else:
+                            def nombre_mes(mes):
+                                return f"{meses_español[mes.month]} {mes.year}"
                             
-                            # Gráfico por tamaño
                             col1, col2 = st.columns(2)
-                            
                             with col1:
-                                st.markdown("#### 📏 Distribución por Tamaño")
-                                ventas_por_tamaño = df_pred.groupby('Tamaño')['Cantidad Estimada'].sum().reset_index()
-                                orden_tamaño = {'CHICA': 1, 'MEDIANA': 2, 'GRANDE': 3}
-                                ventas_por_tamaño['orden'] = ventas_por_tamaño['Tamaño'].map(orden_tamaño)
-                                ventas_por_tamaño = ventas_por_tamaño.sort_values('orden')
-                                
-                                fig_tamaño = go.Figure(data=[
-                                    go.Pie(
-                                        labels=ventas_por_tamaño['Tamaño'],
-                                        values=ventas_por_tamaño['Cantidad Estimada'],
-                                        hole=0.4,
-                                        marker=dict(colors=['#32CD32', '#FFD700', '#FF6347'])
-                                    )
-                                ])
-                                fig_tamaño.update_layout(height=350)
-                                st.plotly_chart(fig_tamaño, use_container_width=True)
-                            
+                                mes_desde = control(st.selectbox, "Desde:", "bcg_mes_desde", options=meses_historial,
+                                                    index=len(meses_historial) - 2, format_func=nombre_mes)
                             with col2:
-                                st.markdown("#### 📋 Resumen por Tamaño")
-                                tabla_tamaño = ventas_por_tamaño[['Tamaño', 'Cantidad Estimada']].copy()
-                                tabla_tamaño['Porcentaje'] = (tabla_tamaño['Cantidad Estimada'] / tabla_tamaño['Cantidad Estimada'].sum() * 100).round(1).astype(str) + '%'
-                                st.dataframe(tabla_tamaño[['Tamaño', 'Cantidad Estimada', 'Porcentaje']], use_container_width=True, hide_index=True)
-                                
-                                st.markdown("---")
-                                st.markdown("**💡 Tip de Producción:**")
-                                tamaño_preferido = tabla_tamaño.iloc[0]['Tamaño']
-                                st.info(f"El tamaño **{tamaño_preferido}** representa el {tabla_tamaño.iloc[0]['Porcentaje']} de las ventas. Prioriza su producción.")
+                                mes_hasta = control(st.selectbox, "Hasta:", "bcg_mes_hasta", options=meses_historial,
+                                                    index=len(meses_historial) - 1, format_func=nombre_mes)
                             
-                            st.divider()
+                            cambios, matriz_transiciones = bcg_matrix.transiciones_bcg(historial_bcg, mes_desde, mes_hasta)
                             
-                            # Tabla detallada completa
-                            st.markdown("#### 📋 Lista Completa de Producción")
+                            clave_figura = ('transiciones_bcg', version_datos, umbral_bcg, mes_desde, mes_hasta)
                             
-                            # Agrupar por tipo para mejor visualización
-                            for tipo in ventas_por_tipo['Tipo'].values:
-                                with st.expander(f"🍽️ TABLA {tipo}", expanded=(tipo == ventas_por_tipo.iloc[0]['Tipo'])):
-                                    df_tipo = df_pred[df_pred['Tipo'] == tipo][['Tamaño', 'Cantidad Estimada']].copy()
-                                    df_tipo = df_tipo.sort_values('Tamaño', key=lambda x: x.map(orden_tamaño))
-                                    
-                                    total_tipo = df_tipo['Cantidad Estimada'].sum()
-                                    st.metric(f"Total {tipo}", f"{int(total_tipo)} unidades")
-                                    
-                                    st.dataframe(df_tipo, use_container_width=True, hide_index=True)
+                            def figura_transiciones():
+                                fig_transiciones = go.Figure(data=go.Heatmap(
+                                    z=matriz_transiciones.values,
+                                    x=matriz_transiciones.columns.tolist(),
+                                    y=matriz_transiciones.index.tolist(),
+                                    colorscale='Blues',
+                                    text=matriz_transiciones.values,
+                                    texttemplate='%{text}',
+                                    hovertemplate='%{y} → %{x}<br>Productos: %{z}<extra></extra>'
+                                ))
+                                fig_transiciones.update_layout(
+                                    title=f"Productos por cuadrante: {nombre_mes(mes_desde)} → {nombre_mes(mes_hasta)}",
+                                    xaxis_title=nombre_mes(mes_hasta),
+                                    yaxis_title=nombre_mes(mes_desde),
+                                    yaxis=dict(autorange='reversed'),
+                                    height=450
+                                )
+                                return fig_transiciones
                             
-                            # Distribución por día de la semana
-                            st.divider()
-                            st.markdown("#### 📅 Distribución Estimada por Día de la Semana")
-                            
-                            dias_texto = [dias_español[d] for d in dias_semana_rango]
-                            contador_dias_español = Counter(dias_texto)
-                            
-                            # Calcular ventas promedio por día de la semana
-                            ventas_dia_semana = df_picadas.groupby('dia_semana')['cantidad'].sum() / df_picadas.groupby('dia_semana')['fecha'].nunique()
-                            ventas_dia_semana = ventas_dia_semana.reset_index()
-                            ventas_dia_semana['dia_español'] = ventas_dia_semana['dia_semana'].map(dias_español)
-                            
-                            # Crear predicción por día
-                            pred_por_dia = []
-                            for dia_eng, dia_esp in dias_español.items():
-                                if dia_esp in contador_dias_español:
-                                    cantidad_dias = contador_dias_español[dia_esp]
-                                    if dia_eng in ventas_dia_semana['dia_semana'].values:
-                                        promedio = ventas_dia_semana[ventas_dia_semana['dia_semana'] == dia_eng]['cantidad'].values[0]
-                                        pred_por_dia.append({
-                                            'Día': dia_esp,
-                                            'Días en Período': cantidad_dias,
-                                            'Promedio por Día': promedio,
-                                            'Total Estimado': promedio * cantidad_dias
-                                        })
-                            
-                            df_pred_dias = pd.DataFrame(pred_por_dia)
-                            df_pred_dias = df_pred_dias.set_index('Día').reindex([dias_español[d] for d in dias_orden if dias_español[d] in df_pred_dias.index]).reset_index()
-                            df_pred_dias['Promedio por Día'] = df_pred_dias['Promedio por Día'].round(1)
-                            df_pred_dias['Total Estimado'] = df_pred_dias['Total Estimado'].round(0).astype(int)
-                            
-                            col1, col2 = st.columns([2, 1])
+                            fig_transiciones = figuras.obtener_o_construir(clave_figura, figura_transiciones)
+                            st.plotly_chart(fig_transiciones, use_container_width=True)
                             
+                            col1, col2 = st.columns(2)
                             with col1:
-                                fig_dias_pred = go.Figure(data=[
-                                    go.Bar(
-                                        x=df_pred_dias['Día'],
-                                        y=df_pred_dias['Total Estimado'],
-                                        marker_color='#1E90FF',
-                                        text=df_pred_dias['Total Estimado'],
-                                        textposition='auto'
-                                    )
-                                ])
-                                
-                                fig_dias_pred.update_layout(
-                                    xaxis_title="Día de la Semana",
-                                    yaxis_title="Picadas Estimadas",
-                                    height=350,
-                                    showlegend=False
-                                )
-                                
-                                st.plotly_chart(fig_dias_pred, use_container_width=True)
-                            
+                                categoria_desde = control(st.selectbox, "Categoría de origen:", "bcg_categoria_desde",
+                                                          options=bcg_matrix.CATEGORIAS,
+                                                          index=bcg_matrix.CATEGORIAS.index(bcg_matrix.ESTRELLA))
                             with col2:
-                                st.markdown("**📊 Tabla Detallada**")
-                                st.dataframe(df_pred_dias, use_container_width=True, hide_index=True)
-                        
-                        else:
-                            st.warning("No hay suficientes datos históricos para generar predicciones confiables")
+                                categoria_hasta = control(st.selectbox, "Categoría de destino:", "bcg_categoria_hasta",
+                                                          options=bcg_matrix.CATEGORIAS,
+                                                          index=bcg_matrix.CATEGORIAS.index(bcg_matrix.PERRO))
+                            
+                            movidos = cambios[
+                                (cambios['categoria_desde'] == categoria_desde) &
+                                (cambios['categoria_hasta'] == categoria_hasta)
+                            ].sort_values('cantidad', ascending=False)
+                            
+                            st.markdown(f"#### {categoria_desde} → {categoria_hasta}: {len(movidos)} productos")
+                            if not movidos.empty:
+                                st.dataframe(
+                                    movidos[['producto', 'cantidad']].rename(columns={
+                                        'producto': 'Producto',
+                                        'cantidad': f'Unidades {nombre_mes(mes_hasta)}'
+                                    }),
+                                    use_container_width=True,
+                                    hide_index=True
+                                )
+                            else:
+                                st.info("Ningún producto hizo esta transición")
+                
+        # ========== TAB 4: BÚSQUEDA DETALLADA ==========
+        if tab4.open:
+            with tab4:
+                # Mismo umbral que la Matriz BCG: el valor que guarda su radio, aunque esa pestaña esté cerrada
+                bcg_data, _, _ = calcular_datos_bcg(
+                    version_datos, clave_periodo, cubo, cubo_analisis, mes_bcg, fecha_mitad,
+                    st.session_state.get("umbral_bcg", "mediana"))
                 
-                # ========== SUBTAB 2: ANÁLISIS GENERAL ==========
-                with subtab2:
-                    st.markdown("#### 📊 Análisis General de Picadas")
+                st.markdown("### 🔍 Buscador de Productos")
+                st.caption("Busca y analiza cualquier producto en detalle")
+                
+                # Selector de producto
+                productos_disponibles = sorted(cubo_analisis['producto'].unique())
+                producto_seleccionado = control(
+                    st.selectbox,
+                    "Selecciona un producto:",
+                    "producto_busqueda",
+                    options=productos_disponibles,
+                    help="Elige un producto para ver su análisis completo"
+                )
+                
+                if producto_seleccionado:
+                    # Filtrar datos del producto
+                    df_producto = cubo_analisis[cubo_analisis['producto'] == producto_seleccionado]
                     
-                    # Extraer tipo y tamaño
-                    df_picadas_analysis = df_picadas.copy()
-                    df_picadas_analysis['tipo_picada'] = df_picadas_analysis['producto'].str.extract(r'TABLA (.+?) (CHICA|MEDIANA|GRANDE)')[0]
-                    df_picadas_analysis['tamaño'] = df_picadas_analysis['producto'].str.extract(r'(CHICA|MEDIANA|GRANDE)')[0]
+                    # Obtener información BCG del producto
+                    info_bcg = bcg_data[bcg_data['producto'] == producto_seleccionado].iloc[0]
                     
-                    # Métricas generales
-                    total_vendido = df_picadas_analysis['cantidad'].sum()
-                    tipos_unicos = df_picadas_analysis['tipo_picada'].nunique()
-                    promedio_diario = total_vendido / df_picadas_analysis['fecha'].nunique()
-                    picada_mas_vendida = df_picadas_analysis.groupby('producto')['cantidad'].sum().idxmax()
+                    # Métricas principales del producto
+                    st.markdown(f"### 📦 {producto_seleccionado}")
                     
-                    col1, col2, col3, col4 = st.columns(4)
+                    col1, col2, col3, col4, col5 = st.columns(5)
                     
                     with col1:
-                        st.metric("🍽️ Total Picadas Vendidas", f"{int(total_vendido):,}")
+                        st.metric("🏷️ Categoría BCG", info_bcg['categoria'])
                     with col2:
-                        st.metric("📊 Promedio Diario", f"{promedio_diario:.1f}")
+                        st.metric("📊 Unidades Vendidas", f"{int(info_bcg['cantidad']):,}")
                     with col3:
-                        st.metric("🎯 Tipos Diferentes", f"{tipos_unicos}")
+                        st.metric("📈 Participación", f"{info_bcg['participacion']:.2f}%")
                     with col4:
-                        st.metric("⭐ Más Vendida", picada_mas_vendida.split('TABLA ')[1][:15] + "...")
-                    
-                    st.divider()
-                    
-                    # Ranking de picadas
-                    st.markdown("#### 🏆 Ranking de Picadas")
-                    
-                    ranking_picadas = df_picadas_analysis.groupby('producto')['cantidad'].sum().reset_index()
-                    ranking_picadas = ranking_picadas.sort_values('cantidad', ascending=False).reset_index(drop=True)
-                    ranking_picadas['participacion'] = (ranking_picadas['cantidad'] / ranking_picadas['cantidad'].sum() * 100).round(2)
-                    ranking_picadas.insert(0, '#', range(1, len(ranking_picadas) + 1))
-                    ranking_picadas.columns = ['#', 'Picada', 'Unidades Vendidas', 'Participación (%)']
-                    
-                    # Mostrar top 10
-                    st.dataframe(ranking_picadas.head(10), use_container_width=True, hide_index=True)
-                    
-                    with st.expander("📋 Ver Ranking Completo", expanded=False):
-                        st.dataframe(ranking_picadas, use_container_width=True, hide_index=True)
+                        st.metric("📉 Crecimiento", f"{info_bcg['tasa_crecimiento']:.1f}%")
+                    with col5:
+                        ranking = bcg_data['cantidad'].rank(ascending=False)[bcg_data['producto'] == producto_seleccionado].values[0]
+                        st.metric("🏆 Ranking", f"#{int(ranking)}")
                     
                     st.divider()
                     
-                    # Análisis por tipo
+                    # Gráficos del producto en dos columnas
                     col1, col2 = st.columns(2)
                     
                     with col1:
-                        st.markdown("#### 📊 Ventas por Tipo de Picada")
-                        ventas_tipo = df_picadas_analysis.groupby('tipo_picada')['cantidad'].sum().reset_index()
-                        ventas_tipo = ventas_tipo.sort_values('cantidad', ascending=False)
+                        # Ventas por día de la semana
+                        st.markdown("#### 📅 Ventas por Día de la Semana")
+                        ventas_dia = df_producto.groupby('dia_semana')['cantidad'].sum().reset_index()
+                        ventas_dia['dia_semana'] = ventas_dia['dia_semana'].map(dias_español)
+                        ventas_dia = ventas_dia.set_index('dia_semana').reindex([dias_español[d] for d in dias_orden if d in df_producto['dia_semana'].unique()])
                         
-                        fig_tipo_general = go.Figure(data=[
-                            go.Bar(
-                                x=ventas_tipo['tipo_picada'],
-                                y=ventas_tipo['cantidad'],
-                                marker_color='#FFD700',
-                                text=ventas_tipo['cantidad'],
-                                textposition='auto'
-                            )
-                        ])
+                        clave_figura = ('producto_dia_semana', version_datos, clave_periodo, producto_seleccionado)
                         
-                        fig_tipo_general.update_layout(
-                            xaxis_title="Tipo",
-                            yaxis_title="Unidades",
-                            height=400,
-                            showlegend=False,
-                            xaxis=dict(tickangle=-45)
-                        )
+                        def figura_dias():
+                            fig_dias = go.Figure(data=[
+                                go.Bar(x=ventas_dia.index, y=ventas_dia['cantidad'].values, 
+                                       marker_color='#1E90FF',
+                                       text=ventas_dia['cantidad'].values,
+                                       textposition='auto')
+                            ])
+                            fig_dias.update_layout(
+                                height=350,
+                                xaxis_title="Día",
+                                yaxis_title="Unidades",
+                                showlegend=False
+                            )
+                            return fig_dias
                         
-                        st.plotly_chart(fig_tipo_general, use_container_width=True)
+                        fig_dias = figuras.obtener_o_construir(clave_figura, figura_dias)
+                        st.plotly_chart(fig_dias, use_container_width=True)
                     
                     with col2:
-                        st.markdown("#### 📏 Ventas por Tamaño")
-                        ventas_tamaño = df_picadas_analysis.groupby('tamaño')['cantidad'].sum().reset_index()
-                        orden_tamaño = {'CHICA': 1, 'MEDIANA': 2, 'GRANDE': 3}
-                        ventas_tamaño['orden'] = ventas_tamaño['tamaño'].map(orden_tamaño)
-                        ventas_tamaño = ventas_tamaño.sort_values('orden')
+                        # Ventas por hora
+                        st.markdown("#### 🕐 Ventas por Hora del Día")
+                        ventas_hora = df_producto.groupby('hora_num')['cantidad'].sum().reset_index()
                         
-                        fig_tamaño_general = go.Figure(data=[
-                            go.Pie(
-                                labels=ventas_tamaño['tamaño'],
-                                values=ventas_tamaño['cantidad'],
-                                hole=0.4,
-                                marker=dict(colors=['#32CD32', '#FFD700', '#FF6347']),
-                                textinfo='label+percent',
-                                textposition='auto'
+                        clave_figura = ('producto_hora', version_datos, clave_periodo, producto_seleccionado)
+                        
+                        def figura_horas():
+                            fig_horas = go.Figure(data=[
+                                go.Scatter(x=ventas_hora['hora_num'], y=ventas_hora['cantidad'],
+                                          mode='lines+markers',
+                                          line=dict(color='#32CD32', width=3),
+                                          marker=dict(size=8),
+                                          fill='tozeroy',
+                                          fillcolor='rgba(50,205,50,0.2)')
+                            ])
+                            fig_horas.update_layout(
+                                height=350,
+                                xaxis_title="Hora",
+                                yaxis_title="Unidades",
+                                showlegend=False,
+                                xaxis=dict(dtick=2)
                             )
-                        ])
+                            return fig_horas
                         
-                        fig_tamaño_general.update_layout(height=400)
-                        st.plotly_chart(fig_tamaño_general, use_container_width=True)
-                    
-                    st.divider()
+                        fig_horas = figuras.obtener_o_construir(clave_figura, figura_horas)
+                        st.plotly_chart(fig_horas, use_container_width=True)
                     
                     # Tendencia temporal
-                    st.markdown("#### 📈 Tendencia de Ventas en el Tiempo")
-                    
-                    ventas_tiempo = df_picadas_analysis.groupby('fecha')['cantidad'].sum().reset_index()
-                    
-                    fig_tendencia = go.Figure(data=[
-                        go.Scatter(
-                            x=ventas_tiempo['fecha'],
-                            y=ventas_tiempo['cantidad'],
-                            mode='lines+markers',
-                            line=dict(color='#1E90FF', width=2),
-                            marker=dict(size=6),
-                            fill='tozeroy',
-                            fillcolor='rgba(30,144,255,0.2)'
+                    with st.expander("📈 Ver Tendencia de Ventas en el Tiempo", expanded=True):
+                        df_producto_tiempo = df_producto
+                        ventas_tiempo = df_producto_tiempo.groupby('fecha')['cantidad'].sum().reset_index()
+                        ventas_grafico = serie_para_grafico(ventas_tiempo, f"zoom_tendencia_{producto_seleccionado}")
+                        
+                        fig_tendencia = go.Figure(data=[
+                            go.Scatter(x=ventas_grafico['fecha'], y=ventas_grafico['cantidad'],
+                                      mode='lines+markers',
+                                      line=dict(color='#FFD700', width=2),
+                                      marker=dict(size=6),
+                                      fill='tozeroy',
+                                      fillcolor='rgba(255,215,0,0.2)')
+                        ])
+                        fig_tendencia.update_layout(
+                            height=300,
+                            xaxis_title="Fecha",
+                            yaxis_title="Unidades Vendidas",
+                            showlegend=False
                         )
-                    ])
-                    
-                    # Agregar línea de promedio
-                    promedio_general = ventas_tiempo['cantidad'].mean()
-                    fig_tendencia.add_hline(y=promedio_general, line_dash="dash", line_color="red", 
-                                           annotation_text=f"Promedio: {promedio_general:.1f}",
-                                           annotation_position="right")
+                        st.plotly_chart(fig_tendencia, use_container_width=True)
                     
-                    fig_tendencia.update_layout(
-                        xaxis_title="Fecha",
-                        yaxis_title="Picadas Vendidas",
-                        height=400,
-                        showlegend=False
+                    # Estadísticas adicionales
+                    with st.expander("📊 Ver Estadísticas Detalladas", expanded=False):
+                        col1, col2, col3 = st.columns(3)
+                        
+                        with col1:
+                            st.markdown("##### 📊 Estadísticas")
+                            promedio_diario = acumulados.promedio_productos(desde_sel, hasta_sel)[producto_seleccionado]
+                            st.write(f"**Promedio diario:** {promedio_diario:.1f} unidades")
+                            st.write(f"**Máximo en un día:** {ventas_tiempo['cantidad'].max():.0f} unidades")
+                            st.write(f"**Mínimo en un día:** {ventas_tiempo['cantidad'].min():.0f} unidades")
+                        
+                        with col2:
+                            st.markdown("##### 🕐 Hora Pico")
+                            hora_pico_prod = ventas_hora.loc[ventas_hora['cantidad'].idxmax(), 'hora_num']
+                            cantidad_hora_pico = ventas_hora['cantidad'].max()
+                            st.write(f"**Mejor hora:** {int(hora_pico_prod)}:00 hs")
+                            st.write(f"**Ventas en pico:** {int(cantidad_hora_pico)} unidades")
+                        
+                        with col3:
+                            st.markdown("##### 📅 Día Pico")
+                            dia_pico_prod = ventas_dia['cantidad'].idxmax()
+                            cantidad_dia_pico = ventas_dia['cantidad'].max()
+                            st.write(f"**Mejor día:** {dia_pico_prod}")
+                            st.write(f"**Ventas en pico:** {int(cantidad_dia_pico)} unidades")
+            
+        # ========== TAB 5: ANÁLISIS DE CANASTAS ==========
+        if tab5.open:
+            with tab5:
+                st.markdown("### 🛒 Análisis de Canastas de Compra")
+                st.caption("Descubre qué productos se compran juntos en la misma transacción")
+                
+                # Productos a excluir del análisis
+                PRODUCTOS_EXCLUIR = ["BAGUETTES CHICOS"]
+                
+                # Renglones separados por a lo sumo la ventana elegida forman una transacción
+                brecha_transaccion = control(
+                    st.slider,
+                    "Ventana de agrupación de transacciones (segundos):",
+                    "slider_brecha_transaccion",
+                    min_value=0,
+                    max_value=300,
+                    value=0,
+                    step=5,
+                    help="0 = solo se agrupan los renglones con la misma fecha y hora. "
+                         "Útil si el punto de venta registra los ítems de una compra con segundos de diferencia"
+                )
+                
+                # El período se mina por meses, que se reutilizan entre selecciones; de un
+                # rango de fechas solo se minan aparte los tramos de los meses de los extremos
+                if mes_num_sel is None:
+                    meses_datos = zip(indice_periodos.meses['año'], indice_periodos.meses['mes_num'])
+                    meses_canastas = tuple((int(a), int(m)) for a, m in meses_datos
+                                           if desde_sel is None or desde_sel.to_period('M') <= pd.Period(year=a, month=m, freq='M')
+                                           <= (hasta_sel - pd.Timedelta(days=1)).to_period('M'))
+                else:
+                    meses_canastas = ((año_sel, mes_num_sel),)
+                canastas, indice_coocurrencias, horas_transaccion = calcular_canastas(
+                    version_datos, clave_periodo, tuple(PRODUCTOS_EXCLUIR), brecha_transaccion,
+                    meses_canastas, df_temp, indice_periodos, desde_sel, hasta_sel)
+                lineas_por_canasta = pd.Series(canastas.lineas)
+                
+                # Transacciones con más de 1 producto: base del soporte
+                es_multiple = canastas.lineas > 1
+                
+                # Métricas generales
+                st.markdown("#### 📊 Estadísticas Generales")
+                st.caption(f"⚠️ Productos excluidos del análisis: {', '.join(PRODUCTOS_EXCLUIR)}")
+                
+                col1, col2, col3, col4 = st.columns(4)
+                
+                total_transacciones = len(lineas_por_canasta)
+                transacciones_multiples = int(es_multiple.sum())
+                pct_multiples = (transacciones_multiples / total_transacciones * 100) if total_transacciones > 0 else 0
+                promedio_productos = lineas_por_canasta.mean()
+                
+                with col1:
+                    st.metric(
+                        "🛒 Total Transacciones",
+                        f"{total_transacciones:,}",
+                        help="Número total de compras registradas"
                     )
-                    
-                    st.plotly_chart(fig_tendencia, use_container_width=True)
-                    
-                    # Ventas por día de la semana
-                    st.markdown("#### 📅 Ventas por Día de la Semana")
-                    
-                    ventas_dia_picadas = df_picadas_analysis.groupby('dia_semana')['cantidad'].sum().reset_index()
-                    ventas_dia_picadas = ventas_dia_picadas.set_index('dia_semana').reindex(dias_orden).reset_index()
-                    ventas_dia_picadas['dia_español'] = ventas_dia_picadas['dia_semana'].map(dias_español)
-                    
-                    fig_dias_picadas = go.Figure(data=[
-                        go.Bar(
-                            x=ventas_dia_picadas['dia_español'],
-                            y=ventas_dia_picadas['cantidad'],
-                            marker_color='#32CD32',
-                            text=ventas_dia_picadas['cantidad'],
-                            textposition='auto'
-                        )
-                    ])
-                    
-                    fig_dias_picadas.update_layout(
-                        xaxis_title="Día de la Semana",
-                        yaxis_title="Picadas Vendidas",
-                        height=400,
-                        showlegend=False
+                
+                with col2:
+                    st.metric(
+                        "📦 Transacciones Múltiples",
+                        f"{transacciones_multiples:,}",
+                        delta=f"{pct_multiples:.1f}%",
+                        help="Compras con más de 1 producto"
                     )
-                    
-                    st.plotly_chart(fig_dias_picadas, use_container_width=True)
                 
-                # ========== SUBTAB 3: HORARIOS ÓPTIMOS ==========
-                with subtab3:
-                    st.markdown("#### 🕐 Análisis de Horarios Óptimos")
-                    st.caption("Identifica los mejores momentos para tener picadas armadas y listas")
-                    
-                    # Ventas por hora
-                    ventas_hora_picadas = df_picadas.groupby('hora_num')['cantidad'].sum().reset_index()
-                    
-                    # Identificar horas pico
-                    promedio_hora = ventas_hora_picadas['cantidad'].mean()
-                    horas_pico = ventas_hora_picadas[ventas_hora_picadas['cantidad'] >= promedio_hora * 1.2]
-                    
-                    col1, col2, col3 = st.columns(3)
-                    
-                    hora_max = ventas_hora_picadas.loc[ventas_hora_picadas['cantidad'].idxmax(), 'hora_num']
-                    cantidad_max = ventas_hora_picadas['cantidad'].max()
-                    
-                    with col1:
-                        st.metric("🔥 Hora Pico", f"{int(hora_max)}:00 hs")
-                    with col2:
-                        st.metric("📊 Ventas en Pico", f"{int(cantidad_max)} picadas")
-                    with col3:
-                        st.metric("⏰ Horarios Destacados", f"{len(horas_pico)} horas")
-                    
-                    st.divider()
-                    
-                    # Gráfico de ventas por hora
-                    st.markdown("#### 📊 Distribución de Ventas por Hora")
-                    
-                    fig_hora_picadas = go.Figure()
-                    
-                    fig_hora_picadas.add_trace(go.Scatter(
-                        x=ventas_hora_picadas['hora_num'],
-                        y=ventas_hora_picadas['cantidad'],
-                        mode='lines+markers',
-                        line=dict(color='#FFD700', width=3),
-                        marker=dict(size=10),
-                        fill='tozeroy',
-                        fillcolor='rgba(255,215,0,0.3)',
-                        name='Ventas'
-                    ))
-                    
-                    # Línea de promedio
-                    fig_hora_picadas.add_hline(y=promedio_hora, line_dash="dash", line_color="red",
-                                              annotation_text=f"Promedio: {promedio_hora:.1f}",
-                                              annotation_position="right")
-                    
-                    # Marcar horas pico
-                    fig_hora_picadas.add_trace(go.Scatter(
-                        x=horas_pico['hora_num'],
-                        y=horas_pico['cantidad'],
-                        mode='markers',
-                        marker=dict(size=15, color='red', symbol='star'),
-                        name='Horas Pico'
-                    ))
-                    
-                    fig_hora_picadas.update_layout(
-                        xaxis_title="Hora del Día",
-                        yaxis_title="Picadas Vendidas",
-                        height=450,
-                        xaxis=dict(dtick=1),
-                        showlegend=True
+                with col3:
+                    st.metric(
+                        "📊 Promedio Productos/Venta",
+                        f"{promedio_productos:.1f}",
+                        help="Cantidad promedio de productos por transacción"
                     )
-                    
-                    st.plotly_chart(fig_hora_picadas, use_container_width=True)
-                    
-                    st.divider()
-                    
-                    # Heatmap día x hora
-                    st.markdown("#### 🔥 Heatmap: Día vs Hora")
-                    
-                    ventas_dia_hora = df_picadas.groupby(['dia_semana', 'hora_num'])['cantidad'].sum().reset_index()
-                    matriz_dia_hora = ventas_dia_hora.pivot(index='dia_semana', columns='hora_num', values='cantidad').fillna(0)
-                    matriz_dia_hora = matriz_dia_hora.reindex(dias_orden)
-                    matriz_dia_hora.index = [dias_español[d] for d in matriz_dia_hora.index]
-                    
-                    fig_heatmap_picadas = go.Figure(data=go.Heatmap(
-                        z=matriz_dia_hora.values,
-                        x=[f"{int(h)}:00" for h in matriz_dia_hora.columns],
-                        y=matriz_dia_hora.index,
-                        colorscale='YlOrRd',
-                        text=matriz_dia_hora.values.astype(int),
-                        texttemplate='%{text}',
-                        textfont={"size": 10},
-                        colorbar=dict(title="Picadas<br>vendidas")
-                    ))
-                    
-                    fig_heatmap_picadas.update_layout(
-                        xaxis_title="Hora del Día",
-                        yaxis_title="Día de la Semana",
-                        height=500
+                
+                with col4:
+                    max_productos = lineas_por_canasta.max()
+                    st.metric(
+                        "🎯 Máximo en una Venta",
+                        f"{max_productos}",
+                        help="Mayor cantidad de productos en una sola transacción"
                     )
-                    
-                    st.plotly_chart(fig_heatmap_picadas, use_container_width=True)
-                    
-                    st.divider()
-                    
-                    # Recomendaciones de pre-armado
-                    st.markdown("#### 💡 Recomendaciones de Pre-Armado")
-                    
+                
+                st.divider()
+                
+                if transacciones_multiples == 0:
+                    st.warning("⚠️ No se encontraron transacciones con múltiples productos en el período seleccionado")
+                else:
+                    # Parámetros de los conjuntos frecuentes (combinaciones y reglas)
                     col1, col2 = st.columns(2)
-                    
                     with col1:
-                        st.success("**🕐 HORARIOS CRÍTICOS**")
-                        st.markdown("Tener picadas armadas en estos horarios:")
-                        for _, row in horas_pico.sort_values('cantidad', ascending=False).iterrows():
-                            hora = int(row['hora_num'])
-                            cant = int(row['cantidad'])
-                            st.markdown(f"• **{hora}:00 - {hora+1}:00** → ~{cant} picadas")
-                    
+                        soporte_minimo = control(
+                            st.slider,
+                            "Soporte mínimo (%):",
+                            "slider_soporte_minimo",
+                            min_value=0.05,
+                            max_value=5.0,
+                            value=0.1,
+                            step=0.05,
+                            help="Porcentaje mínimo de transacciones múltiples en el que debe aparecer una combinación"
+                        )
                     with col2:
-                        st.info("**📅 DÍAS CRÍTICOS**")
-                        dias_mas_ventas = ventas_dia_picadas.nlargest(3, 'cantidad')
-                        st.markdown("Reforzar producción estos días:")
-                        for _, row in dias_mas_ventas.iterrows():
-                            dia = row['dia_español']
-                            cant = int(row['cantidad'])
-                            st.markdown(f"• **{dia}** → ~{cant} picadas/día")
-                    
-                    # Análisis por tamaño y hora
-                    with st.expander("📏 Ver Análisis de Tamaños por Hora", expanded=False):
-                        st.markdown("##### Preferencia de Tamaño según Horario")
-                        
-                        df_picadas_hora_tamaño = df_picadas.copy()
-                        df_picadas_hora_tamaño['tamaño'] = df_picadas_hora_tamaño['producto'].str.extract(r'(CHICA|MEDIANA|GRANDE)')[0]
-                        
-                        ventas_hora_tamaño = df_picadas_hora_tamaño.groupby(['hora_num', 'tamaño'])['cantidad'].sum().reset_index()
-                        
-                        fig_hora_tamaño = go.Figure()
-                        
-                        colores_tamaño = {'CHICA': '#32CD32', 'MEDIANA': '#FFD700', 'GRANDE': '#FF6347'}
-                        
-                        for tamaño in ['CHICA', 'MEDIANA', 'GRANDE']:
-                            datos_tamaño = ventas_hora_tamaño[ventas_hora_tamaño['tamaño'] == tamaño]
-                            fig_hora_tamaño.add_trace(go.Scatter(
-                                x=datos_tamaño['hora_num'],
-                                y=datos_tamaño['cantidad'],
-                                mode='lines+markers',
-                                name=tamaño,
-                                line=dict(width=3),
-                                marker=dict(size=8, color=colores_tamaño[tamaño])
-                            ))
-                        
-                        fig_hora_tamaño.update_layout(
-                            xaxis_title="Hora del Día",
-                            yaxis_title="Picadas Vendidas",
-                            height=400,
-                            xaxis=dict(dtick=2),
-                            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+                        tamaño_maximo = control(
+                            st.slider,
+                            "Tamaño máximo de las combinaciones:",
+                            "slider_tamaño_maximo",
+                            min_value=2,
+                            max_value=6,
+                            value=3
                         )
-                        
-                        st.plotly_chart(fig_hora_tamaño, use_container_width=True)
-                        
-                        # Análisis de conclusiones
-                        for hora in horas_pico['hora_num'].values:
-                            datos_hora = ventas_hora_tamaño[ventas_hora_tamaño['hora_num'] == hora]
-                            if not datos_hora.empty:
-                                tamaño_preferido = datos_hora.loc[datos_hora['cantidad'].idxmax(), 'tamaño']
-                                st.info(f"A las **{int(hora)}:00** se prefieren las picadas **{tamaño_preferido}**")
-                
-                # ========== SUBTAB 4: RECOMENDACIONES ==========
-                with subtab4:
-                    st.markdown("#### 💡 Recomendaciones Inteligentes de Producción")
-                    st.caption("Estrategias basadas en datos para optimizar tu producción")
-                    
-                    # Calcular métricas clave
-                    df_picadas_rec = df_picadas.copy()
-                    df_picadas_rec['tipo_picada'] = df_picadas_rec['producto'].str.extract(r'TABLA (.+?) (CHICA|MEDIANA|GRANDE)')[0]
-                    df_picadas_rec['tamaño'] = df_picadas_rec['producto'].str.extract(r'(CHICA|MEDIANA|GRANDE)')[0]
-                    
-                    # Top 3 productos
-                    top3_productos = df_picadas_rec.groupby('producto')['cantidad'].sum().nlargest(3)
                     
-                    # Top 3 tipos
-                    top3_tipos = df_picadas_rec.groupby('tipo_picada')['cantidad'].sum().nlargest(3)
+                    itemsets = calcular_itemsets(version_datos, clave_periodo, tuple(PRODUCTOS_EXCLUIR),
+                                                 brecha_transaccion, soporte_minimo / 100, tamaño_maximo,
+                                                 canastas, es_multiple)
                     
-                    # Tamaño más vendido
-                    tamaño_top = df_picadas_rec.groupby('tamaño')['cantidad'].sum().idxmax()
+                    # Subtabs para diferentes análisis
+                    subtab1, subtab2, subtab3 = st.tabs(["🔗 Productos Frecuentes", "🔍 Buscar por Producto", "📐 Reglas de Asociación"],
+                                                          key="tabs_canastas", on_change="rerun")
                     
-                    # Día más vendido
-                    dia_top = df_picadas_rec.groupby('dia_semana')['cantidad'].sum().idxmax()
-                    dia_top_esp = dias_español[dia_top]
-                    
-                    # Hora más vendida
-                    hora_top = df_picadas_rec.groupby('hora_num')['cantidad'].sum().idxmax()
-                    
-                    # RECOMENDACIÓN 1: Producción Prioritaria
-                    st.markdown("### 🎯 1. Producción Prioritaria")
-                    st.success("**Estos productos deben estar SIEMPRE disponibles:**")
-                    
-                    col1, col2, col3 = st.columns(3)
-                    
-                    productos_prioritarios = list(top3_productos.index)
-                    for idx, (col, producto) in enumerate(zip([col1, col2, col3], productos_prioritarios)):
-                        with col:
-                            st.markdown(f"**#{idx+1}**")
-                            st.markdown(f"**{producto.replace('TABLA ', '')}**")
-                            cant = int(top3_productos[producto])
-                            promedio_diario = cant / df_picadas_rec['fecha'].nunique()
-                            st.metric("Ventas Totales", f"{cant}")
-                            st.metric("Promedio Diario", f"{promedio_diario:.1f}")
-                    
-                    st.divider()
-                    
-                    # RECOMENDACIÓN 2: Stock por Día
-                    st.markdown("### 📅 2. Plan de Stock Semanal")
-                    st.info("**Cantidad recomendada de picadas por día de la semana:**")
-                    
-                    ventas_por_dia_rec = df_picadas_rec.groupby('dia_semana')['cantidad'].sum() / df_picadas_rec.groupby('dia_semana')['fecha'].nunique()
-                    ventas_por_dia_rec = ventas_por_dia_rec.reindex(dias_orden)
-                    
-                    tabla_semanal = pd.DataFrame({
-                        'Día': [dias_español[d] for d in ventas_por_dia_rec.index],
-                        'Picadas Recomendadas': ventas_por_dia_rec.values.round(0).astype(int),
-                        'Nivel': ['🔴 ALTO' if v > ventas_por_dia_rec.mean() * 1.2 else 
-                                 '🟡 MEDIO' if v > ventas_por_dia_rec.mean() * 0.8 else 
-                                 '🟢 BAJO' for v in ventas_por_dia_rec.values]
-                    })
-                    
-                    st.dataframe(tabla_semanal, use_container_width=True, hide_index=True)
-                    
-                    st.markdown(f"💡 **Reforzar producción los días {dia_top_esp}** (día con mayor demanda)")
-                    
-                    st.divider()
-                    
-                    # RECOMENDACIÓN 3: Pre-armado por Horario
-                    st.markdown("### 🕐 3. Estrategia de Pre-Armado")
-                    st.warning("**Plan horario para tener picadas listas:**")
-                    
-                    ventas_por_hora_rec = df_picadas_rec.groupby('hora_num')['cantidad'].sum()
-                    horas_ordenadas = ventas_por_hora_rec.sort_values(ascending=False)
-                    
-                    st.markdown("**🔴 HORARIOS CRÍTICOS (Pre-armar con anticipación):**")
-                    for hora in horas_ordenadas.head(5).index:
-                        cantidad = int(horas_ordenadas[hora])
-                        porcentaje = (cantidad / ventas_por_hora_rec.sum() * 100)
-                        st.markdown(f"• **{int(hora)-1}:30 - {int(hora)}:00** → Armar **{cantidad}** picadas ({porcentaje:.1f}% del día)")
-                    
-                    st.markdown("\n**🟡 HORARIOS MODERADOS (Preparar según demanda):**")
-                    for hora in horas_ordenadas[5:10].index:
-                        cantidad = int(horas_ordenadas[hora])
-                        st.markdown(f"• **{int(hora)}:00 - {int(hora)+1}:00** → ~**{cantidad}** picadas")
-                    
-                    st.divider()
-                    
-                    # RECOMENDACIÓN 4: Mix de Productos
-                    st.markdown("### 📊 4. Mix Óptimo de Productos")
-                    st.success("**Distribución recomendada de tu producción:**")
-                    
-                    # Por tipo
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        st.markdown("**Por Tipo de Picada:**")
-                        dist_tipo = df_picadas_rec.groupby('tipo_picada')['cantidad'].sum()
-                        dist_tipo_pct = (dist_tipo / dist_tipo.sum() * 100).round(1)
+                    if subtab1.open:
+                        with subtab1:
+                            st.markdown("#### 🔗 Productos que se Compran Juntos")
+                            
+                            modo_conteo = control(
+                                st.radio,
+                                "Modo de conteo:",
+                                "modo_conteo_pares",
+                                options=["Exacto", "Aproximado"],
+                                horizontal=True,
+                                help="El modo aproximado recorre las canastas por bloques con memoria fija; pensado para varios años o sucursales"
+                            )
+                            
+                            if modo_conteo == "Exacto":
+                                # Pares más frecuentes desde la matriz de co-ocurrencias
+                                top_pares = market_basket.top_pares(indice_coocurrencias.coocurrencia, canastas.productos, k=20)
+                            else:
+                                capacidad_resumen = control(
+                                    st.select_slider,
+                                    "Contadores en memoria:",
+                                    "capacidad_resumen",
+                                    options=[200, 500, 1000, 5000, 20000],
+                                    value=1000
+                                )
+                                top_pares, resumen_pares = calcular_pares_aproximados(
+                                    version_datos, clave_periodo, tuple(PRODUCTOS_EXCLUIR), brecha_transaccion,
+                                    capacidad_resumen, canastas, es_multiple)
+                                st.caption(f"Cada frecuencia puede estar subestimada hasta en {resumen_pares.error:,} "
+                                           f"(de {resumen_pares.total:,} pares contados); todo par con más de "
+                                           f"{resumen_pares.error:,} apariciones está garantizado en el resumen")
+                            
+                            if len(top_pares) > 0:
+                                # Selector de cantidad a mostrar
+                                max_disponible = min(20, len(top_pares))
+                                if max_disponible > 5:
+                                    num_mostrar = control(
+                                        st.slider,
+                                        "Cantidad de combinaciones a mostrar:",
+                                        "slider_pares",
+                                        min_value=5,
+                                        max_value=max_disponible,
+                                        value=min(10, max_disponible),
+                                        step=5
+                                    )
+                                else:
+                                    num_mostrar = max_disponible
+                                    st.info(f"Mostrando {num_mostrar} combinaciones disponibles")
+                                
+                                # Crear dataframe de pares
+                                df_pares = top_pares.head(num_mostrar).rename(columns={
+                                    'producto_1': 'Producto 1',
+                                    'producto_2': 'Producto 2',
+                                    'frecuencia': 'Frecuencia'
+                                })
+                                
+                                # Calcular soporte
+                                df_pares['Soporte (%)'] = (df_pares['Frecuencia'] / transacciones_multiples * 100).round(2)
+                                
+                                # Gráfico de barras
+                                df_pares['Combinación'] = df_pares.apply(
+                                    lambda row: f"{row['Producto 1'][:20]} + {row['Producto 2'][:20]}", 
+                                    axis=1
+                                )
+                                
+                                fig_pares = go.Figure(data=[
+                                    go.Bar(
+                                        y=df_pares['Combinación'][::-1],
+                                        x=df_pares['Frecuencia'][::-1],
+                                        orientation='h',
+                                        marker_color='#1E90FF',
+                                        text=df_pares['Frecuencia'][::-1],
+                                        textposition='auto',
+                                        hovertemplate='<b>%{y}</b><br>Frecuencia: %{x}<extra></extra>'
+                                    )
+                                ])
+                                
+                                fig_pares.update_layout(
+                                    title="Top Combinaciones de Productos",
+                                    xaxis_title="Frecuencia (veces que se compraron juntos)",
+                                    yaxis_title="",
+                                    height=max(400, num_mostrar * 40),
+                                    showlegend=False
+                                )
+                                
+                                st.plotly_chart(fig_pares, use_container_width=True)
+                                
+                                # Tabla detallada
+                                st.markdown("#### 📋 Tabla Detallada de Combinaciones")
+                                
+                                tabla_pares = df_pares[['Producto 1', 'Producto 2', 'Frecuencia', 'Soporte (%)']].copy()
+                                if modo_conteo == "Aproximado":
+                                    tabla_pares['Frecuencia máx.'] = df_pares['frecuencia_maxima']
+                                st.dataframe(tabla_pares, use_container_width=True, hide_index=True)
+                                
+                                st.divider()
+                                
+                                # Conjuntos frecuentes de 3 o más productos
+                                st.markdown("#### 🎯 Combinaciones de 3 o más Productos")
+                                
+                                df_triples = itemsets[itemsets['tamaño'] >= 3].sort_values(
+                                    'frecuencia', ascending=False, kind='stable').head(10)
+                                
+                                if len(df_triples) > 0:
+                                    tabla_triples = pd.DataFrame({
+                                        'Productos': df_triples['items'].str.join(' + '),
+                                        'Tamaño': df_triples['tamaño'],
+                                        'Frecuencia': df_triples['frecuencia'],
+                                        'Soporte (%)': (df_triples['soporte'] * 100).round(2)
+                                    })
+                                    st.dataframe(tabla_triples, use_container_width=True, hide_index=True)
+                                else:
+                                    st.info("No se encontraron combinaciones de 3 o más productos con el soporte mínimo elegido")
+                                
+                                st.divider()
+                                
+                                # RECOMENDACIONES AUTOMÁTICAS
+                                st.markdown("#### 💡 Recomendaciones de Negocio")
+                                
+                                top_combo = df_pares.iloc[0]
+                                
+                                col1, col2 = st.columns(2)
+                                
+                                with col1:
+                                    st.success(f"**🏆 COMBO MÁS POPULAR**")
+                                    st.markdown(f"**{top_combo['Producto 1']}** + **{top_combo['Producto 2']}**")
+                                    st.info(f"Se compran juntos en {top_combo['Frecuencia']} ocasiones ({top_combo['Soporte (%)']}%)")
+                                    st.markdown("**Acciones sugeridas:**\n- Crear promoción de combo\n- Colocar productos cercanos\n- Destacar en marketing")
+                                
+                                with col2:
+                                    st.success(f"**🎯 OPORTUNIDADES**")
+                                    st.markdown(f"Identificadas **{num_mostrar}** combinaciones frecuentes")
+                                    st.info("Productos con alta afinidad que se pueden potenciar")
+                                    st.markdown("**Acciones sugeridas:**\n- Entrenar al personal\n- Crear paquetes promocionales\n- Señalización en PDV")
+                                
+                                # Análisis por horario
+                                with st.expander("🕐 Ver Análisis de Canastas por Horario", expanded=False):
+                                    st.markdown("##### Tamaño de Canasta por Hora del Día")
+                                    
+                                    promedio_por_hora = (lineas_por_canasta.groupby(horas_transaccion).mean()
+                                                         .rename_axis('hora').reset_index(name='productos_en_canasta'))
+                                    
+                                    fig_hora = go.Figure(data=[
+                                        go.Scatter(
+                                            x=promedio_por_hora['hora'],
+                                            y=promedio_por_hora['productos_en_canasta'],
+                                            mode='lines+markers',
+                                            line=dict(color='#32CD32', width=3),
+                                            marker=dict(size=8),
+                                            fill='tozeroy',
+                                            fillcolor='rgba(50,205,50,0.2)'
+                                        )
+                                    ])
+                                    
+                                    fig_hora.update_layout(
+                                        xaxis_title="Hora del Día",
+                                        yaxis_title="Promedio de Productos por Venta",
+                                        height=350,
+                                        showlegend=False,
+                                        xaxis=dict(dtick=2)
+                                    )
+                                    
+                                    st.plotly_chart(fig_hora, use_container_width=True)
+                                    
+                                    hora_max_canasta = promedio_por_hora.loc[promedio_por_hora['productos_en_canasta'].idxmax()]
+                                    st.info(f"💡 A las **{int(hora_max_canasta['hora'])}:00** los clientes compran más productos por transacción (promedio: {hora_max_canasta['productos_en_canasta']:.2f} productos)")
+                            
+                            else:
+                                st.info("No se encontraron suficientes pares de productos para analizar")
                         
-                        for tipo in dist_tipo_pct.nlargest(5).index:
-                            pct = dist_tipo_pct[tipo]
-                            st.markdown(f"• **{tipo}**: {pct}%")
-                    
-                    with col2:
-                        st.markdown("**Por Tamaño:**")
-                        dist_tamaño = df_picadas_rec.groupby('tamaño')['cantidad'].sum()
-                        dist_tamaño_pct = (dist_tamaño / dist_tamaño.sum() * 100).round(1)
+                    if subtab2.open:
+                        with subtab2:
+                            st.markdown("#### 🔍 Buscar Combinaciones por Producto")
+                            st.caption("Selecciona un producto para ver con qué otros productos se compra frecuentemente")
+                            
+                            # Selector de producto
+                            producto_buscar = control(
+                                st.selectbox,
+                                "Selecciona un producto:",
+                                "selector_producto_canasta",
+                                options=canastas.productos_presentes.tolist(),
+                                help="Elige un producto para ver sus combinaciones"
+                            )
+                            
+                            if producto_buscar:
+                                # Productos que se compran con el seleccionado, desde el índice
+                                socios_producto = indice_coocurrencias.socios(producto_buscar)
+                                
+                                if len(socios_producto) > 0:
+                                    df_combinaciones = pd.DataFrame({
+                                        'Producto Combinado': socios_producto.index[:15],
+                                        'Frecuencia': socios_producto.to_numpy()[:15]
+                                    })
+                                    df_combinaciones['Soporte (%)'] = (df_combinaciones['Frecuencia'] / transacciones_multiples * 100).round(2)
+                                    
+                                    # Métricas del producto
+                                    col1, col2, col3 = st.columns(3)
+                                    
+                                    total_apariciones = indice_coocurrencias.apariciones(producto_buscar)
+                                    
+                                    with col1:
+                                        st.metric("🛒 Aparece en Transacciones", f"{total_apariciones:,}")
+                                    with col2:
+                                        st.metric("🔗 Productos Únicos Combinados", f"{len(socios_producto)}")
+                                    with col3:
+                                        combo_mas_frecuente = df_combinaciones.iloc[0]['Producto Combinado']
+                                        st.metric("⭐ Combinación #1", combo_mas_frecuente[:30])
+                                    
+                                    st.divider()
+                                    
+                                    # Gráfico de barras
+                                    max_combinaciones = min(15, len(df_combinaciones))
+                                    if max_combinaciones > 5:
+                                        num_mostrar_busqueda = control(
+                                            st.slider,
+                                            "Cantidad a mostrar:",
+                                            "slider_busqueda",
+                                            min_value=5,
+                                            max_value=max_combinaciones,
+                                            value=min(10, max_combinaciones),
+                                            step=5
+                                        )
+                                    else:
+                                        num_mostrar_busqueda = max_combinaciones
+                                        st.info(f"Mostrando {num_mostrar_busqueda} combinaciones disponibles")
+                                    
+                                    df_combinaciones_plot = df_combinaciones.head(num_mostrar_busqueda)
+                                    
+                                    fig_combinaciones = go.Figure(data=[
+                                        go.Bar(
+                                            y=df_combinaciones_plot['Producto Combinado'][::-1],
+                                            x=df_combinaciones_plot['Frecuencia'][::-1],
+                                            orientation='h',
+                                            marker_color='#32CD32',
+                                            text=df_combinaciones_plot['Frecuencia'][::-1],
+                                            textposition='auto',
+                                            hovertemplate='<b>%{y}</b><br>Frecuencia: %{x}<br>Soporte: %{customdata:.2f}%<extra></extra>',
+                                            customdata=df_combinaciones_plot['Soporte (%)'][::-1]
+                                        )
+                                    ])
+                                    
+                                    fig_combinaciones.update_layout(
+                                        title=f"Productos que se compran con '{producto_buscar}'",
+                                        xaxis_title="Frecuencia",
+                                        yaxis_title="",
+                                        height=max(400, num_mostrar_busqueda * 40),
+                                        showlegend=False
+                                    )
+                                    
+                                    st.plotly_chart(fig_combinaciones, use_container_width=True)
+                                    
+                                    # Tabla detallada
+                                    st.markdown("#### 📋 Tabla Detallada")
+                                    st.dataframe(df_combinaciones_plot, use_container_width=True, hide_index=True)
+                                    
+                                    # Recomendaciones específicas
+                                    st.markdown("#### 💡 Recomendaciones Específicas")
+                                    
+                                    criterio_recomendacion = control(
+                                        st.radio,
+                                        "Criterio de afinidad:",
+                                        "criterio_recomendacion",
+                                        options=["coseno", "lift"],
+                                        format_func=str.capitalize,
+                                        horizontal=True,
+                                        help="Coseno: compras conjuntas normalizadas por la popularidad de ambos productos. "
+                                             "Lift: cuántas veces más se compran juntos que si fueran independientes"
+                                    )
+                                    recomendador = construir_recomendador(
+                                        version_datos, clave_periodo, tuple(PRODUCTOS_EXCLUIR), brecha_transaccion,
+                                        criterio_recomendacion, indice_coocurrencias, transacciones_multiples)
+                                    top_3 = recomendador.recomendar(producto_buscar, 3)
+                                    
+                                    if len(top_3) > 0:
+                                        st.success(f"**Productos Top para Cross-Selling con '{producto_buscar}':**")
+                                        for producto_recomendado, similitud in top_3.items():
+                                            frecuencia = socios_producto.get(producto_recomendado, 0)
+                                            st.markdown(f"• **{producto_recomendado}** - afinidad {similitud:.2f}, {frecuencia} veces juntos")
+                                    else:
+                                        st.info("No hay suficientes compras conjuntas para recomendar productos")
+                                    
+                                    with st.expander("📋 Ver recomendaciones para todos los productos", expanded=False):
+                                        st.dataframe(
+                                            recomendador.recomendar_todos(3).rename(columns={
+                                                'producto': 'Producto',
+                                                'rango': '#',
+                                                'recomendado': 'Sugerir',
+                                                'similitud': 'Afinidad'
+                                            }).round({'Afinidad': 3}),
+                                            use_container_width=True,
+                                            hide_index=True
+                                        )
+                                    
+                                    st.info(f"💼 **Estrategia sugerida:** Cuando un cliente compre '{producto_buscar}', el personal debería sugerir estos productos para incrementar el ticket promedio.")
+                                
+                                else:
+                                    st.warning(f"No se encontraron combinaciones para el producto '{producto_buscar}' en el período seleccionado.")
+                    if subtab3.open:
+                        with subtab3:
+                            st.markdown("#### 📐 Reglas de Asociación")
+                            st.caption("Si el cliente lleva el antecedente, ¿con qué probabilidad lleva también el consecuente? "
+                                       "Lift > 1 indica afinidad real más allá de la popularidad de cada producto")
+                            
+                            reglas = calcular_reglas(version_datos, clave_periodo, tuple(PRODUCTOS_EXCLUIR),
+                                                     brecha_transaccion, soporte_minimo / 100, tamaño_maximo,
+                                                     itemsets, transacciones_multiples)
+                            
+                            if len(reglas) == 0:
+                                st.info("No hay reglas con el soporte mínimo elegido; prueba bajarlo")
+                            else:
+                                col1, col2, col3 = st.columns(3)
+                                with col1:
+                                    confianza_minima = control(st.slider, "Confianza mínima (%):", "slider_confianza_minima",
+                                                               min_value=0, max_value=100, value=0, step=5)
+                                with col2:
+                                    lift_minimo = control(st.number_input, "Lift mínimo:", "lift_minimo",
+                                                          min_value=0.0, value=1.0, step=0.1)
+                                with col3:
+                                    orden_reglas = control(st.selectbox, "Ordenar por:", "orden_reglas",
+                                                           options=["lift", "confianza", "soporte", "leverage", "conviction"],
+                                                           format_func=str.capitalize)
+                                
+                                producto_regla = control(
+                                    st.selectbox,
+                                    "Producto en la regla (opcional):",
+                                    "producto_regla",
+                                    options=["Todos"] + canastas.productos_presentes.tolist()
+                                )
+                                
+                                filtro = (reglas['confianza'] * 100 >= confianza_minima) & (reglas['lift'] >= lift_minimo)
+                                if producto_regla != "Todos":
+                                    filtro &= (reglas['antecedente'].map(lambda items: producto_regla in items) |
+                                               reglas['consecuente'].map(lambda items: producto_regla in items))
+                                reglas_filtradas = reglas[filtro].sort_values(orden_reglas, ascending=False, kind='stable')
+                                
+                                st.markdown(f"**{len(reglas_filtradas):,}** reglas de {len(reglas):,}")
+                                
+                                tabla_reglas = pd.DataFrame({
+                                    'Antecedente': reglas_filtradas['antecedente'].str.join(' + '),
+                                    'Consecuente': reglas_filtradas['consecuente'].str.join(' + '),
+                                    'Frecuencia': reglas_filtradas['frecuencia'],
+                                    'Soporte (%)': (reglas_filtradas['soporte'] * 100).round(2),
+                                    'Confianza (%)': (reglas_filtradas['confianza'] * 100).round(1),
+                                    'Lift': reglas_filtradas['lift'].round(2),
+                                    'Leverage': reglas_filtradas['leverage'].round(4),
+                                    'Conviction': reglas_filtradas['conviction'].round(2)
+                                })
+                                st.dataframe(tabla_reglas.head(500), use_container_width=True, hide_index=True)
+                                if len(tabla_reglas) > 500:
+                                    st.caption("Mostrando las primeras 500 reglas según el orden elegido")
+            
+     # ========== TAB 6: ANÁLISIS DE PICADAS ==========
+        if tab6.open:
+            with tab6:
+                st.markdown("### 🍽️ Análisis Inteligente de Picadas")
+                st.caption("Predicciones, tendencias y recomendaciones para optimizar la producción de picadas")
+                
+                # Lista de productos de picadas
+                PRODUCTOS_PICADAS = picadas.PRODUCTOS_PICADAS
+                
+                # Filtrar datos de picadas
+                df_picadas = cubo[cubo['producto'].isin(PRODUCTOS_PICADAS)]
+                dimension_productos = cargar_dimension_productos(version_datos, cubo['producto'].cat.categories)
+                
+                if df_picadas.empty:
+                    st.warning("⚠️ No se encontraron datos de picadas en el período seleccionado")
+                else:
+                    # Crear tabs secundarios
+                    subtab1, subtab2, subtab3, subtab4 = st.tabs([
+                        "📅 Predicción por Fechas",
+                        "📊 Análisis General",
+                        "🕐 Horarios Óptimos",
+                        "💡 Recomendaciones"
+                    ], key="tabs_picadas", on_change="rerun")
+                    resumen_picadas = calcular_resumen_picadas(version_datos, tuple(PRODUCTOS_PICADAS),
+                                                               df_picadas, dimension_productos)
+                    
+                    # ========== SUBTAB 1: PREDICCIÓN POR FECHAS ==========
+                    if subtab1.open:
+                        with subtab1:
+                            st.markdown("#### 📅 Predicción de Ventas por Rango de Fechas")
+                            st.caption("Selecciona un período futuro para predecir cuántas picadas necesitarás")
+                            
+                            col1, col2 = st.columns(2)
+                            
+                            with col1:
+                                fecha_inicio_pred = control(
+                                    st.date_input,
+                                    "Fecha Inicio:",
+                                    "fecha_inicio_pred",
+                                    value=df_picadas['fecha'].max() + pd.Timedelta(days=1),
+                                    min_value=df_picadas['fecha'].min()
+                                )
+                            
+                            with col2:
+                                fecha_fin_pred = control(
+                                    st.date_input,
+                                    "Fecha Fin:",
+                                    "fecha_fin_pred",
+                                    value=df_picadas['fecha'].max() + pd.Timedelta(days=7),
+                                    min_value=fecha_inicio_pred
+                                )
+                            
+                            if st.button("🔮 Generar Predicción", type="primary"):
+                                # Convertir a datetime
+                                fecha_inicio_pred = pd.to_datetime(fecha_inicio_pred)
+                                fecha_fin_pred = pd.to_datetime(fecha_fin_pred)
+                                
+                                dias_rango = pd.date_range(fecha_inicio_pred, fecha_fin_pred)
+                                
+                                st.markdown(f"### 📊 Predicción para {len(dias_rango)} días ({fecha_inicio_pred.strftime('%d/%m/%Y')} - {fecha_fin_pred.strftime('%d/%m/%Y')})")
+                                
+                                # Tasas producto × día de la semana por la cantidad de cada día en el rango
+                                pronosticador = construir_pronosticador_picadas(version_datos, tuple(PRODUCTOS_PICADAS), df_picadas)
+                                predicciones = pronosticador.predecir(fecha_inicio_pred, fecha_fin_pred)
+                                predicciones = predicciones[predicciones > 0]
+                                
+                                if len(predicciones) > 0:
+                                    # Crear DataFrame de predicciones
+                                    df_pred = pd.DataFrame({
+                                        'Producto': predicciones.index,
+                                        'Cantidad Estimada': predicciones.to_numpy()
+                                    })
+                                    df_pred['Cantidad Estimada'] = df_pred['Cantidad Estimada'].round(0).astype(int)
+                                    df_pred = df_pred.sort_values('Cantidad Estimada', ascending=False)
+                                    
+                                    # Extraer tipo y tamaño
+                                    df_pred[['Tipo', 'Tamaño']] = data_processing.unir_atributos(
+                                        df_pred['Producto'], dimension_productos, ['tipo', 'tamaño']).to_numpy()
+                                    
+                                    # Métricas generales
+                                    col1, col2, col3 = st.columns(3)
+                                    
+                                    total_picadas = df_pred['Cantidad Estimada'].sum()
+                                    promedio_diario = total_picadas / len(dias_rango)
+                                    producto_top = df_pred.iloc[0]['Producto']
+                                    
+                                    with col1:
+                                        st.metric("🍽️ Total Picadas Estimadas", f"{int(total_picadas):,}")
+                                    with col2:
+                                        st.metric("📊 Promedio Diario", f"{promedio_diario:.1f}")
+                                    with col3:
+                                        st.metric("⭐ Más Demandada", producto_top.split('TABLA ')[1][:20])
+                                    
+                                    st.divider()
+                                    
+                                    # Gráfico por tipo de picada
+                                    st.markdown("#### 📊 Distribución por Tipo de Picada")
+                                    
+                                    ventas_por_tipo = df_pred.groupby('Tipo')['Cantidad Estimada'].sum().reset_index()
+                                    ventas_por_tipo = ventas_por_tipo.sort_values('Cantidad Estimada', ascending=False)
+                                    
+                                    fig_tipo = go.Figure(data=[
+                                        go.Bar(
+                                            x=ventas_por_tipo['Tipo'],
+                                            y=ventas_por_tipo['Cantidad Estimada'],
+                                            marker_color='#FFD700',
+                                            text=ventas_por_tipo['Cantidad Estimada'],
+                                            textposition='auto'
+                                        )
+                                    ])
+                                    
+                                    fig_tipo.update_layout(
+                                        xaxis_title="Tipo de Picada",
+                                        yaxis_title="Unidades Estimadas",
+                                        height=400,
+                                        showlegend=False
+                                    )
+                                    
+                                    st.plotly_chart(fig_tipo, use_container_width=True)
+                                    
+                                    # Gráfico por tamaño
+                                    col1, col2 = st.columns(2)
+                                    
+                                    with col1:
+                                        st.markdown("#### 📏 Distribución por Tamaño")
+                                        ventas_por_tamaño = df_pred.groupby('Tamaño')['Cantidad Estimada'].sum().reset_index()
+                                        orden_tamaño = {'CHICA': 1, 'MEDIANA': 2, 'GRANDE': 3}
+                                        ventas_por_tamaño['orden'] = ventas_por_tamaño['Tamaño'].map(orden_tamaño)
+                                        ventas_por_tamaño = ventas_por_tamaño.sort_values('orden')
+                                        
+                                        fig_tamaño = go.Figure(data=[
+                                            go.Pie(
+                                                labels=ventas_por_tamaño['Tamaño'],
+                                                values=ventas_por_tamaño['Cantidad Estimada'],
+                                                hole=0.4,
+                                                marker=dict(colors=['#32CD32', '#FFD700', '#FF6347'])
+                                            )
+                                        ])
+                                        fig_tamaño.update_layout(height=350)
+                                        st.plotly_chart(fig_tamaño, use_container_width=True)
+                                    
+                                    with col2:
+                                        st.markdown("#### 📋 Resumen por Tamaño")
+                                        tabla_tamaño = ventas_por_tamaño[['Tamaño', 'Cantidad Estimada']].copy()
+                                        tabla_tamaño['Porcentaje'] = (tabla_tamaño['Cantidad Estimada'] / tabla_tamaño['Cantidad Estimada'].sum() * 100).round(1).astype(str) + '%'
+                                        st.dataframe(tabla_tamaño[['Tamaño', 'Cantidad Estimada', 'Porcentaje']], use_container_width=True, hide_index=True)
+                                        
+                                        st.markdown("---")
+                                        st.markdown("**💡 Tip de Producción:**")
+                                        tamaño_preferido = tabla_tamaño.iloc[0]['Tamaño']
+                                        st.info(f"El tamaño **{tamaño_preferido}** representa el {tabla_tamaño.iloc[0]['Porcentaje']} de las ventas. Prioriza su producción.")
+                                    
+                                    st.divider()
+                                    
+                                    # Tabla detallada completa
+                                    st.markdown("#### 📋 Lista Completa de Producción")
+                                    
+                                    # Agrupar por tipo para mejor visualización
+                                    for tipo in ventas_por_tipo['Tipo'].values:
+                                        with st.expander(f"🍽️ TABLA {tipo}", expanded=(tipo == ventas_por_tipo.iloc[0]['Tipo'])):
+                                            df_tipo = df_pred[df_pred['Tipo'] == tipo][['Tamaño', 'Cantidad Estimada']].copy()
+                                            df_tipo = df_tipo.sort_values('Tamaño', key=lambda x: x.map(orden_tamaño))
+                                            
+                                            total_tipo = df_tipo['Cantidad Estimada'].sum()
+                                            st.metric(f"Total {tipo}", f"{int(total_tipo)} unidades")
+                                            
+                                            st.dataframe(df_tipo, use_container_width=True, hide_index=True)
+                                    
+                                    # Distribución por día de la semana
+                                    st.divider()
+                                    st.markdown("#### 📅 Distribución Estimada por Día de la Semana")
+                                    
+                                    pred_por_dia = pronosticador.por_dia_semana(fecha_inicio_pred, fecha_fin_pred)
+                                    pred_por_dia = pred_por_dia[(pred_por_dia['dias'] > 0) &
+                                                                (pronosticador.dias_observados > 0)]
+                                    df_pred_dias = pd.DataFrame({
+                                        'Día': pred_por_dia['dia_semana'].map(dias_español),
+                                        'Días en Período': pred_por_dia['dias'],
+                                        'Promedio por Día': pred_por_dia['promedio'],
+                                        'Total Estimado': pred_por_dia['total']
+                                    }).reset_index(drop=True)
+                                    df_pred_dias['Promedio por Día'] = df_pred_dias['Promedio por Día'].round(1)
+                                    df_pred_dias['Total Estimado'] = df_pred_dias['Total Estimado'].round(0).astype(int)
+                                    
+                                    col1, col2 = st.columns([2, 1])
+                                    
+                                    with col1:
+                                        fig_dias_pred = go.Figure(data=[
+                                            go.Bar(
+                                                x=df_pred_dias['Día'],
+                                                y=df_pred_dias['Total Estimado'],
+                                                marker_color='#1E90FF',
+                                                text=df_pred_dias['Total Estimado'],
+                                                textposition='auto'
+                                            )
+                                        ])
+                                        
+                                        fig_dias_pred.update_layout(
+                                            xaxis_title="Día de la Semana",
+                                            yaxis_title="Picadas Estimadas",
+                                            height=350,
+                                            showlegend=False
+                                        )
+                                        
+                                        st.plotly_chart(fig_dias_pred, use_container_width=True)
+                                    
+                                    with col2:
+                                        st.markdown("**📊 Tabla Detallada**")
+                                        st.dataframe(df_pred_dias, use_container_width=True, hide_index=True)
+                                
+                                else:
+                                    st.warning("No hay suficientes datos históricos para generar predicciones confiables")
+                            
+                            # Planificación semanal: varias semanas en una sola llamada al pronosticador
+                            with st.expander("📆 Planificación de las Próximas Semanas", expanded=False):
+                                semanas_plan = control(st.slider, "Semanas a planificar:", "semanas_plan",
+                                                       min_value=1, max_value=12, value=4)
+                                inicios_semana = pd.date_range(df_picadas['fecha'].max() + pd.Timedelta(days=1),
+                                                               periods=semanas_plan, freq='7D')
+                                plan = construir_pronosticador_picadas(
+                                    version_datos, tuple(PRODUCTOS_PICADAS), df_picadas
+                                ).predecir_rangos(inicios_semana, inicios_semana + pd.Timedelta(days=6))
+                                plan.index = [f"{inicio.strftime('%d/%m')} - {(inicio + pd.Timedelta(days=6)).strftime('%d/%m')}"
+                                              for inicio in inicios_semana]
+                                plan = plan.loc[:, plan.sum() > 0].round(0).astype(int).T
+                                plan.index.name = 'Producto'
+                                st.dataframe(plan, use_container_width=True)
                         
-                        orden_tamaño = {'CHICA': 1, 'MEDIANA': 2, 'GRANDE': 3}
-                        for tamaño in sorted(dist_tamaño_pct.index, key=lambda x: orden_tamaño[x]):
-                            pct = dist_tamaño_pct[tamaño]
-                            st.markdown(f"• **{tamaño}**: {pct}%")
-                    
-                    st.info(f"💡 **Insight**: El tamaño **{tamaño_top}** representa el {dist_tamaño_pct[tamaño_top]}% de las ventas. Ajusta tu producción en consecuencia.")
-                    
-                    st.divider()
-                    
-                    # RECOMENDACIÓN 5: Detección de Oportunidades
-                    st.markdown("### 🚀 5. Oportunidades de Mejora")
-                    
-                    # Productos con bajo rendimiento
-                    ventas_productos = df_picadas_rec.groupby('producto')['cantidad'].sum().sort_values()
-                    bottom_5 = ventas_productos.head(5)
-                    
-                    if len(bottom_5) > 0:
-                        st.warning("**⚠️ Productos con Bajas Ventas (Considerar):**")
-                        for producto in bottom_5.index:
-                            cant = int(bottom_5[producto])
-                            pct = (cant / ventas_productos.sum() * 100)
-                            st.markdown(f"• **{producto.replace('TABLA ', '')}**: {cant} unidades ({pct:.2f}%)")
+                            # Pronóstico con modelos Prophet por producto (entrenados aparte y guardados en disco)
+                            st.divider()
+                            st.markdown("#### 🤖 Pronóstico con Prophet")
+                            if not pronosticos.PROPHET_DISPONIBLE:
+                                st.info("Instala `prophet` para ver pronósticos con tendencia y estacionalidad por producto")
+                            elif control(st.toggle, "Mostrar pronóstico Prophet", "mostrar_prophet", value=False):
+                                servicio_pronosticos = pronosticos.ServicioPronosticos(data_processing.CACHE_DIR / "pronosticos")
+                                series_picadas = calcular_series_picadas(version_datos, tuple(PRODUCTOS_PICADAS), df_picadas)
+                                pendientes = servicio_pronosticos.pendientes(series_picadas)
+                                
+                                if pendientes:
+                                    # El entrenamiento corre fuera del dashboard, como proceso batch
+                                    st.warning(f"⚠️ {len(pendientes)} productos tienen historia nueva sin modelo actualizado. "
+                                               "Para entrenarlos ejecuta `python -m src.pronosticos`")
+                                
+                                pronosticos_prophet = servicio_pronosticos.cargar(PRODUCTOS_PICADAS)
+                                if not pronosticos_prophet:
+                                    st.info("Todavía no hay modelos entrenados")
+                                else:
+                                    resumen_prophet = pd.DataFrame([
+                                        {
+                                            'Producto': producto,
+                                            'Próx. 7 días': pronostico['yhat'].head(7).sum(),
+                                            'Próx. 28 días': pronostico['yhat'].sum(),
+                                            'Mínimo 28 días': pronostico['yhat_lower'].sum(),
+                                            'Máximo 28 días': pronostico['yhat_upper'].sum()
+                                        }
+                                        for producto, pronostico in pronosticos_prophet.items()
+                                    ]).sort_values('Próx. 28 días', ascending=False)
+                                    st.dataframe(resumen_prophet.round(0), use_container_width=True, hide_index=True)
+                                    
+                                    producto_prophet = control(st.selectbox, "Ver pronóstico de:", "producto_prophet",
+                                                               options=resumen_prophet['Producto'].tolist())
+                                    pronostico = pronosticos_prophet[producto_prophet]
+                                    historia = series_picadas[producto_prophet].tail(90)
+                                    
+                                    fig_prophet = go.Figure()
+                                    fig_prophet.add_trace(go.Scatter(x=historia.index, y=historia.values, mode='lines',
+                                                                     name='Ventas', line=dict(color='#1E90FF')))
+                                    fig_prophet.add_trace(go.Scatter(x=pronostico['ds'], y=pronostico['yhat_upper'], mode='lines',
+                                                                     line=dict(width=0), showlegend=False, hoverinfo='skip'))
+                                    fig_prophet.add_trace(go.Scatter(x=pronostico['ds'], y=pronostico['yhat_lower'], mode='lines',
+                                                                     line=dict(width=0), fill='tonexty',
+                                                                     fillcolor='rgba(255,165,0,0.25)', name='Intervalo'))
+                                    fig_prophet.add_trace(go.Scatter(x=pronostico['ds'], y=pronostico['yhat'], mode='lines',
+                                                                     name='Pronóstico', line=dict(color='#FF8C00', dash='dash')))
+                                    fig_prophet.update_layout(
+                                        xaxis_title="Fecha",
+                                        yaxis_title="Unidades",
+                                        height=400,
+                                        hovermode='x unified'
+                                    )
+                                    st.plotly_chart(fig_prophet, use_container_width=True)
                         
-                        st.markdown("\n**Acciones sugeridas:**")
-                        st.markdown("- Reducir cantidad producida de estos productos")
-                        st.markdown("- Considerar promociones especiales")
-                        st.markdown("- Evaluar si mantener en el catálogo")
-                    
-                    st.divider()
-                    
-                    # RECOMENDACIÓN 6: Checklist de Producción
-                    st.markdown("### ✅ 6. Checklist Diario de Producción")
-                    
-                    st.markdown("**📋 Usa este checklist cada día:**")
-                    
-                    # Generar checklist inteligente
-                    promedio_diario_total = df_picadas_rec['cantidad'].sum() / df_picadas_rec['fecha'].nunique()
-                    
-                    st.markdown(f"""
-                    **ANTES DE ABRIR ({int(hora_top-2)}:00):**
-                    - [ ] Verificar stock de ingredientes
-                    - [ ] Pre-armar {int(promedio_diario_total * 0.3)} picadas mixtas (priorizar tamaño {tamaño_top})
-                    - [ ] Preparar {int(top3_productos.iloc[0] / df_picadas_rec['fecha'].nunique())} unidades de {top3_productos.index[0].replace('TABLA ', '')}
-                    
-                    **HORARIO PICO ({int(hora_top-1)}:00 - {int(hora_top+1)}:00):**
-                    - [ ] Tener armadas al menos {int(horas_ordenadas.iloc[0])} picadas
-                    - [ ] Monitorear stock en tiempo real
-                    - [ ] Personal adicional disponible
-                    
-                    **DÍA COMPLETO:**
-                    - [ ] Meta de producción: {int(promedio_diario_total)} picadas
-                    - [ ] Registrar ventas por tipo y tamaño
-                    - [ ] Ajustar producción según demanda real
-                    """)
-                    
-                    st.divider()
-                    
-                    # RECOMENDACIÓN 7: Alertas y Predicciones
-                    st.markdown("### 🔔 7. Sistema de Alertas")
-                    
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        st.error("**🚨 ALERTAS ROJAS:**")
-                        st.markdown(f"• Si {dia_top_esp} → Duplicar stock de {top3_productos.index[0].replace('TABLA ', '')}")
-                        st.markdown(f"• Si hora ≥ {int(hora_top)}:00 → Verificar picadas armadas")
-                        st.markdown(f"• Si ventas > {int(promedio_diario_total * 1.5)}/día → Activar producción extra")
-                    
-                    with col2:
-                        st.warning("**⚠️ ALERTAS AMARILLAS:**")
-                        st.markdown(f"• Si stock < 5 picadas a las {int(hora_top-1)}:00 → Pre-armar más")
-                        st.markdown(f"• Si tamaño {tamaño_top} < 30% → Ajustar producción")
-                        st.markdown("• Si fin de semana → Aumentar stock 20%")
-                    
-                    st.divider()
-                    
-                    # Resumen Final
-                    st.markdown("### 📌 Resumen Ejecutivo")
-                    
-                    st.success(f"""
-                    **🎯 DATOS CLAVE PARA TU NEGOCIO:**
-                    
-                    **Producción Diaria Recomendada:** {int(promedio_diario_total)} picadas
-                    
-                    **Top 3 Productos (Nunca Faltar):**
-                    1. {top3_productos.index[0].replace('TABLA ', '')}
-                    2. {top3_productos.index[1].replace('TABLA ', '')}
-                    3. {top3_productos.index[2].replace('TABLA ', '')}
-                    
-                    **Momento Crítico:** {dia_top_esp} a las {int(hora_top)}:00
-                    
-                    **Mix Ideal:** {dist_tamaño_pct['CHICA']:.0f}% Chicas, {dist_tamaño_pct['MEDIANA']:.0f}% Medianas, {dist_tamaño_pct['GRANDE']:.0f}% Grandes
-                    
-                    **Horario de Pre-Armado:** Comenzar a las {int(hora_top-2)}:00
-                    """)
-                    
-                    # Botón de descarga (simulado)
-                    st.markdown("---")
-                    st.info("💾 **Tip:** Toma captura de pantalla de estas recomendaciones y compártelas con tu equipo de producción")
-        
+                    # ========== SUBTAB 2: ANÁLISIS GENERAL ==========
+                    if subtab2.open:
+                        with subtab2:
+                            st.markdown("#### 📊 Análisis General de Picadas")
+                            
+                            # Métricas generales
+                            total_vendido = acumulados.total(grupo='picadas')
+                            tipos_unicos = len(resumen_picadas.por_tipo)
+                            promedio_diario = acumulados.promedio_diario(grupo='picadas')
+                            picada_mas_vendida = resumen_picadas.por_producto.idxmax()
+                            
+                            col1, col2, col3, col4 = st.columns(4)
+                            
+                            with col1:
+                                st.metric("🍽️ Total Picadas Vendidas", f"{int(total_vendido):,}")
+                            with col2:
+                                st.metric("📊 Promedio Diario", f"{promedio_diario:.1f}")
+                            with col3:
+                                st.metric("🎯 Tipos Diferentes", f"{tipos_unicos}")
+                            with col4:
+                                st.metric("⭐ Más Vendida", picada_mas_vendida.split('TABLA ')[1][:15] + "...")
+                            
+                            st.divider()
+                            
+                            # Ranking de picadas
+                            st.markdown("#### 🏆 Ranking de Picadas")
+                            
+                            ranking_picadas = resumen_picadas.por_producto.reset_index()
+                            ranking_picadas = ranking_picadas.sort_values('cantidad', ascending=False).reset_index(drop=True)
+                            ranking_picadas['participacion'] = (ranking_picadas['cantidad'] / ranking_picadas['cantidad'].sum() * 100).round(2)
+                            ranking_picadas.insert(0, '#', range(1, len(ranking_picadas) + 1))
+                            ranking_picadas.columns = ['#', 'Picada', 'Unidades Vendidas', 'Participación (%)']
+                            
+                            # Mostrar top 10
+                            st.dataframe(ranking_picadas.head(10), use_container_width=True, hide_index=True)
+                            
+                            with st.expander("📋 Ver Ranking Completo", expanded=False):
+                                st.dataframe(ranking_picadas, use_container_width=True, hide_index=True)
+                            
+                            st.divider()
+                            
+                            # Análisis por tipo
+                            col1, col2 = st.columns(2)
+                            
+                            with col1:
+                                st.markdown("#### 📊 Ventas por Tipo de Picada")
+                                clave_figura = ('picadas_tipo', version_datos)
+                                
+                                def figura_tipo_general():
+                                    ventas_tipo = resumen_picadas.por_tipo.reset_index()
+                                    ventas_tipo = ventas_tipo.sort_values('cantidad', ascending=False)
+                                    
+                                    fig_tipo_general = go.Figure(data=[
+                                        go.Bar(
+                                            x=ventas_tipo['tipo_picada'],
+                                            y=ventas_tipo['cantidad'],
+                                            marker_color='#FFD700',
+                                            text=ventas_tipo['cantidad'],
+                                            textposition='auto'
+                                        )
+                                    ])
+                                    
+                                    fig_tipo_general.update_layout(
+                                        xaxis_title="Tipo",
+                                        yaxis_title="Unidades",
+                                        height=400,
+                                        showlegend=False,
+                                        xaxis=dict(tickangle=-45)
+                                    )
+                                    return fig_tipo_general
+                                
+                                fig_tipo_general = figuras.obtener_o_construir(clave_figura, figura_tipo_general)
+                                
+                                st.plotly_chart(fig_tipo_general, use_container_width=True)
+                            
+                            with col2:
+                                st.markdown("#### 📏 Ventas por Tamaño")
+                                clave_figura = ('picadas_tamaño', version_datos)
+                                
+                                def figura_tamaño_general():
+                                    ventas_tamaño = resumen_picadas.por_tamaño.reset_index()
+                                    orden_tamaño = {'CHICA': 1, 'MEDIANA': 2, 'GRANDE': 3}
+                                    ventas_tamaño['orden'] = ventas_tamaño['tamaño'].map(orden_tamaño)
+                                    ventas_tamaño = ventas_tamaño.sort_values('orden')
+                                    
+                                    fig_tamaño_general = go.Figure(data=[
+                                        go.Pie(
+                                            labels=ventas_tamaño['tamaño'],
+                                            values=ventas_tamaño['cantidad'],
+                                            hole=0.4,
+                                            marker=dict(colors=['#32CD32', '#FFD700', '#FF6347']),
+                                            textinfo='label+percent',
+                                            textposition='auto'
+                                        )
+                                    ])
+                                    
+                                    fig_tamaño_general.update_layout(height=400)
+                                    return fig_tamaño_general
+                                
+                                fig_tamaño_general = figuras.obtener_o_construir(clave_figura, figura_tamaño_general)
+                                st.plotly_chart(fig_tamaño_general, use_container_width=True)
+                            
+                            st.divider()
+                            
+                            # Tendencia temporal
+                            st.markdown("#### 📈 Tendencia de Ventas en el Tiempo")
+                            
+                            ventas_tiempo = resumen_picadas.por_fecha.reset_index()
+                            ventas_grafico = serie_para_grafico(ventas_tiempo, "zoom_tendencia_picadas")
+                            
+                            fig_tendencia = go.Figure(data=[
+                                go.Scatter(
+                                    x=ventas_grafico['fecha'],
+                                    y=ventas_grafico['cantidad'],
+                                    mode='lines+markers',
+                                    line=dict(color='#1E90FF', width=2),
+                                    marker=dict(size=6),
+                                    fill='tozeroy',
+                                    fillcolor='rgba(30,144,255,0.2)'
+                                )
+                            ])
+                            
+                            # Agregar línea de promedio
+                            promedio_general = ventas_tiempo['cantidad'].mean()
+                            fig_tendencia.add_hline(y=promedio_general, line_dash="dash", line_color="red", 
+                                                   annotation_text=f"Promedio: {promedio_general:.1f}",
+                                                   annotation_position="right")
+                            
+                            fig_tendencia.update_layout(
+                                xaxis_title="Fecha",
+                                yaxis_title="Picadas Vendidas",
+                                height=400,
+                                showlegend=False
+                            )
+                            
+                            st.plotly_chart(fig_tendencia, use_container_width=True)
+                            
+                            # Ventas por día de la semana
+                            st.markdown("#### 📅 Ventas por Día de la Semana")
+                            
+                            clave_figura = ('picadas_dia_semana', version_datos)
+                            
+                            def figura_dias_picadas():
+                                ventas_dia_picadas = resumen_picadas.por_dia_semana.reset_index()
+                                ventas_dia_picadas = ventas_dia_picadas.set_index('dia_semana').reindex(dias_orden).reset_index()
+                                ventas_dia_picadas['dia_español'] = ventas_dia_picadas['dia_semana'].map(dias_español)
+                                
+                                fig_dias_picadas = go.Figure(data=[
+                                    go.Bar(
+                                        x=ventas_dia_picadas['dia_español'],
+                                        y=ventas_dia_picadas['cantidad'],
+                                        marker_color='#32CD32',
+                                        text=ventas_dia_picadas['cantidad'],
+                                        textposition='auto'
+                                    )
+                                ])
+                                
+                                fig_dias_picadas.update_layout(
+                                    xaxis_title="Día de la Semana",
+                                    yaxis_title="Picadas Vendidas",
+                                    height=400,
+                                    showlegend=False
+                                )
+                                return fig_dias_picadas
+                            
+                            fig_dias_picadas = figuras.obtener_o_construir(clave_figura, figura_dias_picadas)
+                            
+                            st.plotly_chart(fig_dias_picadas, use_container_width=True)
+                        
+                    # ========== SUBTAB 3: HORARIOS ÓPTIMOS ==========
+                    if subtab3.open:
+                        with subtab3:
+                            st.markdown("#### 🕐 Análisis de Horarios Óptimos")
+                            st.caption("Identifica los mejores momentos para tener picadas armadas y listas")
+                            
+                            # Ventas por hora
+                            ventas_hora_picadas = resumen_picadas.por_hora.reset_index()
+                            
+                            # Identificar horas pico
+                            promedio_hora = ventas_hora_picadas['cantidad'].mean()
+                            horas_pico = ventas_hora_picadas[ventas_hora_picadas['cantidad'] >= promedio_hora * 1.2]
+                            
+                            col1, col2, col3 = st.columns(3)
+                            
+                            hora_max = ventas_hora_picadas.loc[ventas_hora_picadas['cantidad'].idxmax(), 'hora_num']
+                            cantidad_max = ventas_hora_picadas['cantidad'].max()
+                            
+                            with col1:
+                                st.metric("🔥 Hora Pico", f"{int(hora_max)}:00 hs")
+                            with col2:
+                                st.metric("📊 Ventas en Pico", f"{int(cantidad_max)} picadas")
+                            with col3:
+                                st.metric("⏰ Horarios Destacados", f"{len(horas_pico)} horas")
+                            
+                            st.divider()
+                            
+                            # Gráfico de ventas por hora
+                            st.markdown("#### 📊 Distribución de Ventas por Hora")
+                            
+                            clave_figura = ('picadas_hora', version_datos)
+                            
+                            def figura_hora_picadas():
+                                fig_hora_picadas = go.Figure()
+                                
+                                fig_hora_picadas.add_trace(go.Scatter(
+                                    x=ventas_hora_picadas['hora_num'],
+                                    y=ventas_hora_picadas['cantidad'],
+                                    mode='lines+markers',
+                                    line=dict(color='#FFD700', width=3),
+                                    marker=dict(size=10),
+                                    fill='tozeroy',
+                                    fillcolor='rgba(255,215,0,0.3)',
+                                    name='Ventas'
+                                ))
+                                
+                                # Línea de promedio
+                                fig_hora_picadas.add_hline(y=promedio_hora, line_dash="dash", line_color="red",
+                                                          annotation_text=f"Promedio: {promedio_hora:.1f}",
+                                                          annotation_position="right")
+                                
+                                # Marcar horas pico
+                                fig_hora_picadas.add_trace(go.Scatter(
+                                    x=horas_pico['hora_num'],
+                                    y=horas_pico['cantidad'],
+                                    mode='markers',
+                                    marker=dict(size=15, color='red', symbol='star'),
+                                    name='Horas Pico'
+                                ))
+                                
+                                fig_hora_picadas.update_layout(
+                                    xaxis_title="Hora del Día",
+                                    yaxis_title="Picadas Vendidas",
+                                    height=450,
+                                    xaxis=dict(dtick=1),
+                                    showlegend=True
+                                )
+                                return fig_hora_picadas
+                            
+                            fig_hora_picadas = figuras.obtener_o_construir(clave_figura, figura_hora_picadas)
+                            
+                            st.plotly_chart(fig_hora_picadas, use_container_width=True)
+                            
+                            st.divider()
+                            
+                            # Heatmap día x hora
+                            st.markdown("#### 🔥 Heatmap: Día vs Hora")
+                            
+                            clave_figura = ('picadas_dia_hora', version_datos)
+                            
+                            def figura_heatmap_picadas():
+                                matriz_dia_hora = resumen_picadas.dia_hora.reindex(dias_orden)
+                                matriz_dia_hora.index = [dias_español[d] for d in matriz_dia_hora.index]
+                                
+                                fig_heatmap_picadas = go.Figure(data=go.Heatmap(
+                                    z=matriz_dia_hora.values,
+                                    x=[f"{int(h)}:00" for h in matriz_dia_hora.columns],
+                                    y=matriz_dia_hora.index,
+                                    colorscale='YlOrRd',
+                                    text=matriz_dia_hora.values.astype(int),
+                                    texttemplate='%{text}',
+                                    textfont={"size": 10},
+                                    colorbar=dict(title="Picadas<br>vendidas")
+                                ))
+                                
+                                fig_heatmap_picadas.update_layout(
+                                    xaxis_title="Hora del Día",
+                                    yaxis_title="Día de la Semana",
+                                    height=500
+                                )
+                                return fig_heatmap_picadas
+                            
+                            fig_heatmap_picadas = figuras.obtener_o_construir(clave_figura, figura_heatmap_picadas)
+                            
+                            st.plotly_chart(fig_heatmap_picadas, use_container_width=True)
+                            
+                            st.divider()
+                            
+                            # Recomendaciones de pre-armado
+                            st.markdown("#### 💡 Recomendaciones de Pre-Armado")
+                            
+                            col1, col2 = st.columns(2)
+                            
+                            with col1:
+                                st.success("**🕐 HORARIOS CRÍTICOS**")
+                                st.markdown("Tener picadas armadas en estos horarios:")
+                                for _, row in horas_pico.sort_values('cantidad', ascending=False).iterrows():
+                                    hora = int(row['hora_num'])
+                                    cant = int(row['cantidad'])
+                                    st.markdown(f"• **{hora}:00 - {hora+1}:00** → ~{cant} picadas")
+                            
+                            with col2:
+                                st.info("**📅 DÍAS CRÍTICOS**")
+                                ventas_dia_picadas = resumen_picadas.por_dia_semana.reset_index()
+                                ventas_dia_picadas['dia_español'] = ventas_dia_picadas['dia_semana'].map(dias_español)
+                                dias_mas_ventas = ventas_dia_picadas.nlargest(3, 'cantidad')
+                                st.markdown("Reforzar producción estos días:")
+                                for _, row in dias_mas_ventas.iterrows():
+                                    dia = row['dia_español']
+                                    cant = int(row['cantidad'])
+                                    st.markdown(f"• **{dia}** → ~{cant} picadas/día")
+                            
+                            # Análisis por tamaño y hora
+                            with st.expander("📏 Ver Análisis de Tamaños por Hora", expanded=False):
+                                st.markdown("##### Preferencia de Tamaño según Horario")
+                                
+                                ventas_hora_tamaño = resumen_picadas.hora_tamaño
+                                
+                                clave_figura = ('picadas_hora_tamaño', version_datos)
+                                
+                                def figura_hora_tamaño():
+                                    fig_hora_tamaño = go.Figure()
+                                    
+                                    colores_tamaño = {'CHICA': '#32CD32', 'MEDIANA': '#FFD700', 'GRANDE': '#FF6347'}
+                                    
+                                    for tamaño in ['CHICA', 'MEDIANA', 'GRANDE']:
+                                        datos_tamaño = ventas_hora_tamaño[ventas_hora_tamaño['tamaño'] == tamaño]
+                                        fig_hora_tamaño.add_trace(go.Scatter(
+                                            x=datos_tamaño['hora_num'],
+                                            y=datos_tamaño['cantidad'],
+                                            mode='lines+markers',
+                                            name=tamaño,
+                                            line=dict(width=3),
+                                            marker=dict(size=8, color=colores_tamaño[tamaño])
+                                        ))
+                                    
+                                    fig_hora_tamaño.update_layout(
+                                        xaxis_title="Hora del Día",
+                                        yaxis_title="Picadas Vendidas",
+                                        height=400,
+                                        xaxis=dict(dtick=2),
+                                        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+                                    )
+                                    return fig_hora_tamaño
+                                
+                                fig_hora_tamaño = figuras.obtener_o_construir(clave_figura, figura_hora_tamaño)
+                                
+                                st.plotly_chart(fig_hora_tamaño, use_container_width=True)
+                                
+                                # Análisis de conclusiones
+                                for hora in horas_pico['hora_num'].values:
+                                    datos_hora = ventas_hora_tamaño[ventas_hora_tamaño['hora_num'] == hora]
+                                    if not datos_hora.empty:
+                                        tamaño_preferido = datos_hora.loc[datos_hora['cantidad'].idxmax(), 'tamaño']
+                                        st.info(f"A las **{int(hora)}:00** se prefieren las picadas **{tamaño_preferido}**")
+                        
+                    # ========== SUBTAB 4: RECOMENDACIONES ==========
+                    if subtab4.open:
+                        with subtab4:
+                            st.markdown("#### 💡 Recomendaciones Inteligentes de Producción")
+                            st.caption("Estrategias basadas en datos para optimizar tu producción")
+                            
+                            # Calcular métricas clave
+                            ventas_productos = resumen_picadas.por_producto
+                            dist_tipo = resumen_picadas.por_tipo
+                            dist_tamaño = resumen_picadas.por_tamaño
+                            ventas_por_hora_rec = resumen_picadas.por_hora
+                            
+                            # Top 3 productos
+                            top3_productos = ventas_productos.nlargest(3)
+                            
+                            # Top 3 tipos
+                            top3_tipos = dist_tipo.nlargest(3)
+                            
+                            # Tamaño más vendido
+                            tamaño_top = dist_tamaño.idxmax()
+                            
+                            # Día más vendido
+                            dia_top = resumen_picadas.por_dia_semana.idxmax()
+                            dia_top_esp = dias_español[dia_top]
+                            
+                            # Hora más vendida
+                            hora_top = ventas_por_hora_rec.idxmax()
+                            
+                            # RECOMENDACIÓN 1: Producción Prioritaria
+                            st.markdown("### 🎯 1. Producción Prioritaria")
+                            st.success("**Estos productos deben estar SIEMPRE disponibles:**")
+                            
+                            col1, col2, col3 = st.columns(3)
+                            
+                            productos_prioritarios = list(top3_productos.index)
+                            for idx, (col, producto) in enumerate(zip([col1, col2, col3], productos_prioritarios)):
+                                with col:
+                                    st.markdown(f"**#{idx+1}**")
+                                    st.markdown(f"**{producto.replace('TABLA ', '')}**")
+                                    cant = int(top3_productos[producto])
+                                    promedio_diario = cant / acumulados.dias_activos(grupo='picadas')
+                                    st.metric("Ventas Totales", f"{cant}")
+                                    st.metric("Promedio Diario", f"{promedio_diario:.1f}")
+                            
+                            st.divider()
+                            
+                            # RECOMENDACIÓN 2: Stock por Día
+                            st.markdown("### 📅 2. Plan de Stock Semanal")
+                            st.info("**Cantidad recomendada de picadas por día de la semana:**")
+                            
+                            ventas_por_dia_rec = resumen_picadas.promedio_por_dia_semana.reindex(dias_orden)
+                            
+                            tabla_semanal = pd.DataFrame({
+                                'Día': [dias_español[d] for d in ventas_por_dia_rec.index],
+                                'Picadas Recomendadas': ventas_por_dia_rec.values.round(0).astype(int),
+                                'Nivel': ['🔴 ALTO' if v > ventas_por_dia_rec.mean() * 1.2 else 
+                                         '🟡 MEDIO' if v > ventas_por_dia_rec.mean() * 0.8 else 
+                                         '🟢 BAJO' for v in ventas_por_dia_rec.values]
+                            })
+                            
+                            st.dataframe(tabla_semanal, use_container_width=True, hide_index=True)
+                            
+                            st.markdown(f"💡 **Reforzar producción los días {dia_top_esp}** (día con mayor demanda)")
+                            
+                            st.divider()
+                            
+                            # RECOMENDACIÓN 3: Pre-armado por Horario
+                            st.markdown("### 🕐 3. Estrategia de Pre-Armado")
+                            st.warning("**Plan horario para tener picadas listas:**")
+                            
+                            horas_ordenadas = ventas_por_hora_rec.sort_values(ascending=False)
+                            
+                            st.markdown("**🔴 HORARIOS CRÍTICOS (Pre-armar con anticipación):**")
+                            for hora in horas_ordenadas.head(5).index:
+                                cantidad = int(horas_ordenadas[hora])
+                                porcentaje = (cantidad / ventas_por_hora_rec.sum() * 100)
+                                st.markdown(f"• **{int(hora)-1}:30 - {int(hora)}:00** → Armar **{cantidad}** picadas ({porcentaje:.1f}% del día)")
+                            
+                            st.markdown("\n**🟡 HORARIOS MODERADOS (Preparar según demanda):**")
+                            for hora in horas_ordenadas[5:10].index:
+                                cantidad = int(horas_ordenadas[hora])
+                                st.markdown(f"• **{int(hora)}:00 - {int(hora)+1}:00** → ~**{cantidad}** picadas")
+                            
+                            st.divider()
+                            
+                            # RECOMENDACIÓN 4: Mix de Productos
+                            st.markdown("### 📊 4. Mix Óptimo de Productos")
+                            st.success("**Distribución recomendada de tu producción:**")
+                            
+                            # Por tipo
+                            col1, col2 = st.columns(2)
+                            
+                            with col1:
+                                st.markdown("**Por Tipo de Picada:**")
+                                dist_tipo_pct = (dist_tipo / dist_tipo.sum() * 100).round(1)
+                                
+                                for tipo in dist_tipo_pct.nlargest(5).index:
+                                    pct = dist_tipo_pct[tipo]
+                                    st.markdown(f"• **{tipo}**: {pct}%")
+                            
+                            with col2:
+                                st.markdown("**Por Tamaño:**")
+                                dist_tamaño_pct = (dist_tamaño / dist_tamaño.sum() * 100).round(1)
+                                
+                                orden_tamaño = {'CHICA': 1, 'MEDIANA': 2, 'GRANDE': 3}
+                                for tamaño in sorted(dist_tamaño_pct.index, key=lambda x: orden_tamaño[x]):
+                                    pct = dist_tamaño_pct[tamaño]
+                                    st.markdown(f"• **{tamaño}**: {pct}%")
+                            
+                            st.info(f"💡 **Insight**: El tamaño **{tamaño_top}** representa el {dist_tamaño_pct[tamaño_top]}% de las ventas. Ajusta tu producción en consecuencia.")
+                            
+                            st.divider()
+                            
+                            # RECOMENDACIÓN 5: Detección de Oportunidades
+                            st.markdown("### 🚀 5. Oportunidades de Mejora")
+                            
+                            # Productos con bajo rendimiento
+                            bottom_5 = ventas_productos.sort_values().head(5)
+                            
+                            if len(bottom_5) > 0:
+                                st.warning("**⚠️ Productos con Bajas Ventas (Considerar):**")
+                                for producto in bottom_5.index:
+                                    cant = int(bottom_5[producto])
+                                    pct = (cant / ventas_productos.sum() * 100)
+                                    st.markdown(f"• **{producto.replace('TABLA ', '')}**: {cant} unidades ({pct:.2f}%)")
+                                
+                                st.markdown("\n**Acciones sugeridas:**")
+                                st.markdown("- Reducir cantidad producida de estos productos")
+                                st.markdown("- Considerar promociones especiales")
+                                st.markdown("- Evaluar si mantener en el catálogo")
+                            
+                            st.divider()
+                            
+                            # RECOMENDACIÓN 6: Checklist de Producción
+                            st.markdown("### ✅ 6. Checklist Diario de Producción")
+                            
+                            st.markdown("**📋 Usa este checklist cada día:**")
+                            
+                            # Generar checklist inteligente
+                            promedio_diario_total = acumulados.promedio_diario(grupo='picadas')
+                            
+                            st.markdown(f"""
+                            **ANTES DE ABRIR ({int(hora_top-2)}:00):**
+                            - [ ] Verificar stock de ingredientes
+                            - [ ] Pre-armar {int(promedio_diario_total * 0.3)} picadas mixtas (priorizar tamaño {tamaño_top})
+                            - [ ] Preparar {int(top3_productos.iloc[0] / acumulados.dias_activos(grupo='picadas'))} unidades de {top3_productos.index[0].replace('TABLA ', '')}
+                            
+                            **HORARIO PICO ({int(hora_top-1)}:00 - {int(hora_top+1)}:00):**
+                            - [ ] Tener armadas al menos {int(horas_ordenadas.iloc[0])} picadas
+                            - [ ] Monitorear stock en tiempo real
+                            - [ ] Personal adicional disponible
+                            
+                            **DÍA COMPLETO:**
+                            - [ ] Meta de producción: {int(promedio_diario_total)} picadas
+                            - [ ] Registrar ventas por tipo y tamaño
+                            - [ ] Ajustar producción según demanda real
+                            """)
+                            
+                            st.divider()
+                            
+                            # RECOMENDACIÓN 7: Alertas y Predicciones
+                            st.markdown("### 🔔 7. Sistema de Alertas")
+                            
+                            col1, col2 = st.columns(2)
+                            
+                            with col1:
+                                st.error("**🚨 ALERTAS ROJAS:**")
+                                st.markdown(f"• Si {dia_top_esp} → Duplicar stock de {top3_productos.index[0].replace('TABLA ', '')}")
+                                st.markdown(f"• Si hora ≥ {int(hora_top)}:00 → Verificar picadas armadas")
+                                st.markdown(f"• Si ventas > {int(promedio_diario_total * 1.5)}/día → Activar producción extra")
+                            
+                            with col2:
+                                st.warning("**⚠️ ALERTAS AMARILLAS:**")
+                                st.markdown(f"• Si stock < 5 picadas a las {int(hora_top-1)}:00 → Pre-armar más")
+                                st.markdown(f"• Si tamaño {tamaño_top} < 30% → Ajustar producción")
+                                st.markdown("• Si fin de semana → Aumentar stock 20%")
+                            
+                            st.divider()
+                            
+                            # Resumen Final
+                            st.markdown("### 📌 Resumen Ejecutivo")
+                            
+                            st.success(f"""
+                            **🎯 DATOS CLAVE PARA TU NEGOCIO:**
+                            
+                            **Producción Diaria Recomendada:** {int(promedio_diario_total)} picadas
+                            
+                            **Top 3 Productos (Nunca Faltar):**
+                            1. {top3_productos.index[0].replace('TABLA ', '')}
+                            2. {top3_productos.index[1].replace('TABLA ', '')}
+                            3. {top3_productos.index[2].replace('TABLA ', '')}
+                            
+                            **Momento Crítico:** {dia_top_esp} a las {int(hora_top)}:00
+                            
+                            **Mix Ideal:** {dist_tamaño_pct['CHICA']:.0f}% Chicas, {dist_tamaño_pct['MEDIANA']:.0f}% Medianas, {dist_tamaño_pct['GRANDE']:.0f}% Grandes
+                            
+                            **Horario de Pre-Armado:** Comenzar a las {int(hora_top-2)}:00
+                            """)
+                            
+                            # Botón de descarga (simulado)
+                            st.markdown("---")
+                            st.info("💾 **Tip:** Toma captura de pantalla de estas recomendaciones y compártelas con tu equipo de producción")
+                
     else:
         st.warning("⚠️ No hay datos disponibles para el período seleccionado.")
 
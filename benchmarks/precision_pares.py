@@ -0,0 +1,76 @@
+"""
+Precisión de top_pares_aproximados frente al conteo exacto de pares.
+
+Genera 13 meses de ventas sintéticas con semilla fija (popularidad de
+productos tipo Zipf y algunos pares que se compran juntos) y compara, para
+cada capacidad, el top 20 aproximado con el exacto. Se ejecuta desde la
+raíz del repo:
+
+    python -m benchmarks.precision_pares
+"""
+import numpy as np
+import pandas as pd
+
+from src.market_basket import coocurrencias, matriz_canastas, top_pares, top_pares_aproximados
+
+SEMILLA = 20240101
+MESES = 13
+TRANSACCIONES_POR_DIA = 120
+PRODUCTOS = 400
+PARES_FRECUENTES = 30
+CAPACIDADES = (50, 200, 1000, 2000)
+K = 20
+
+
+def generar_ventas(semilla=SEMILLA):
+    """Frame con fecha_hora y producto (un renglón por producto de cada canasta)"""
+    rng = np.random.default_rng(semilla)
+    dias = pd.date_range('2024-01-01', periods=MESES * 30, freq='D')
+    popularidad = 1 / np.arange(1, PRODUCTOS + 1) ** 1.1
+    popularidad /= popularidad.sum()
+    # Pares que se suman juntos a una parte de las canastas
+    pares = rng.choice(PRODUCTOS, size=(PARES_FRECUENTES, 2), replace=True)
+
+    cantidad = len(dias) * TRANSACCIONES_POR_DIA
+    segundos = rng.integers(9 * 3600, 22 * 3600, size=cantidad)
+    inicios = np.repeat(dias.to_numpy(), TRANSACCIONES_POR_DIA) + segundos.astype('timedelta64[s]')
+    inicios = np.unique(inicios)
+    tamaños = rng.geometric(0.45, size=len(inicios))
+
+    fechas = np.repeat(inicios, tamaños)
+    productos = rng.choice(PRODUCTOS, size=len(fechas), p=popularidad)
+    con_par = rng.random(len(inicios)) < 0.15
+    elegidos = pares[rng.integers(0, PARES_FRECUENTES, size=int(con_par.sum()))]
+    fechas = np.concatenate([fechas, np.repeat(inicios[con_par], 2)])
+    productos = np.concatenate([productos, elegidos.ravel()])
+    return pd.DataFrame({
+        'fecha_hora': fechas,
+        'producto': pd.Index(productos).map(lambda p: f'PRODUCTO {p:03d}'),
+    })
+
+
+def main():
+    ventas = generar_ventas()
+    canastas = matriz_canastas(ventas['fecha_hora'], ventas['producto'])
+    multiples = np.flatnonzero(canastas.num_productos > 1)
+    coocurrencia = coocurrencias(canastas, multiples)
+    exacto = top_pares(coocurrencia, canastas.productos, k=K)
+    frecuencia = coocurrencia.toarray()
+    indice = canastas.productos.get_indexer
+
+    print(f'{len(multiples)} transacciones múltiples, '
+          f'{(np.triu(frecuencia, 1) > 0).sum()} pares distintos, top {K}\n')
+    print('| Contadores | Cota de error | Error máximo observado | Top 20 recuperado |')
+    print('|-----------:|--------------:|-----------------------:|------------------:|')
+    for capacidad in CAPACIDADES:
+        pares, resumen = top_pares_aproximados(canastas, k=K, capacidad=capacidad, filas=multiples)
+        reales = frecuencia[indice(pares['producto_1']), indice(pares['producto_2'])]
+        assert ((pares['frecuencia'] <= reales) & (reales <= pares['frecuencia_maxima'])).all()
+        recuperados = len(set(zip(pares['producto_1'], pares['producto_2']))
+                          & set(zip(exacto['producto_1'], exacto['producto_2'])))
+        print(f'| {capacidad:>10} | {resumen.error:>13} | {int((reales - pares["frecuencia"]).max()):>22} '
+              f'| {recuperados:>14}/{K} |')
+
+
+if __name__ == '__main__':
+    main()
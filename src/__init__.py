@@ -0,0 +1 @@
+"""Módulos de procesamiento y análisis del dashboard de ventas."""
@@ -0,0 +1,239 @@
+"""Motor de la Matriz BCG: participación, crecimiento y cuadrante por producto."""
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ESTRELLA = '⭐ Estrella'
+VACA = '🐄 Vaca Lechera'
+INTERROGANTE = '❓ Interrogante'
+PERRO = '🐕 Perro'
+CATEGORIAS = [ESTRELLA, VACA, INTERROGANTE, PERRO]
+
+# Crecimiento asignado a los productos sin ventas en el período anterior
+CRECIMIENTO_SIN_HISTORIA = 100.0
+
+
+@dataclass
+class MatrizBCG:
+    """Resultado de la clasificación: datos por producto y umbrales de los cuadrantes"""
+    datos: pd.DataFrame
+    umbral_participacion: float
+    umbral_crecimiento: float
+
+
+def alinear(ventas, productos):
+    """Valores de `ventas` para cada producto de `productos` (0 si no vendió), sin lambdas"""
+    indice = pd.Index(ventas.index.astype(object))
+    posiciones = indice.get_indexer(pd.Index(productos).astype(object))
+    valores = np.append(ventas.to_numpy(dtype='float64'), 0.0)
+    # get_indexer marca los faltantes con -1, que apunta al 0 agregado al final
+    return valores[posiciones]
+
+
+def tasa_crecimiento(actual, anterior, sin_historia=CRECIMIENTO_SIN_HISTORIA):
+    """Crecimiento porcentual elemento a elemento; sin_historia donde anterior es 0"""
+    actual = np.asarray(actual, dtype='float64')
+    anterior = np.asarray(anterior, dtype='float64')
+    con_historia = anterior > 0
+    tasa = np.full(actual.shape, sin_historia, dtype='float64')
+    np.divide((actual - anterior) * 100, anterior, out=tasa, where=con_historia)
+    return tasa
+
+
+def calcular_umbral(valores, metodo='mediana'):
+    """Umbral de un eje: 'mediana', 'media' o un valor fijo"""
+    if metodo == 'mediana':
+        return float(np.median(valores)) if len(valores) else np.nan
+    if metodo == 'media':
+        return float(np.mean(valores)) if len(valores) else np.nan
+    if isinstance(metodo, (int, float)):
+        return float(metodo)
+    raise ValueError(f"Umbral desconocido: {metodo!r} (usar 'mediana', 'media' o un número)")
+
+
+def clasificar(participacion, crecimiento, umbral_participacion, umbral_crecimiento):
+    """Cuadrante BCG de cada producto con np.select"""
+    alta_participacion = np.asarray(participacion) >= umbral_participacion
+    alto_crecimiento = np.asarray(crecimiento) >= umbral_crecimiento
+    return np.select(
+        [alta_participacion & alto_crecimiento,
+         alta_participacion & ~alto_crecimiento,
+         ~alta_participacion & alto_crecimiento],
+        [ESTRELLA, VACA, INTERROGANTE],
+        default=PERRO,
+    )
+
+
+def calcular_matriz_bcg(ventas, ventas_anterior, ventas_actual=None,
+                        umbral_participacion='mediana', umbral_crecimiento='mediana'):
+    """
+    Clasifica productos en la Matriz BCG.
+
+    ventas: unidades por producto del período (Series indexada por producto),
+    base de la participación. ventas_anterior y ventas_actual son las
+    ventas de los dos tramos que se comparan para el crecimiento; si
+    ventas_actual es None se usa `ventas`. Solo se clasifican los productos
+    con ventas en el tramo actual.
+    """
+    if ventas_actual is None:
+        ventas_actual = ventas
+    cantidad_total = ventas.sum()
+    en_actual = pd.Index(ventas.index.astype(object)).isin(ventas_actual.index.astype(object))
+    ventas = ventas[en_actual]
+    productos = ventas.index
+
+    participacion = ventas.to_numpy(dtype='float64') / cantidad_total * 100
+    crecimiento = tasa_crecimiento(alinear(ventas_actual, productos),
+                                   alinear(ventas_anterior, productos))
+
+    umbral_x = calcular_umbral(participacion, umbral_participacion)
+    umbral_y = calcular_umbral(crecimiento, umbral_crecimiento)
+
+    datos = pd.DataFrame({
+        'producto': productos,
+        'cantidad': ventas.to_numpy(),
+        'participacion': participacion,
+        'tasa_crecimiento': crecimiento,
+        'categoria': clasificar(participacion, crecimiento, umbral_x, umbral_y),
+    })
+    return MatrizBCG(datos, umbral_x, umbral_y)
+
+
+def ventas_por_mes(cubo):
+    """
+    Matriz mes × producto de unidades vendidas (meses calendario contiguos,
+    con ceros en los meses sin ventas) y matriz booleana de presencia.
+    """
+    mes = cubo['fecha'].dt.to_period('M').rename('mes')
+    agrupado = cubo.groupby([mes, 'producto'], observed=True)['cantidad'].agg(['sum', 'size'])
+    if agrupado.empty:
+        vacia = pd.DataFrame(dtype='float64')
+        return vacia, vacia.astype(bool)
+    meses = pd.period_range(agrupado.index.levels[0].min(), agrupado.index.levels[0].max(), freq='M')
+    cantidades = agrupado['sum'].unstack(fill_value=0).reindex(meses, fill_value=0)
+    presencia = (agrupado['size'].unstack(fill_value=0).reindex(meses, fill_value=0) > 0)
+    cantidades.index.name = presencia.index.name = 'mes'
+    return cantidades, presencia
+
+
+def calcular_historial_bcg(cantidades, presencia, umbral='mediana', meses=None):
+    """
+    Clasificación BCG de todos los meses en una sola pasada vectorizada.
+
+    Cada mes se compara con el mes calendario anterior, igual que la vista
+    mensual. `meses` limita qué filas de la matriz se devuelven (el mes
+    anterior de cada una se toma igual de la matriz completa). Devuelve un
+    frame largo con una fila por (mes, producto vendido).
+    """
+    if cantidades.empty:
+        return pd.DataFrame(columns=['mes', 'producto', 'cantidad', 'participacion',
+                                     'tasa_crecimiento', 'categoria'])
+    matriz = cantidades.to_numpy(dtype='float64')
+    anterior = np.vstack([np.zeros((1, matriz.shape[1])), matriz[:-1]])
+    vendido = presencia.to_numpy()
+
+    totales = matriz.sum(axis=1, keepdims=True)
+    participacion = np.divide(matriz * 100, totales, out=np.zeros_like(matriz), where=totales != 0)
+    crecimiento = tasa_crecimiento(matriz, anterior)
+
+    # Umbrales por mes calculados solo sobre los productos vendidos ese mes
+    def umbral_por_mes(valores):
+        enmascarados = np.where(vendido, valores, np.nan)
+        if umbral == 'mediana':
+            return np.nanmedian(enmascarados, axis=1, keepdims=True)
+        if umbral == 'media':
+            return np.nanmean(enmascarados, axis=1, keepdims=True)
+        return np.full((len(valores), 1), calcular_umbral(valores[:0], umbral))
+
+    filas_validas = vendido.any(axis=1)
+    if meses is not None:
+        filas_validas &= cantidades.index.isin(meses)
+    with np.errstate(all='ignore'):
+        umbral_x = umbral_por_mes(participacion)
+        umbral_y = umbral_por_mes(crecimiento)
+    categoria = clasificar(participacion, crecimiento, umbral_x, umbral_y)
+
+    filas, columnas = np.nonzero(vendido & filas_validas[:, None])
+    return pd.DataFrame({
+        'mes': cantidades.index[filas],
+        'producto': cantidades.columns.astype(str)[columnas],
+        'cantidad': cantidades.to_numpy()[filas, columnas],
+        'participacion': participacion[filas, columnas],
+        'tasa_crecimiento': crecimiento[filas, columnas],
+        'categoria': categoria[filas, columnas],
+    })
+
+
+def firma_mensual(cantidades):
+    """Huella de las ventas de cada mes: cambia si cambia la cantidad de algún producto"""
+    pesos = pd.util.hash_array(cantidades.columns.astype(str).to_numpy()) / 2.0 ** 64
+    return pd.Series(cantidades.to_numpy(dtype='float64') @ pesos, index=cantidades.index)
+
+
+def actualizar_historial_bcg(historial, firmas_anteriores, cantidades, presencia, umbral='mediana'):
+    """
+    Recalcula solo los meses nuevos o cuyas ventas cambiaron, más el mes
+    siguiente a cada uno (su crecimiento depende del anterior).
+
+    firmas_anteriores es la firma_mensual con la que se calculó `historial`.
+    Devuelve (historial, firmas) actualizados.
+    """
+    firmas = firma_mensual(cantidades)
+    if historial is None or firmas_anteriores is None:
+        return calcular_historial_bcg(cantidades, presencia, umbral), firmas
+    previas = firmas_anteriores.reindex(firmas.index)
+    cambiados = firmas.index[~np.isclose(previas, firmas, rtol=0, atol=1e-9) | previas.isna()]
+    a_recalcular = cambiados.union(cambiados + 1).intersection(firmas.index)
+    if len(a_recalcular) == 0:
+        return historial, firmas
+    nuevos = calcular_historial_bcg(cantidades, presencia, umbral, meses=a_recalcular)
+    conservados = historial[historial['mes'].isin(firmas.index) & ~historial['mes'].isin(a_recalcular)]
+    historial = (pd.concat([conservados, nuevos], ignore_index=True)
+                 .sort_values(['mes', 'producto'], kind='stable')
+                 .reset_index(drop=True))
+    return historial, firmas
+
+
+def cargar_historial_bcg(cantidades, presencia, carpeta, umbral='mediana'):
+    """
+    Historial BCG persistido en `carpeta`: se lee lo guardado, se recalculan
+    solo los meses que cambiaron y se vuelve a guardar.
+    """
+    carpeta = Path(carpeta)
+    ruta_historial = carpeta / f"bcg_historial_{umbral}.parquet"
+    ruta_firmas = carpeta / f"bcg_firmas_{umbral}.parquet"
+    historial = firmas = None
+    if ruta_historial.exists() and ruta_firmas.exists():
+        historial = pd.read_parquet(ruta_historial)
+        historial['mes'] = pd.PeriodIndex(historial['mes'], freq='M')
+        firmas = pd.read_parquet(ruta_firmas)['firma']
+        firmas.index = pd.PeriodIndex(firmas.index, freq='M')
+
+    nuevo, nuevas_firmas = actualizar_historial_bcg(historial, firmas, cantidades, presencia, umbral)
+    if nuevo is not historial:
+        carpeta.mkdir(parents=True, exist_ok=True)
+        temporal = ruta_historial.with_suffix('.tmp')
+        nuevo.assign(mes=nuevo['mes'].astype(str)).to_parquet(temporal, index=False)
+        os.replace(temporal, ruta_historial)
+        temporal = ruta_firmas.with_suffix('.tmp')
+        nuevas_firmas.rename('firma').set_axis(nuevas_firmas.index.astype(str)).to_frame().to_parquet(temporal)
+        os.replace(temporal, ruta_firmas)
+    return nuevo
+
+
+def transiciones_bcg(historial, mes_desde, mes_hasta):
+    """Cuadrante de cada producto en dos meses y matriz de transiciones (conteos)"""
+    desde = historial.loc[historial['mes'] == mes_desde, ['producto', 'categoria']]
+    hasta = historial.loc[historial['mes'] == mes_hasta, ['producto', 'categoria', 'cantidad']]
+    cambios = desde.merge(hasta, on='producto', suffixes=('_desde', '_hasta'))
+    matriz = pd.crosstab(
+        pd.Categorical(cambios['categoria_desde'], categories=CATEGORIAS),
+        pd.Categorical(cambios['categoria_hasta'], categories=CATEGORIAS),
+        dropna=False,
+    )
+    matriz.index.name = 'Desde'
+    matriz.columns.name = 'Hasta'
+    return cambios, matriz
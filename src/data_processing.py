@@ -0,0 +1,514 @@
+"""Carga de los datos de ventas con snapshot local en Parquet."""
+import hashlib
+import io
+import json
+import os
+import shutil
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# URL del CSV en GitHub
+DATA_URL = "https://raw.githubusercontent.com/BayaslianSantiago/streamlit-dashboard/refs/heads/main/datos.csv"
+
+# Carpeta donde se guardan los snapshots (fuera del control de versiones)
+CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache"
+
+CARPETA_SNAPSHOT = "ventas"
+ARCHIVO_CUBO = "cubo_ventas.parquet"
+ARCHIVO_META = "ventas.json"
+
+# Bytes del final de la lectura anterior que se vuelven a pedir para
+# comprobar que la fuente solo creció (append-only)
+TAMAÑO_ANCLA = 1024
+
+# Catálogo de productos (código, sucursal, descripción y precio)
+RUTA_CATALOGO = Path(__file__).resolve().parent.parent / "Productos.csv"
+
+# Nombre de picada: "TABLA <tipo> <tamaño>"
+PATRON_PICADA = r'^TABLA (?P<tipo>.+?) (?P<tamaño>CHICA|MEDIANA|GRANDE)$'
+
+
+def _es_url(origen):
+    return str(origen).startswith(("http://", "https://"))
+
+
+def _hash(contenido):
+    return hashlib.sha256(contenido).hexdigest()[:16]
+
+
+def _leer_meta(cache_dir):
+    ruta = Path(cache_dir) / ARCHIVO_META
+    if not ruta.exists():
+        return {}
+    try:
+        return json.loads(ruta.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _guardar_atomico(ruta, escribir):
+    """Escribe en un archivo temporal y lo renombra, para no dejar snapshots a medias."""
+    temporal = ruta.with_suffix(ruta.suffix + ".tmp")
+    escribir(temporal)
+    os.replace(temporal, ruta)
+
+
+def _descargar(origen, meta, desde=0):
+    """
+    Lee la fuente a partir del byte `desde` cuando es posible.
+
+    Devuelve (contenido, etag, inicio): contenido es None si la fuente no
+    cambió, e inicio es el offset real del primer byte devuelto (0 si el
+    servidor ignoró el pedido parcial).
+    """
+    if not _es_url(origen):
+        ruta = Path(origen)
+        estado = ruta.stat()
+        firma = f"{estado.st_size}-{estado.st_mtime_ns}"
+        if meta.get("etag") == firma:
+            return None, firma, desde
+        if desde > estado.st_size:
+            desde = 0
+        with open(ruta, "rb") as archivo:
+            archivo.seek(desde)
+            return archivo.read(), firma, desde
+
+    pedido = urllib.request.Request(origen)
+    if meta.get("etag"):
+        pedido.add_header("If-None-Match", meta["etag"])
+    if desde:
+        pedido.add_header("Range", f"bytes={desde}-")
+    try:
+        with urllib.request.urlopen(pedido, timeout=30) as respuesta:
+            inicio = desde if respuesta.status == 206 else 0
+            return respuesta.read(), respuesta.headers.get("ETag"), inicio
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return None, meta.get("etag"), desde
+        if e.code == 416:
+            return _descargar(origen, {}, 0)
+        raise
+
+
+def parsear_ventas(contenido, columnas=None):
+    """Parsea el CSV de ventas (o un fragmento sin encabezado) y lo ordena por fecha_hora"""
+    if columnas is None:
+        df = pd.read_csv(io.BytesIO(contenido))
+    else:
+        df = pd.read_csv(io.BytesIO(contenido), header=None, names=columnas)
+    df['fecha_hora'] = pd.to_datetime(df['fecha_hora'])
+    df = df.sort_values('fecha_hora', kind='stable').reset_index(drop=True)
+    return df
+
+
+def _rango_filas(df, desde, hasta):
+    """Posiciones [i, j) de las filas con desde <= fecha_hora < hasta (df ordenado)"""
+    fechas = df['fecha_hora']
+    return fechas.searchsorted(desde, side='left'), fechas.searchsorted(hasta, side='left')
+
+
+def incorporar_filas(df, nuevas):
+    """
+    Mezcla filas nuevas en el frame ordenado por fecha_hora.
+
+    Si todas son posteriores a la marca de agua (la última fecha_hora del
+    snapshot) solo se agregan al final; si llegan filas atrasadas se
+    reordena únicamente el tramo a partir de la primera afectada.
+    """
+    if nuevas.empty:
+        return df
+    if df.empty:
+        return nuevas.reset_index(drop=True)
+    marca_agua = df['fecha_hora'].iloc[-1]
+    primera = nuevas['fecha_hora'].iloc[0]
+    if primera >= marca_agua:
+        return pd.concat([df, nuevas], ignore_index=True)
+    inicio = df['fecha_hora'].searchsorted(primera, side='right')
+    tramo = pd.concat([df.iloc[inicio:], nuevas]).sort_values('fecha_hora', kind='stable')
+    return pd.concat([df.iloc[:inicio], tramo], ignore_index=True)
+
+
+def agregar_cubo_ventas(df):
+    """
+    Cubo de ventas a granularidad (fecha, media hora, producto).
+
+    Es el agregado base que se mantiene junto al snapshot: todos los
+    gráficos por día, hora, franja o producto se resuelven sumando sobre
+    el cubo en lugar de recorrer las filas de transacciones.
+    """
+    fechas = df['fecha_hora'].dt
+    claves = [
+        fechas.normalize().rename('fecha'),
+        (fechas.hour + (fechas.minute >= 30) * 0.5).astype('float32').rename('media_hora'),
+        df['producto'].astype(str).rename('producto'),
+    ]
+    cubo = df.groupby(claves, sort=True)['cantidad'].sum()
+    return cubo.reset_index()
+
+
+def actualizar_cubo_ventas(cubo, df, dias):
+    """Recalcula el cubo solo para los días afectados por filas nuevas"""
+    dias = pd.DatetimeIndex(dias).normalize().unique()
+    if cubo is None or len(dias) == 0:
+        return agregar_cubo_ventas(df) if cubo is None else cubo
+    i, j = _rango_filas(df, dias.min(), dias.max() + pd.Timedelta(days=1))
+    recalculado = agregar_cubo_ventas(df.iloc[i:j])
+    recalculado = recalculado[recalculado['fecha'].isin(dias)]
+    conservado = cubo[~cubo['fecha'].isin(dias)]
+    return (pd.concat([conservado, recalculado], ignore_index=True)
+            .sort_values(['fecha', 'media_hora', 'producto'], kind='stable')
+            .reset_index(drop=True))
+
+
+def preparar_cubo(cubo):
+    """Agrega al cubo las columnas de calendario (mismos tipos que el frame de filas)"""
+    fechas = cubo['fecha'].dt
+    dia = fechas.day.astype('int8')
+    return cubo.assign(
+        producto=cubo['producto'].astype('category'),
+        hora_num=cubo['media_hora'].astype('int8'),
+        dia_semana=fechas.dayofweek.astype('int8'),
+        mes_num=fechas.month.astype('int8'),
+        año=fechas.year.astype('int16'),
+        semana_del_mes=((dia - 1) // 7 + 1).astype('int8'),
+    )
+
+
+def _meses(fechas):
+    return pd.DatetimeIndex(fechas).to_period('M').unique()
+
+
+def _guardar_snapshot(df, carpeta, meses=None):
+    """Escribe el snapshot particionado por mes; con `meses` solo reescribe esas particiones"""
+    carpeta.mkdir(parents=True, exist_ok=True)
+    for mes in (_meses(df['fecha_hora']) if meses is None else meses):
+        i, j = _rango_filas(df, mes.start_time, (mes + 1).start_time)
+        particion = df.iloc[i:j]
+        _guardar_atomico(carpeta / f"{mes}.parquet",
+                         lambda ruta: particion.to_parquet(ruta, index=False))
+
+
+def _leer_snapshot(carpeta):
+    particiones = sorted(carpeta.glob("*.parquet"))
+    return pd.concat([pd.read_parquet(p) for p in particiones], ignore_index=True)
+
+
+def leer_cubo_ventas(cache_dir=None):
+    """Cubo (fecha, media hora, producto) mantenido por cargar_datos"""
+    return pd.read_parquet(Path(cache_dir or CACHE_DIR) / ARCHIVO_CUBO)
+
+
+def cargar_datos(origen=None, cache_dir=None, incremental=True):
+    """
+    Carga las ventas usando un snapshot Parquet local.
+
+    El CSV solo se vuelve a parsear cuando su contenido cambió (ETag o hash
+    SHA-256). Como las ventas solo crecen, en modo incremental se pide la
+    fuente desde el último byte leído y solo se parsean las filas nuevas;
+    el snapshot (particionado por mes) y el cubo de ventas se actualizan
+    solo en los meses y días afectados. Devuelve (df, version), donde
+    version identifica el contenido y sirve como clave para los cálculos
+    cacheados.
+    """
+    origen = origen or DATA_URL
+    cache_dir = Path(cache_dir or CACHE_DIR)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    carpeta = cache_dir / CARPETA_SNAPSHOT
+    ruta_cubo = cache_dir / ARCHIVO_CUBO
+    meta = _leer_meta(cache_dir)
+    if (meta.get("origen") != str(origen) or not carpeta.exists()
+            or not ruta_cubo.exists()):
+        meta = {}
+
+    leidos = meta.get("bytes_leidos", 0) if incremental else 0
+    desde = max(leidos - TAMAÑO_ANCLA, 0)
+    contenido, etag, inicio = _descargar(origen, meta, desde)
+
+    if contenido is None:
+        return _leer_snapshot(carpeta), meta["version"]
+
+    ancla = contenido[desde - inicio:leidos - inicio]
+    nuevo = contenido[leidos - inicio:]
+    # Si la lectura anterior terminó en una línea sin salto y esa línea
+    # siguió creciendo, la fila ya guardada quedó incompleta: no se puede
+    # continuar y se relee todo
+    linea_cerrada = ancla.endswith(b"\n") or not nuevo or nuevo.startswith((b"\n", b"\r\n"))
+    es_continuacion = (leidos > 0 and inicio <= desde and linea_cerrada
+                       and len(ancla) == leidos - desde and _hash(ancla) == meta.get("ancla"))
+
+    if es_continuacion:
+        df = _leer_snapshot(carpeta)
+        # Solo se consumen líneas completas; una última línea a medio
+        # escribir queda sin leer y se parsea cuando llegue su salto
+        fin = max(contenido.rfind(b"\n") + 1, leidos - inicio)
+        cola = contenido[leidos - inicio:fin]
+        version = meta["version"]
+        if cola.strip():
+            nuevas = parsear_ventas(cola, meta["columnas"])
+            df = incorporar_filas(df, nuevas)
+            _guardar_snapshot(df, carpeta, _meses(nuevas['fecha_hora']))
+            cubo = actualizar_cubo_ventas(leer_cubo_ventas(cache_dir), df, nuevas['fecha_hora'])
+            _guardar_atomico(ruta_cubo, lambda ruta: cubo.to_parquet(ruta, index=False))
+            version = _hash((version + _hash(cola)).encode())
+        bytes_leidos = max(leidos, inicio + fin)
+    else:
+        if inicio > 0:
+            # La fuente no es continuación de la anterior: lectura completa
+            contenido, etag, inicio = _descargar(origen, {}, 0)
+        version = _hash(contenido)
+        if meta.get("version") == version:
+            df = _leer_snapshot(carpeta)
+        else:
+            df = parsear_ventas(contenido)
+            shutil.rmtree(carpeta, ignore_errors=True)
+            _guardar_snapshot(df, carpeta)
+            cubo = agregar_cubo_ventas(df)
+            _guardar_atomico(ruta_cubo, lambda ruta: cubo.to_parquet(ruta, index=False))
+        bytes_leidos = len(contenido)
+
+    # Ancla para validar la próxima lectura parcial
+    desde_ancla = max(bytes_leidos - TAMAÑO_ANCLA, 0)
+    ancla = contenido[desde_ancla - inicio:bytes_leidos - inicio] if desde_ancla >= inicio else b""
+
+    meta = {
+        "origen": str(origen),
+        "version": version,
+        "etag": etag,
+        "bytes_leidos": bytes_leidos,
+        "ancla": _hash(ancla) if ancla else None,
+        "columnas": list(df.columns),
+    }
+    _guardar_atomico(cache_dir / ARCHIVO_META,
+                     lambda ruta: ruta.write_text(json.dumps(meta), encoding="utf-8"))
+    return df, version
+
+
+# Esquema de las columnas temporales: enteros chicos en lugar de strings y
+# fechas como datetime64 normalizado. Las etiquetas en español se agregan
+# solo al mostrar.
+TIPOS_TEMPORALES = {
+    'hora_num': 'int8',
+    'minuto': 'int8',
+    'media_hora': 'float32',
+    'dia_semana': 'int8',   # 0 = Lunes ... 6 = Domingo
+    'mes_num': 'int8',
+    'año': 'int16',
+    'semana_del_mes': 'int8',
+    'dia_mes': 'int8',
+}
+
+
+def preparar_columnas_temporales(df):
+    """Agrega las columnas temporales con tipos compactos y producto como categoría"""
+    fechas = df['fecha_hora'].dt
+    hora = fechas.hour.astype('int8')
+    minuto = fechas.minute.astype('int8')
+    dia = fechas.day.astype('int8')
+    return df.assign(
+        producto=df['producto'].astype('category'),
+        hora_num=hora,
+        minuto=minuto,
+        media_hora=(hora + (minuto >= 30) * 0.5).astype('float32'),
+        dia_semana=fechas.dayofweek.astype('int8'),
+        mes_num=fechas.month.astype('int8'),
+        año=fechas.year.astype('int16'),
+        semana_del_mes=((dia - 1) // 7 + 1).astype('int8'),
+        fecha=fechas.normalize(),
+        dia_mes=dia,
+    )
+
+
+def reporte_memoria(df):
+    """
+    Compara la memoria de cada columna con la que ocuparía en el esquema
+    anterior (strings para producto y día, fechas como objetos date, int64).
+    """
+    nombres_dia = pd.Series(['Monday', 'Tuesday', 'Wednesday', 'Thursday',
+                             'Friday', 'Saturday', 'Sunday'], dtype=object)
+    anteriores = {
+        'producto': lambda s: s.astype(object),
+        'dia_semana': lambda s: nombres_dia.iloc[s.to_numpy()].reset_index(drop=True),
+        'fecha': lambda s: pd.Series(s.dt.date, dtype=object),
+        'media_hora': lambda s: s.astype('float64'),
+    }
+    filas = []
+    for columna in df.columns:
+        actual = df[columna].memory_usage(index=False, deep=True)
+        if columna in anteriores:
+            anterior = anteriores[columna](df[columna]).memory_usage(index=False, deep=True)
+        elif columna in TIPOS_TEMPORALES:
+            anterior = df[columna].astype('int64').memory_usage(index=False, deep=True)
+        else:
+            anterior = actual
+        filas.append((columna, anterior, actual))
+    reporte = pd.DataFrame(filas, columns=['Columna', 'Antes (bytes)', 'Ahora (bytes)'])
+    reporte.loc[len(reporte)] = ['TOTAL', reporte['Antes (bytes)'].sum(), reporte['Ahora (bytes)'].sum()]
+    reporte['Reducción (%)'] = (100 * (1 - reporte['Ahora (bytes)'] / reporte['Antes (bytes)'])).round(1)
+    return reporte
+
+
+def leer_catalogo(ruta=None):
+    """Productos.csv: separado por ';', con BOM; una fila por descripción"""
+    catalogo = pd.read_csv(ruta or RUTA_CATALOGO, sep=';', encoding='utf-8-sig')
+    catalogo['desc'] = catalogo['desc'].str.strip()
+    return catalogo.drop_duplicates('desc').set_index('desc')
+
+
+def construir_dimension_productos(nombres, catalogo=None):
+    """
+    Tabla de atributos por producto (una fila por nombre distinto): tipo y
+    tamaño de las picadas, familia y precio y código del catálogo. Las
+    expresiones regulares se aplican una vez por producto, no por fila.
+    La familia es 'PICADA' para las picadas y la primera palabra del nombre
+    para el resto.
+    """
+    nombres = pd.Index(pd.unique(pd.Series(nombres, dtype=object).dropna()), name='producto')
+    dimension = pd.Series(nombres, index=nombres).str.extract(PATRON_PICADA)
+    dimension['familia'] = pd.Series(nombres, index=nombres).str.split(' ', n=1).str[0]
+    dimension.loc[dimension['tipo'].notna(), 'familia'] = 'PICADA'
+    if catalogo is None:
+        catalogo = leer_catalogo() if RUTA_CATALOGO.exists() else None
+    if catalogo is not None:
+        dimension = dimension.join(catalogo[['precio', 'codigo_adm']].rename(columns={'codigo_adm': 'codigo'}))
+    return dimension
+
+
+def unir_atributos(productos, dimension, columnas):
+    """
+    Atributos de `dimension` para cada fila de la columna `productos`. Si es
+    categórica se resuelven las categorías una vez y se toma por código.
+    """
+    if not isinstance(productos.dtype, pd.CategoricalDtype):
+        productos = productos.astype('category')
+    # Un lugar extra al final (NaN) para el código -1 de los valores faltantes
+    categorias = list(productos.cat.categories) + [None]
+    codigos = productos.cat.codes.to_numpy()
+    atributos = {}
+    for columna in columnas:
+        valores = dimension[columna].reindex(categorias).to_numpy()
+        atributos[columna] = valores[codigos]
+    return pd.DataFrame(atributos, index=productos.index)
+
+
+class IndicePeriodos:
+    """
+    Índice de períodos sobre un frame ordenado por fecha_hora.
+
+    Guarda los rangos de filas [inicio, fin) de cada (año, mes) y resuelve
+    cualquier rango de fechas con searchsorted en O(log n). Los recortes
+    devuelven df.iloc[i:j], que no copia los datos.
+    """
+
+    def __init__(self, fechas):
+        self._fechas = pd.DatetimeIndex(fechas)
+        if len(self._fechas) == 0:
+            self.meses = pd.DataFrame(columns=['año', 'mes_num', 'inicio', 'fin'])
+            self._por_mes = {}
+            return
+        periodos = pd.period_range(self._fechas[0], self._fechas[-1], freq='M')
+        limites = self._fechas.searchsorted(periodos.to_timestamp(how='start'), side='left')
+        fines = list(limites[1:]) + [len(self._fechas)]
+        meses = pd.DataFrame({
+            'año': periodos.year,
+            'mes_num': periodos.month,
+            'inicio': limites,
+            'fin': fines,
+        })
+        self.meses = meses[meses['fin'] > meses['inicio']].reset_index(drop=True)
+        self._por_mes = {(a, m): (i, j) for a, m, i, j in self.meses.itertuples(index=False)}
+
+    def rango(self, desde, hasta):
+        """Posiciones [i, j) de las filas con desde <= fecha_hora < hasta"""
+        i = self._fechas.searchsorted(pd.Timestamp(desde), side='left')
+        j = self._fechas.searchsorted(pd.Timestamp(hasta), side='left')
+        return int(i), int(max(i, j))
+
+    def rango_mes(self, año, mes):
+        return self._por_mes.get((año, mes), (0, 0))
+
+    def recortar(self, df, desde, hasta):
+        """Filas del rango de fechas [desde, hasta) sin copiar"""
+        i, j = self.rango(desde, hasta)
+        return df.iloc[i:j]
+
+    def mes(self, df, año, mes):
+        """Filas de un mes calendario sin copiar"""
+        i, j = self.rango_mes(año, mes)
+        return df.iloc[i:j]
+
+
+def _acumular(valores):
+    """Suma acumulada por filas con una fila de ceros al principio"""
+    ceros = np.zeros((1,) + valores.shape[1:], dtype=valores.dtype)
+    return np.concatenate([ceros, np.cumsum(valores, axis=0)])
+
+
+class AcumuladosDiarios:
+    """
+    Sumas acumuladas por día calendario de un frame con fecha, producto y
+    cantidad: total, días con ventas y lo mismo por producto y por grupo de
+    productos. El total o la cantidad de días activos de cualquier rango
+    [desde, hasta) es la resta de dos posiciones, sin recorrer filas.
+    """
+
+    def __init__(self, df, grupos=None):
+        """grupos: {nombre: productos} con totales y días activos propios"""
+        productos = df['producto'].astype('category')
+        self.productos = pd.Index(productos.cat.categories, name='producto')
+        fechas = pd.DatetimeIndex(df['fecha']).normalize()
+        self.inicio = fechas.min() if len(fechas) else pd.Timestamp(0)
+        self.dias = (fechas.max() - self.inicio).days + 1 if len(fechas) else 0
+
+        celda = (fechas - self.inicio).days.to_numpy() * len(self.productos) + productos.cat.codes.to_numpy()
+        forma = (self.dias, len(self.productos))
+        unidades = np.bincount(celda, weights=df['cantidad'].to_numpy(dtype='float64'),
+                               minlength=forma[0] * forma[1]).reshape(forma)
+        if pd.api.types.is_integer_dtype(df['cantidad'].dtype):
+            unidades = unidades.round().astype(np.int64)
+        presencia = np.bincount(celda, minlength=forma[0] * forma[1]).reshape(forma) > 0
+
+        self._total = {None: _acumular(unidades.sum(axis=1))}
+        self._activos = {None: _acumular(presencia.any(axis=1).astype(np.int64))}
+        for nombre, miembros in (grupos or {}).items():
+            columnas = self.productos.get_indexer(list(miembros))
+            columnas = columnas[columnas >= 0]
+            self._total[nombre] = _acumular(unidades[:, columnas].sum(axis=1))
+            self._activos[nombre] = _acumular(presencia[:, columnas].any(axis=1).astype(np.int64))
+        self._por_producto = _acumular(unidades)
+        self._activos_por_producto = _acumular(presencia.astype(np.int32))
+
+    def _posiciones(self, desde=None, hasta=None):
+        """Filas [i, j) de los días con desde <= fecha < hasta"""
+        def posicion(fecha, defecto):
+            if fecha is None:
+                return defecto
+            return int(np.clip((pd.Timestamp(fecha).ceil('D') - self.inicio).days, 0, self.dias))
+        i, j = posicion(desde, 0), posicion(hasta, self.dias)
+        return i, max(i, j)
+
+    def total(self, desde=None, hasta=None, grupo=None):
+        """Unidades en el rango, de todos los productos o de un grupo"""
+        i, j = self._posiciones(desde, hasta)
+        return self._total[grupo][j] - self._total[grupo][i]
+
+    def dias_activos(self, desde=None, hasta=None, grupo=None):
+        """Días con al menos una venta (del grupo, si se indica) en el rango"""
+        i, j = self._posiciones(desde, hasta)
+        return int(self._activos[grupo][j] - self._activos[grupo][i])
+
+    def promedio_diario(self, desde=None, hasta=None, grupo=None):
+        """Unidades por día con ventas (0 si no hubo ventas)"""
+        dias = self.dias_activos(desde, hasta, grupo)
+        return self.total(desde, hasta, grupo) / dias if dias else 0.0
+
+    def promedio_productos(self, desde=None, hasta=None):
+        """Unidades por día con ventas de cada producto en el rango (0 si no tuvo ventas)"""
+        i, j = self._posiciones(desde, hasta)
+        totales = self._por_producto[j] - self._por_producto[i]
+        dias = self._activos_por_producto[j] - self._activos_por_producto[i]
+        return pd.Series(np.divide(totales, dias, out=np.zeros(len(dias)), where=dias > 0),
+                         index=self.productos, name='cantidad')
@@ -0,0 +1,486 @@
+"""Análisis de canastas: matriz dispersa transacción × producto y co-ocurrencias."""
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import combinations
+from multiprocessing import get_context
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+
+@dataclass
+class MatrizCanastas:
+    """
+    Canastas como matriz CSR binaria: filas = transacciones, columnas = productos.
+    `lineas` es la cantidad de renglones de venta de cada transacción.
+    """
+    matriz: sparse.csr_matrix
+    transacciones: pd.Index
+    productos: pd.Index
+    lineas: np.ndarray
+
+    @property
+    def num_productos(self):
+        """Productos distintos de cada canasta"""
+        return np.diff(self.matriz.indptr)
+
+    @property
+    def productos_presentes(self):
+        """Productos que aparecen en al menos una canasta"""
+        return self.productos[self.matriz.getnnz(axis=0) > 0]
+
+
+def sesionizar(fechas, brecha_segundos=0):
+    """
+    Id entero de transacción para cada fila: en orden temporal, una fila abre
+    una transacción nueva si la separan más de `brecha_segundos` de la
+    anterior. Con 0 solo se agrupan los renglones con la misma marca de
+    tiempo. Los ids quedan en el orden original de las filas.
+    """
+    valores = np.asarray(fechas, dtype='datetime64[ns]')
+    if len(valores) == 0:
+        return np.empty(0, dtype=np.int64)
+    ordenado = bool(np.all(valores[1:] >= valores[:-1]))
+    orden = None if ordenado else np.argsort(valores, kind='stable')
+    valores = valores if ordenado else valores[orden]
+
+    nueva = np.empty(len(valores), dtype=bool)
+    nueva[0] = True
+    nueva[1:] = np.diff(valores) > np.timedelta64(int(brecha_segundos), 's')
+    ids = np.cumsum(nueva) - 1
+    if ordenado:
+        return ids
+    resultado = np.empty_like(ids)
+    resultado[orden] = ids
+    return resultado
+
+
+def matriz_canastas(transacciones, productos, catalogo=None):
+    """
+    Construye la matriz de canastas a partir de dos columnas paralelas
+    (id de transacción y producto). Un producto repetido en la misma
+    transacción cuenta una sola vez. Con `catalogo` las columnas son las del
+    catálogo (y coinciden entre matrices de distintos períodos).
+    """
+    filas, ids = pd.factorize(np.asarray(transacciones), sort=True)
+    if catalogo is None:
+        columnas, nombres = pd.factorize(np.asarray(productos, dtype=object), sort=True)
+    else:
+        nombres = pd.Index(catalogo)
+        columnas = nombres.get_indexer(np.asarray(productos, dtype=object))
+    matriz = sparse.csr_matrix(
+        (np.ones(len(filas), dtype=np.int32), (filas, columnas)),
+        shape=(len(ids), len(nombres)),
+    )
+    # El constructor suma los duplicados: se vuelve a binaria
+    matriz.data[:] = 1
+    lineas = np.bincount(filas, minlength=len(ids))
+    return MatrizCanastas(matriz, pd.Index(ids), pd.Index(nombres), lineas)
+
+
+def coocurrencias(canastas, filas=None):
+    """
+    C = Xᵀ·X: C[i, j] es la cantidad de canastas con los productos i y j;
+    la diagonal es la cantidad de canastas con cada producto. `filas`
+    restringe las canastas consideradas.
+    """
+    matriz = canastas.matriz if filas is None else canastas.matriz[filas]
+    return (matriz.T @ matriz).tocsr()
+
+
+class IndiceCoocurrencias:
+    """
+    Índice producto -> productos con los que se compra, sobre las filas de la
+    matriz de co-ocurrencias. Consultar un producto cuesta O(socios).
+    """
+
+    def __init__(self, coocurrencia, productos):
+        self.coocurrencia = coocurrencia
+        self.productos = pd.Index(productos)
+        self._nombres = self.productos.to_numpy(dtype=object)
+        self._apariciones = coocurrencia.diagonal()
+
+    def apariciones(self, producto):
+        """Cantidad de canastas en las que aparece el producto"""
+        return int(self._apariciones[self.productos.get_loc(producto)])
+
+    def socios(self, producto):
+        """Frecuencia con la que cada otro producto aparece junto a `producto`, de mayor a menor"""
+        posicion = self.productos.get_loc(producto)
+        inicio, fin = self.coocurrencia.indptr[posicion], self.coocurrencia.indptr[posicion + 1]
+        columnas = self.coocurrencia.indices[inicio:fin]
+        frecuencias = self.coocurrencia.data[inicio:fin]
+        otros = (columnas != posicion) & (frecuencias > 0)
+        columnas, frecuencias = columnas[otros], frecuencias[otros]
+        orden = np.lexsort((self._nombres[columnas], -frecuencias))
+        return pd.Series(frecuencias[orden], index=pd.Index(self._nombres[columnas[orden]], name='producto'),
+                         name='frecuencia')
+
+
+def top_pares(coocurrencia, productos, k=20):
+    """
+    Los k pares más frecuentes, tomados del triángulo superior de la matriz
+    de co-ocurrencias (cada par una sola vez, sin la diagonal). Empates por
+    orden alfabético.
+    """
+    triangulo = sparse.triu(coocurrencia, k=1).tocoo()
+    frecuencia = triangulo.data
+    if len(frecuencia) > k:
+        # Preselección O(n) antes de ordenar: se conservan los empates con el k-ésimo
+        corte = np.partition(frecuencia, len(frecuencia) - k)[len(frecuencia) - k]
+        candidatos = frecuencia >= corte
+    else:
+        candidatos = np.ones(len(frecuencia), dtype=bool)
+    filas, columnas, frecuencia = triangulo.row[candidatos], triangulo.col[candidatos], frecuencia[candidatos]
+    nombres = np.asarray(productos, dtype=object)
+    orden = np.lexsort((nombres[columnas], nombres[filas], -frecuencia))[:k]
+    return pd.DataFrame({
+        'producto_1': nombres[filas[orden]],
+        'producto_2': nombres[columnas[orden]],
+        'frecuencia': frecuencia[orden],
+    })
+
+
+class RecomendadorProductos:
+    """
+    Recomendaciones producto → producto a partir de la matriz de
+    co-ocurrencias. La similitud ('coseno' o 'lift') se precalcula una vez y
+    se guarda dispersa, truncada a los `n_max` mejores de cada producto, así
+    que cada consulta es una lectura de O(n_max).
+    """
+
+    def __init__(self, coocurrencia, productos, total_canastas, metodo='coseno', n_max=20, minimo_coocurrencias=2):
+        self.productos = pd.Index(productos)
+        self.metodo = metodo
+        self._nombres = self.productos.to_numpy(dtype=object)
+
+        coo = sparse.coo_matrix(coocurrencia)
+        apariciones = coocurrencia.diagonal().astype('float64')
+        fuera_diagonal = (coo.row != coo.col) & (coo.data >= minimo_coocurrencias)
+        filas, columnas = coo.row[fuera_diagonal], coo.col[fuera_diagonal]
+        conjuntas = coo.data[fuera_diagonal].astype('float64')
+        if metodo == 'coseno':
+            similitud = conjuntas / np.sqrt(apariciones[filas] * apariciones[columnas])
+        elif metodo == 'lift':
+            similitud = conjuntas * total_canastas / (apariciones[filas] * apariciones[columnas])
+        else:
+            raise ValueError(f"Método desconocido: {metodo!r} (usar 'coseno' o 'lift')")
+
+        # Los n_max mejores de cada fila: orden por (fila, -similitud) y rango dentro de la fila
+        orden = np.lexsort((self._nombres[columnas], -similitud, filas))
+        filas, columnas, similitud = filas[orden], columnas[orden], similitud[orden]
+        inicio_fila = np.searchsorted(filas, filas, side='left')
+        conservar = np.arange(len(filas)) - inicio_fila < n_max
+        filas, columnas, similitud = filas[conservar], columnas[conservar], similitud[conservar]
+        # CSR armado a mano para que cada fila quede ordenada por similitud y no por columna
+        indptr = np.searchsorted(filas, np.arange(len(self.productos) + 1), side='left')
+        self.similitud = sparse.csr_matrix((similitud, columnas, indptr),
+                                           shape=(len(self.productos), len(self.productos)))
+
+    def _fila(self, posicion):
+        inicio, fin = self.similitud.indptr[posicion], self.similitud.indptr[posicion + 1]
+        return self.similitud.indices[inicio:fin], self.similitud.data[inicio:fin]
+
+    def recomendar(self, producto, n=5):
+        """Los n productos más afines a `producto`, con su similitud"""
+        if producto not in self.productos:
+            return pd.Series(dtype='float64', name='similitud')
+        columnas, valores = self._fila(self.productos.get_loc(producto))
+        return pd.Series(valores[:n], index=pd.Index(self._nombres[columnas[:n]], name='producto'),
+                         name='similitud')
+
+    def recomendar_todos(self, n=5):
+        """Recomendaciones de todos los productos a la vez: producto, rango, recomendado, similitud"""
+        indptr = self.similitud.indptr
+        filas = np.repeat(np.arange(len(self.productos)), np.diff(indptr))
+        rango = np.arange(len(filas)) - indptr[filas] + 1
+        conservar = rango <= n
+        return pd.DataFrame({
+            'producto': self._nombres[filas[conservar]],
+            'rango': rango[conservar],
+            'recomendado': self._nombres[self.similitud.indices[conservar]],
+            'similitud': self.similitud.data[conservar],
+        })
+
+
+# Por debajo de estas filas el costo de arrancar procesos supera al del cálculo: con
+# spawn cada proceso vuelve a importar numpy, pandas y scipy (~1 s) y se mina ~1M filas/s
+FILAS_MINIMAS_PARALELO = 2_000_000
+
+
+@dataclass
+class ParticionCanastas:
+    """Canastas de un período (mes) con sus conteos; se combinan con combinar_particiones"""
+    canastas: MatrizCanastas
+    coocurrencia: sparse.csr_matrix
+    horas: np.ndarray
+
+
+def minar_particion(fechas, productos, catalogo, brecha_segundos=0):
+    """
+    Canastas, co-ocurrencias de las transacciones múltiples y hora de inicio
+    de cada transacción de una partición. Las columnas son las del catálogo.
+    """
+    fechas = np.asarray(fechas, dtype='datetime64[ns]')
+    ids = sesionizar(fechas, brecha_segundos)
+    canastas = matriz_canastas(ids, productos, catalogo)
+    _, primeras = np.unique(ids, return_index=True)
+    horas = pd.DatetimeIndex(fechas[primeras]).hour.to_numpy()
+    return ParticionCanastas(canastas, coocurrencias(canastas, filas=canastas.lineas > 1), horas)
+
+
+def _minar(argumentos):
+    return minar_particion(*argumentos)
+
+
+def minar_particiones(particiones, catalogo, brecha_segundos=0, procesos=None):
+    """
+    Mina varias particiones {clave: (fechas, productos)}, en un pool de
+    procesos si el volumen lo justifica. Devuelve {clave: ParticionCanastas}.
+    """
+    claves = list(particiones)
+    argumentos = [(*particiones[clave], catalogo, brecha_segundos) for clave in claves]
+    filas = sum(len(fechas) for fechas, _ in particiones.values())
+    if len(claves) > 1 and filas >= FILAS_MINIMAS_PARALELO and procesos != 1:
+        # spawn y no fork: el proceso que llama (Streamlit) tiene varios hilos
+        with ProcessPoolExecutor(max_workers=procesos, mp_context=get_context("spawn")) as pool:
+            resultados = list(pool.map(_minar, argumentos))
+    else:
+        resultados = [_minar(args) for args in argumentos]
+    return dict(zip(claves, resultados))
+
+
+class AlmacenParticiones:
+    """
+    Particiones ya minadas por clave, compartidas entre hilos (sesiones);
+    un lock protege el diccionario.
+    """
+
+    def __init__(self):
+        self._particiones = {}
+        self._lock = threading.Lock()
+
+    def faltantes(self, claves):
+        """Claves que todavía no se minaron"""
+        with self._lock:
+            return [clave for clave in claves if clave not in self._particiones]
+
+    def agregar(self, particiones):
+        with self._lock:
+            self._particiones.update(particiones)
+
+    def obtener(self, claves):
+        with self._lock:
+            return [self._particiones[clave] for clave in claves]
+
+
+def combinar_particiones(particiones, catalogo):
+    """
+    Une particiones minadas con el mismo catálogo: las matrices de canastas
+    se apilan y las co-ocurrencias se suman.
+    """
+    catalogo = pd.Index(catalogo)
+    if not particiones:
+        vacia = sparse.csr_matrix((0, len(catalogo)), dtype=np.int32)
+        canastas = MatrizCanastas(vacia, pd.RangeIndex(0), catalogo, np.empty(0, dtype=np.int64))
+        return ParticionCanastas(canastas, sparse.csr_matrix((len(catalogo), len(catalogo)), dtype=np.int32),
+                                 np.empty(0, dtype=np.int64))
+    matriz = sparse.vstack([p.canastas.matriz for p in particiones], format='csr')
+    canastas = MatrizCanastas(matriz, pd.RangeIndex(matriz.shape[0]), catalogo,
+                              np.concatenate([p.canastas.lineas for p in particiones]))
+    coocurrencia = particiones[0].coocurrencia.copy()
+    for particion in particiones[1:]:
+        coocurrencia = coocurrencia + particion.coocurrencia
+    return ParticionCanastas(canastas, coocurrencia.tocsr(), np.concatenate([p.horas for p in particiones]))
+
+
+# Cantidad de bits encendidos de cada byte, para contar transacciones en un bitset
+_BITS_POR_BYTE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint16)
+
+
+def _bitsets(matriz):
+    """Bitset empaquetado de las transacciones de cada columna (una fila por columna)"""
+    coo = matriz.tocoo()
+    bits = np.zeros((matriz.shape[1], (matriz.shape[0] + 7) // 8), dtype=np.uint8)
+    np.bitwise_or.at(bits, (coo.col, coo.row >> 3), (128 >> (coo.row & 7)).astype(np.uint8))
+    return bits
+
+
+def itemsets_frecuentes(canastas, soporte_minimo=0.01, tamaño_maximo=3, filas=None):
+    """
+    Conjuntos de productos frecuentes de cualquier tamaño (Eclat con bitsets).
+
+    soporte_minimo es la fracción de canastas en la que debe aparecer el
+    conjunto; `filas` restringe las canastas consideradas. La búsqueda es
+    en profundidad: solo se mantiene en memoria la cadena de intersecciones
+    del prefijo actual y el resultado. Devuelve un frame con items (tupla
+    ordenada de nombres), tamaño, frecuencia y soporte.
+    """
+    matriz = canastas.matriz if filas is None else canastas.matriz[filas]
+    total = matriz.shape[0]
+    minimo = max(1, int(np.ceil(soporte_minimo * total)))
+    conteos = np.asarray(matriz.sum(axis=0)).ravel()
+
+    # Orden por frecuencia ascendente: las intersecciones se achican antes
+    frecuentes = np.flatnonzero(conteos >= minimo)
+    frecuentes = frecuentes[np.argsort(conteos[frecuentes], kind='stable')]
+    bits = _bitsets(matriz[:, frecuentes])
+
+    conjuntos = [(posicion,) for posicion in range(len(frecuentes))]
+    frecuencias = list(conteos[frecuentes])
+
+    def extender(prefijo, bits_prefijo, candidatos):
+        if len(prefijo) >= tamaño_maximo or len(candidatos) == 0:
+            return
+        interseccion = bits[candidatos] & bits_prefijo
+        cuenta = _BITS_POR_BYTE[interseccion].sum(axis=1)
+        alcanzan = cuenta >= minimo
+        candidatos, interseccion, cuenta = candidatos[alcanzan], interseccion[alcanzan], cuenta[alcanzan]
+        for j, candidato in enumerate(candidatos):
+            conjunto = prefijo + (candidato,)
+            conjuntos.append(conjunto)
+            frecuencias.append(cuenta[j])
+            extender(conjunto, interseccion[j], candidatos[j + 1:])
+
+    for posicion in range(len(frecuentes)):
+        extender((posicion,), bits[posicion], np.arange(posicion + 1, len(frecuentes)))
+
+    nombres = canastas.productos.to_numpy(dtype=object)[frecuentes]
+    items = [tuple(sorted(nombres[list(conjunto)])) for conjunto in conjuntos]
+    resultado = pd.DataFrame({
+        'items': pd.Series(items, dtype=object),
+        'tamaño': np.fromiter(map(len, conjuntos), dtype=np.int64, count=len(conjuntos)),
+        'frecuencia': np.asarray(frecuencias, dtype=np.int64),
+    })
+    resultado['soporte'] = resultado['frecuencia'] / total if total else 0.0
+    return (resultado.sort_values(['tamaño', 'frecuencia', 'items'], ascending=[True, False, True], kind='stable')
+            .reset_index(drop=True))
+
+
+def reglas_asociacion(itemsets, total):
+    """
+    Reglas antecedente → consecuente de todos los conjuntos frecuentes de
+    tamaño ≥ 2, con todas las particiones posibles de cada conjunto.
+
+    Los conteos de antecedente y consecuente se buscan en `itemsets` (por
+    antimonotonía todo subconjunto de un conjunto frecuente también lo es) y
+    las métricas se calculan de una vez sobre los arreglos de conteos.
+    `total` es la cantidad de canastas sobre la que se contaron los itemsets.
+    """
+    antecedentes, consecuentes, conjuntos = [], [], []
+    for posicion, items in enumerate(itemsets['items']):
+        if len(items) < 2:
+            continue
+        for tamaño in range(1, len(items)):
+            for antecedente in combinations(items, tamaño):
+                antecedentes.append(antecedente)
+                consecuentes.append(tuple(item for item in items if item not in antecedente))
+                conjuntos.append(posicion)
+
+    indice = pd.Index(itemsets['items'], tupleize_cols=False)
+    frecuencias = itemsets['frecuencia'].to_numpy(dtype='float64')
+    n_ab = frecuencias[np.asarray(conjuntos, dtype=np.int64)]
+    n_a = frecuencias[indice.get_indexer(pd.Index(antecedentes, dtype=object, tupleize_cols=False))]
+    n_b = frecuencias[indice.get_indexer(pd.Index(consecuentes, dtype=object, tupleize_cols=False))]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        soporte = n_ab / total
+        soporte_b = n_b / total
+        confianza = n_ab / n_a
+        lift = confianza / soporte_b
+        leverage = soporte - (n_a / total) * soporte_b
+        # Conviction infinita cuando la regla nunca falla (confianza = 1)
+        conviction = np.where(confianza < 1, (1 - soporte_b) / (1 - confianza), np.inf)
+
+    return pd.DataFrame({
+        'antecedente': pd.Series(antecedentes, dtype=object),
+        'consecuente': pd.Series(consecuentes, dtype=object),
+        'frecuencia': n_ab.astype(np.int64),
+        'soporte': soporte,
+        'confianza': confianza,
+        'lift': lift,
+        'leverage': leverage,
+        'conviction': conviction,
+    })
+
+
+def pares_de_canastas(matriz):
+    """
+    Todos los pares (i < j) de productos de cada fila de una matriz CSR de
+    canastas, vectorizado. Devuelve dos arreglos paralelos de columnas.
+    """
+    largos = np.diff(matriz.indptr)
+    # Posición de cada elemento dentro de su fila y cuántos elementos le siguen
+    posicion = np.arange(matriz.nnz) - np.repeat(matriz.indptr[:-1], largos)
+    siguientes = np.repeat(largos, largos) - posicion - 1
+    total = int(siguientes.sum())
+    primero = np.repeat(np.arange(matriz.nnz), siguientes)
+    desplazamiento = np.arange(total) - np.repeat(np.cumsum(siguientes) - siguientes, siguientes)
+    segundo = primero + 1 + desplazamiento
+    return matriz.indices[primero], matriz.indices[segundo]
+
+
+class ResumenFrecuentes:
+    """
+    Resumen de elementos frecuentes con memoria fija (Misra-Gries en su forma
+    combinable, equivalente a Space-Saving): guarda a lo sumo `capacidad`
+    contadores. Cada estimación es una cota inferior de la frecuencia real y
+    la subestima como mucho en `error`, que nunca supera total / (capacidad + 1).
+    """
+
+    def __init__(self, capacidad):
+        self.capacidad = capacidad
+        self.claves = np.empty(0, dtype=np.int64)
+        self.cuentas = np.empty(0, dtype=np.int64)
+        self.total = 0
+        self.error = 0
+
+    def agregar(self, claves, pesos=None):
+        """Suma un bloque de ocurrencias (claves enteras, con peso opcional)"""
+        claves = np.asarray(claves, dtype=np.int64)
+        pesos = np.ones(len(claves), dtype=np.int64) if pesos is None else np.asarray(pesos, dtype=np.int64)
+        self.total += int(pesos.sum())
+        claves, inversa = np.unique(np.concatenate([self.claves, claves]), return_inverse=True)
+        cuentas = np.bincount(inversa, weights=np.concatenate([self.cuentas, pesos]),
+                              minlength=len(claves)).astype(np.int64)
+        if len(claves) > self.capacidad:
+            # Se descuenta a todos el (capacidad + 1)-ésimo contador y se descartan los que quedan en 0
+            descuento = np.partition(cuentas, len(cuentas) - self.capacidad - 1)[len(cuentas) - self.capacidad - 1]
+            cuentas -= descuento
+            self.error += int(descuento)
+            conservar = cuentas > 0
+            claves, cuentas = claves[conservar], cuentas[conservar]
+        self.claves, self.cuentas = claves, cuentas
+
+    def top(self, k):
+        """Las k claves con mayor estimación y sus estimaciones"""
+        orden = np.lexsort((self.claves, -self.cuentas))[:k]
+        return self.claves[orden], self.cuentas[orden]
+
+
+def top_pares_aproximados(canastas, k=20, capacidad=1000, filas=None, tamaño_bloque=5000):
+    """
+    Top-k pares en un solo recorrido por bloques de canastas, con memoria
+    acotada por `capacidad` contadores (más los pares de un bloque).
+
+    Devuelve (pares, resumen): frecuencia es una cota inferior y
+    frecuencia_maxima = frecuencia + resumen.error una cota superior.
+    """
+    matriz = canastas.matriz if filas is None else canastas.matriz[filas]
+    num_productos = matriz.shape[1]
+    resumen = ResumenFrecuentes(capacidad)
+    for inicio in range(0, matriz.shape[0], tamaño_bloque):
+        primero, segundo = pares_de_canastas(matriz[inicio:inicio + tamaño_bloque])
+        resumen.agregar(primero.astype(np.int64) * num_productos + segundo)
+
+    claves, cuentas = resumen.top(k)
+    nombres = canastas.productos.to_numpy(dtype=object)
+    pares = pd.DataFrame({
+        'producto_1': nombres[claves // num_productos],
+        'producto_2': nombres[claves % num_productos],
+        'frecuencia': cuentas,
+        'frecuencia_maxima': cuentas + resumen.error,
+    })
+    return pares, resumen
@@ -0,0 +1,124 @@
+"""Resumen de ventas de picadas: los agregados de todas las subpestañas en una pasada."""
+import numpy as np
+import pandas as pd
+
+HORAS = 24
+
+# Picadas que se analizan y pronostican (tipo × tamaño)
+PRODUCTOS_PICADAS = [
+    'TABLA SAN FRANCISCO CHICA', 'TABLA SAN FRANCISCO MEDIANA', 'TABLA SAN FRANCISCO GRANDE',
+    'TABLA CRIOLLA CHICA', 'TABLA CRIOLLA MEDIANA', 'TABLA CRIOLLA GRANDE',
+    'TABLA ITALIANA CHICA', 'TABLA ITALIANA MEDIANA', 'TABLA ITALIANA GRANDE',
+    'TABLA PAMPEANA CHICA', 'TABLA PAMPEANA MEDIANA', 'TABLA PAMPEANA GRANDE',
+    'TABLA IBERICA CHICA', 'TABLA IBERICA MEDIANA', 'TABLA IBERICA GRANDE',
+    'TABLA DE QUESOS CHICA', 'TABLA DE QUESOS MEDIANA', 'TABLA DE QUESOS GRANDE',
+    'TABLA CHACARERA CHICA', 'TABLA CHACARERA MEDIANA', 'TABLA CHACARERA GRANDE',
+    'TABLA TRADICIONAL CHICA', 'TABLA TRADICIONAL MEDIANA', 'TABLA TRADICIONAL GRANDE'
+]
+
+
+class ResumenPicadas:
+    """
+    Agregados de ventas de picadas calculados en una sola pasada sobre las
+    filas del cubo: un arreglo producto × día de la semana × hora con las
+    unidades (más otro con la cantidad de filas, para saber qué celdas
+    tienen ventas) y la serie diaria. Los totales por producto, tipo,
+    tamaño, día y hora son sumas de ese arreglo; solo incluyen las claves
+    con ventas, igual que un groupby.
+    """
+
+    def __init__(self, ventas, dimension):
+        """
+        ventas: frame con fecha, dia_semana (0 = lunes), hora_num, producto y cantidad
+        dimension: atributos por producto (construir_dimension_productos)
+        """
+        codigos, productos = pd.factorize(ventas['producto'], sort=True)
+        self.productos = pd.Index(np.asarray(productos, dtype=object), name='producto')
+        celda = (codigos.astype(np.int64) * 7 + ventas['dia_semana'].to_numpy(dtype=np.int64)) * HORAS \
+            + ventas['hora_num'].to_numpy(dtype=np.int64)
+        forma = (len(self.productos), 7, HORAS)
+        cantidad = ventas['cantidad']
+        self._entero = pd.api.types.is_integer_dtype(cantidad.dtype)
+        self.unidades = np.bincount(celda, weights=cantidad.to_numpy(dtype='float64'),
+                                    minlength=np.prod(forma)).reshape(forma)
+        self.filas = np.bincount(celda, minlength=np.prod(forma)).reshape(forma)
+
+        codigos_fecha, fechas = pd.factorize(ventas['fecha'], sort=True)
+        fechas = pd.DatetimeIndex(fechas, name='fecha')
+        self.por_fecha = self._serie(np.bincount(codigos_fecha, weights=cantidad.to_numpy(dtype='float64'),
+                                                 minlength=len(fechas)), fechas)
+        # Fechas con ventas de cada día de la semana (divisor de los promedios)
+        self.fechas_por_dia_semana = np.bincount(fechas.dayofweek, minlength=7)
+
+        atributos = dimension.reindex(self.productos)
+        self.tipo = atributos['tipo']
+        self.tamaño = atributos['tamaño']
+
+    def _serie(self, valores, indice):
+        valores = np.asarray(valores)
+        return pd.Series(valores.round().astype(np.int64) if self._entero else valores,
+                         index=indice, name='cantidad')
+
+    def _sumar(self, ejes, nombre):
+        """Total por el eje que queda, solo con las claves que tienen filas"""
+        total = self.unidades.sum(axis=ejes)
+        presentes = self.filas.sum(axis=ejes) > 0
+        indice = pd.Index(np.flatnonzero(presentes), name=nombre)
+        return self._serie(total[presentes], indice)
+
+    @property
+    def por_producto(self):
+        presentes = self.filas.sum(axis=(1, 2)) > 0
+        return self._serie(self.unidades.sum(axis=(1, 2))[presentes], self.productos[presentes])
+
+    @property
+    def por_tipo(self):
+        por_producto = self.por_producto
+        return por_producto.groupby(self.tipo[por_producto.index].to_numpy()).sum().rename_axis('tipo_picada')
+
+    @property
+    def por_tamaño(self):
+        por_producto = self.por_producto
+        return por_producto.groupby(self.tamaño[por_producto.index].to_numpy()).sum().rename_axis('tamaño')
+
+    @property
+    def por_dia_semana(self):
+        return self._sumar((0, 2), 'dia_semana')
+
+    @property
+    def promedio_por_dia_semana(self):
+        """Unidades por fecha de cada día de la semana"""
+        por_dia = self.por_dia_semana
+        return por_dia / self.fechas_por_dia_semana[por_dia.index]
+
+    @property
+    def por_hora(self):
+        return self._sumar((0, 1), 'hora_num')
+
+    @property
+    def dia_hora(self):
+        """Matriz día de la semana (filas) × hora (columnas), con ceros donde no hubo ventas"""
+        unidades = self.unidades.sum(axis=0)
+        if self._entero:
+            unidades = unidades.round().astype(np.int64)
+        filas = self.filas.sum(axis=0)
+        dias = np.flatnonzero(filas.sum(axis=1) > 0)
+        horas = np.flatnonzero(filas.sum(axis=0) > 0)
+        return pd.DataFrame(unidades[np.ix_(dias, horas)],
+                            index=pd.Index(dias, name='dia_semana'),
+                            columns=pd.Index(horas, name='hora_num'))
+
+    @property
+    def hora_tamaño(self):
+        """Unidades por hora y tamaño (formato largo: hora_num, tamaño, cantidad)"""
+        tamaños, codigos = np.unique(self.tamaño.fillna('').to_numpy(dtype=object).astype(str),
+                                     return_inverse=True)
+        unidades = np.zeros((len(tamaños), HORAS))
+        filas = np.zeros((len(tamaños), HORAS), dtype=np.int64)
+        np.add.at(unidades, codigos, self.unidades.sum(axis=1))
+        np.add.at(filas, codigos, self.filas.sum(axis=1))
+        t, h = np.nonzero(filas)
+        largo = pd.DataFrame({'hora_num': h, 'tamaño': tamaños[t],
+                              'cantidad': self._serie(unidades[t, h], None).to_numpy()})
+        largo = largo[largo['tamaño'] != '']
+        return largo.sort_values(['hora_num', 'tamaño'], kind='stable').reset_index(drop=True)
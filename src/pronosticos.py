@@ -0,0 +1,342 @@
+"""Pronósticos de demanda: promedio por día de la semana y modelos Prophet por producto."""
+import hashlib
+import json
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    from prophet import Prophet
+    from prophet.serialize import model_to_json
+except ImportError:  # Prophet es opcional: sin él solo queda el promedio por día de la semana
+    Prophet = None
+
+PROPHET_DISPONIBLE = Prophet is not None
+
+FRANJAS_POR_DIA = 48
+# Días que pronostica cada modelo Prophet; el batch y el dashboard usan el mismo
+HORIZONTE = 28
+METRICAS_FRANJAS = ('unidades', 'transacciones')
+
+
+def conteo_dias_semana(desde, hasta):
+    """
+    Cantidad de lunes, martes, ..., domingos de cada rango [desde, hasta]
+    (fechas inclusive). Acepta escalares o arreglos paralelos y devuelve una
+    matriz rangos × 7, sin generar los días de cada rango.
+    """
+    desde = pd.DatetimeIndex(np.atleast_1d(pd.to_datetime(desde))).normalize()
+    hasta = pd.DatetimeIndex(np.atleast_1d(pd.to_datetime(hasta))).normalize()
+    dias = np.maximum((hasta - desde).days.to_numpy() + 1, 0)
+    primer_dia = desde.dayofweek.to_numpy()
+    # Semanas completas más los días sobrantes a partir del primer día del rango
+    desfase = (np.arange(7)[None, :] - primer_dia[:, None]) % 7
+    return dias[:, None] // 7 + (desfase < (dias % 7)[:, None])
+
+
+class PronosticadorPicadas:
+    """
+    Tasa de venta producto × día de la semana: unidades vendidas de cada
+    producto en ese día de la semana dividido por la cantidad de fechas de
+    ese día con ventas. El pronóstico de un rango es el vector de conteos
+    de días de la semana por la matriz de tasas.
+    """
+
+    def __init__(self, ventas, productos=None):
+        """ventas: frame con fecha, dia_semana (0 = lunes), producto y cantidad"""
+        self.productos = pd.Index(productos if productos is not None else sorted(ventas['producto'].unique()))
+        dia = ventas['dia_semana'].to_numpy(dtype=np.int64)
+        fila = self.productos.get_indexer(ventas['producto'].astype(object))
+        conocidos = fila >= 0
+
+        unidades = np.zeros((len(self.productos), 7))
+        np.add.at(unidades, (fila[conocidos], dia[conocidos]), ventas['cantidad'].to_numpy(dtype='float64')[conocidos])
+
+        fechas = ventas[['fecha', 'dia_semana']].drop_duplicates('fecha')
+        self.dias_observados = np.bincount(fechas['dia_semana'].to_numpy(dtype=np.int64), minlength=7)
+        self.tasas = np.divide(unidades, self.dias_observados, out=np.zeros_like(unidades),
+                               where=self.dias_observados > 0)
+
+    def predecir_rangos(self, desde, hasta):
+        """Unidades estimadas de cada producto (columnas) para cada rango (filas)"""
+        conteos = conteo_dias_semana(desde, hasta)
+        return pd.DataFrame(conteos @ self.tasas.T, columns=self.productos)
+
+    def predecir(self, desde, hasta):
+        """Unidades estimadas de cada producto en el rango [desde, hasta]"""
+        return self.predecir_rangos(desde, hasta).iloc[0]
+
+    def por_dia_semana(self, desde, hasta):
+        """Días de cada día de la semana en el rango, promedio diario total y total estimado"""
+        conteo = conteo_dias_semana(desde, hasta)[0]
+        promedio = self.tasas.sum(axis=0)
+        return pd.DataFrame({
+            'dia_semana': np.arange(7),
+            'dias': conteo,
+            'promedio': promedio,
+            'total': promedio * conteo,
+        })
+
+
+def matriz_franjas(fechas_hora, cantidades, transacciones=None):
+    """
+    Unidades y transacciones por fecha con ventas y franja de media hora.
+    Devuelve (fechas, valores) con valores de forma 2 × fechas × 48. Una
+    transacción (ids de `transacciones`; por defecto, cada marca de tiempo
+    distinta) cuenta en la franja de su primer renglón.
+    """
+    marcas = pd.DatetimeIndex(fechas_hora)
+    codigos_fecha, fechas = pd.factorize(marcas.normalize(), sort=True)
+    celda = codigos_fecha * FRANJAS_POR_DIA + marcas.hour.to_numpy() * 2 + (marcas.minute.to_numpy() >= 30)
+    tamaño = len(fechas) * FRANJAS_POR_DIA
+    if transacciones is None:
+        transacciones = pd.factorize(marcas)[0]
+    primeras = np.unique(np.asarray(transacciones), return_index=True)[1]
+    valores = np.stack([
+        np.bincount(celda, weights=np.asarray(cantidades, dtype='float64'), minlength=tamaño),
+        np.bincount(celda[primeras], minlength=tamaño).astype('float64'),
+    ]).reshape(len(METRICAS_FRANJAS), len(fechas), FRANJAS_POR_DIA)
+    return pd.DatetimeIndex(fechas, name='fecha'), valores
+
+
+class PronosticoFranjas:
+    """
+    Demanda esperada (unidades y transacciones) por día de la semana y
+    franja de media hora para las próximas semanas, pensada para armar los
+    turnos del personal.
+
+    Las últimas `semanas_historia` semanas se acomodan en un arreglo
+    métrica × día de la semana × semana × franja (NaN en las fechas sin
+    ventas). El valor esperado es el promedio de cada celda y las bandas
+    sus cuantiles; ambos se escalan semana a semana con la tendencia lineal
+    de los totales semanales. Todo se calcula sobre el arreglo completo, sin
+    recorrer celdas.
+    """
+
+    def __init__(self, fechas, valores, semanas_historia=12, cuantiles=(0.1, 0.9)):
+        """fechas, valores: salida de matriz_franjas"""
+        self.cuantiles = tuple(cuantiles)
+        self.hasta = fechas.max()
+        self.desde = self.hasta - pd.Timedelta(days=7 * semanas_historia - 1)
+        en_ventana = np.asarray(fechas >= self.desde)
+        dias = fechas[en_ventana]
+
+        historia = np.full((len(METRICAS_FRANJAS), 7, semanas_historia, FRANJAS_POR_DIA), np.nan)
+        historia[:, dias.dayofweek, (dias - self.desde).days // 7, :] = valores[:, en_ventana]
+        self.semanas_con_datos = int((~np.isnan(historia[0, :, :, 0])).any(axis=0).sum())
+        self.franjas_activas = np.flatnonzero(np.nan_to_num(historia).sum(axis=(0, 1, 2)) > 0)
+
+        # Días de la semana sin ninguna fecha en la ventana (local cerrado) quedan en cero
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            self.media = np.nan_to_num(np.nanmean(historia, axis=2))
+            self.bandas = np.nan_to_num(np.nanquantile(historia, self.cuantiles, axis=2))
+
+        # Tendencia: recta por mínimos cuadrados sobre los totales de las semanas con ventas
+        semanales = np.nansum(historia, axis=(1, 3))
+        con_datos = (~np.isnan(historia)).any(axis=(1, 3))
+        semana = np.where(con_datos, np.arange(semanas_historia), np.nan)
+        semana_media = np.nanmean(semana, axis=1, keepdims=True)
+        total_medio = np.nansum(np.where(con_datos, semanales, 0), axis=1, keepdims=True) / np.maximum(
+            con_datos.sum(axis=1, keepdims=True), 1)
+        desvio = np.nan_to_num(semana - semana_media)
+        varianza = (desvio ** 2).sum(axis=1, keepdims=True)
+        self.pendiente = np.divide((desvio * (semanales - total_medio) * con_datos).sum(axis=1, keepdims=True),
+                                   varianza, out=np.zeros_like(varianza), where=varianza > 0)
+        self._semana_media = semana_media
+        self._total_medio = total_medio
+        self._semanas_historia = semanas_historia
+
+    def factores(self, semanas):
+        """Escala de cada métrica (filas) para cada semana futura (columnas) según la tendencia"""
+        futuras = self._semanas_historia - 1 + np.arange(1, semanas + 1)
+        nivel = self._total_medio + self.pendiente * (futuras - self._semana_media)
+        return np.clip(np.divide(nivel, self._total_medio, out=np.ones_like(nivel),
+                                 where=self._total_medio > 0), 0, None)
+
+    def predecir(self, semanas):
+        """
+        Pronóstico de cada fecha × franja activa de las próximas `semanas`
+        semanas: esperado y bandas de unidades y transacciones.
+        """
+        fechas = self.hasta + pd.to_timedelta(np.arange(1, 7 * semanas + 1), unit='D')
+        semana = np.arange(7 * semanas) // 7
+        dia = fechas.dayofweek.to_numpy()
+        franjas = self.franjas_activas
+
+        # métrica × fecha × franja (y cuantil × ... para las bandas)
+        factor = self.factores(semanas)[:, semana, None]
+        esperado = self.media[:, dia][:, :, franjas] * factor
+        bandas = self.bandas[:, :, dia][:, :, :, franjas] * factor
+
+        tabla = {
+            'semana': np.repeat(semana + 1, len(franjas)),
+            'fecha': np.repeat(fechas, len(franjas)),
+            'dia_semana': np.repeat(dia, len(franjas)),
+            'media_hora': np.tile(franjas / 2, len(fechas)),
+        }
+        for m, metrica in enumerate(METRICAS_FRANJAS):
+            tabla[metrica] = esperado[m].ravel()
+            for q, cuantil in enumerate(self.cuantiles):
+                tabla[f'{metrica}_p{round(cuantil * 100)}'] = bandas[q, m].ravel()
+        return pd.DataFrame(tabla)
+
+
+def series_diarias(ventas, productos=None):
+    """
+    Unidades por día (filas, días calendario contiguos con ceros) y producto
+    (columnas), a partir de un frame con fecha, producto y cantidad.
+    """
+    diarias = (ventas.assign(producto=ventas['producto'].astype(object))
+               .groupby(['fecha', 'producto'])['cantidad'].sum()
+               .unstack(fill_value=0))
+    if productos is not None:
+        diarias = diarias.reindex(columns=list(productos), fill_value=0)
+    if diarias.empty:
+        return diarias
+    dias = pd.date_range(diarias.index.min(), diarias.index.max(), freq='D')
+    return diarias.reindex(dias, fill_value=0).rename_axis('fecha').astype('float64')
+
+
+def firma_serie(serie):
+    """
+    Huella de los días con ventas de una serie diaria: cambia si cambia
+    cualquiera de ellos, pero no por los días nuevos sin ventas.
+    """
+    contenido = pd.util.hash_pandas_object(serie[serie != 0], index=True).to_numpy().tobytes()
+    return hashlib.sha256(contenido).hexdigest()[:16]
+
+
+def entrenar_prophet(fechas, unidades, horizonte):
+    """
+    Ajusta un Prophet a una serie diaria y pronostica `horizonte` días.
+    Devuelve (modelo serializado en JSON, pronóstico con ds, yhat, yhat_lower, yhat_upper).
+    """
+    historia = pd.DataFrame({'ds': pd.DatetimeIndex(fechas), 'y': unidades})
+    modelo = Prophet(
+        weekly_seasonality=True,
+        # Con menos de dos años la estacionalidad anual queda mal identificada
+        yearly_seasonality=len(historia) >= 730,
+        daily_seasonality=False,
+    )
+    modelo.fit(historia)
+    futuro = modelo.make_future_dataframe(periods=horizonte, include_history=False)
+    pronostico = modelo.predict(futuro)[['ds', 'yhat', 'yhat_lower', 'yhat_upper']]
+    # Las ventas no pueden ser negativas
+    pronostico[['yhat', 'yhat_lower', 'yhat_upper']] = pronostico[['yhat', 'yhat_lower', 'yhat_upper']].clip(lower=0)
+    return model_to_json(modelo), pronostico
+
+
+def _entrenar(argumentos):
+    return entrenar_prophet(*argumentos)
+
+
+class ServicioPronosticos:
+    """
+    Modelos Prophet por serie (producto o grupo) persistidos en `carpeta`.
+
+    Un índice JSON guarda la firma de la historia con la que se entrenó cada
+    serie; actualizar() reentrena, en un pool de procesos, solo las series
+    cuya historia cambió o cuyo horizonte es otro, y cargar() solo lee los
+    pronósticos guardados.
+    """
+
+    def __init__(self, carpeta, horizonte=HORIZONTE):
+        self.carpeta = Path(carpeta)
+        self.horizonte = horizonte
+        self._ruta_indice = self.carpeta / 'indice.json'
+
+    def _leer_indice(self):
+        try:
+            return json.loads(self._ruta_indice.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return {}
+
+    def _archivo(self, nombre):
+        """Nombre de archivo estable para una serie"""
+        return hashlib.sha256(nombre.encode('utf-8')).hexdigest()[:16]
+
+    def pendientes(self, series):
+        """
+        Series (columnas de series_diarias) cuya historia cambió desde el
+        último entrenamiento. Las que no tienen ventas no se entrenan y no
+        cuentan como pendientes.
+        """
+        indice = self._leer_indice()
+        firmas = {nombre: firma_serie(series[nombre]) for nombre in series.columns if series[nombre].sum() > 0}
+        return [nombre for nombre, firma in firmas.items()
+                if indice.get(nombre, {}).get('firma') != firma
+                or indice.get(nombre, {}).get('horizonte') != self.horizonte]
+
+    def actualizar(self, series, procesos=None):
+        """Reentrena las series pendientes; devuelve sus nombres"""
+        if not PROPHET_DISPONIBLE:
+            raise ImportError("Prophet no está instalado (pip install prophet)")
+        pendientes = self.pendientes(series)
+        if not pendientes:
+            return []
+        argumentos = [(series.index, series[nombre].to_numpy(), self.horizonte) for nombre in pendientes]
+        if len(argumentos) > 1 and procesos != 1:
+            with ProcessPoolExecutor(max_workers=procesos) as pool:
+                resultados = list(pool.map(_entrenar, argumentos))
+        else:
+            resultados = [_entrenar(args) for args in argumentos]
+
+        (self.carpeta / 'modelos').mkdir(parents=True, exist_ok=True)
+        indice = self._leer_indice()
+        for nombre, (modelo, pronostico) in zip(pendientes, resultados):
+            archivo = self._archivo(nombre)
+            ruta_modelo = self.carpeta / 'modelos' / f'{archivo}.json'
+            ruta_pronostico = self.carpeta / f'{archivo}.parquet'
+            ruta_modelo.with_suffix('.tmp').write_text(modelo, encoding='utf-8')
+            os.replace(ruta_modelo.with_suffix('.tmp'), ruta_modelo)
+            pronostico.to_parquet(ruta_pronostico.with_suffix('.tmp'), index=False)
+            os.replace(ruta_pronostico.with_suffix('.tmp'), ruta_pronostico)
+            indice[nombre] = {'firma': firma_serie(series[nombre]), 'horizonte': self.horizonte,
+                              'archivo': archivo, 'hasta': str(series.index.max().date())}
+        temporal = self._ruta_indice.with_suffix('.tmp')
+        temporal.write_text(json.dumps(indice, ensure_ascii=False, indent=2), encoding='utf-8')
+        os.replace(temporal, self._ruta_indice)
+        return pendientes
+
+    def cargar(self, nombres=None):
+        """Pronósticos guardados {nombre: frame}; no entrena"""
+        indice = self._leer_indice()
+        nombres = indice.keys() if nombres is None else [n for n in nombres if n in indice]
+        pronosticos = {}
+        for nombre in nombres:
+            ruta = self.carpeta / f"{indice[nombre]['archivo']}.parquet"
+            if ruta.exists():
+                pronosticos[nombre] = pd.read_parquet(ruta)
+        return pronosticos
+
+
+def main(argv=None):
+    """
+    Entrenamiento batch de los modelos Prophet de las picadas, para correr
+    fuera del dashboard (cron o a mano): python -m src.pronosticos
+    """
+    import argparse
+
+    from src import data_processing, picadas
+
+    parser = argparse.ArgumentParser(description="Reentrena los pronósticos Prophet con historia nueva")
+    parser.add_argument("--origen", help="CSV de ventas (por defecto DATA_URL)")
+    parser.add_argument("--procesos", type=int, help="procesos del pool (por defecto, uno por CPU)")
+    argumentos = parser.parse_args(argv)
+
+    data_processing.cargar_datos(argumentos.origen)
+    cubo = data_processing.leer_cubo_ventas()
+    ventas = cubo[cubo['producto'].isin(picadas.PRODUCTOS_PICADAS)]
+    series = series_diarias(ventas, picadas.PRODUCTOS_PICADAS)
+    servicio = ServicioPronosticos(data_processing.CACHE_DIR / "pronosticos")
+    entrenados = servicio.actualizar(series, procesos=argumentos.procesos)
+    print(f"{len(entrenados)} modelos entrenados" + (f": {', '.join(entrenados)}" if entrenados else ""))
+
+
+if __name__ == "__main__":
+    main()
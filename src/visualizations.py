@@ -0,0 +1,135 @@
+"""Utilidades para los gráficos: reducción de series largas y caché de figuras de Plotly."""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Un punto cada 2 píxeles alcanza para que la línea no pierda forma
+PIXELES_POR_PUNTO = 2
+
+# Layout y plantilla de una figura (todo lo que no son datos de las trazas)
+BYTES_LAYOUT = 8 * 2**10
+
+
+def maximo_puntos(ancho_px=1000, pixeles_por_punto=PIXELES_POR_PUNTO):
+    """Puntos por traza según el ancho del gráfico"""
+    return max(int(ancho_px // pixeles_por_punto), 3)
+
+
+def lttb(x, y, puntos):
+    """
+    Largest-Triangle-Three-Buckets: índices de `puntos` puntos de la serie
+    que conservan su forma visual. Se quedan el primero y el último; del
+    resto se elige, en cada tramo, el punto que forma el triángulo de mayor
+    área con el elegido en el tramo anterior y el promedio del siguiente.
+    Si la serie ya tiene `puntos` o menos se devuelven todos los índices.
+    """
+    n = len(y)
+    if puntos >= n or puntos < 3:
+        return np.arange(n)
+    x = pd.Series(x).to_numpy()
+    x = x.astype('datetime64[ns]').astype(np.int64).astype('float64') if np.issubdtype(x.dtype, np.datetime64) \
+        else x.astype('float64')
+    y = np.asarray(y, dtype='float64')
+
+    # Tramos de los puntos interiores: [bordes[k], bordes[k + 1])
+    bordes = (np.arange(puntos - 1) * (n - 2) / (puntos - 2)).astype(np.int64) + 1
+    bordes[-1] = n - 1
+    indices = np.empty(puntos, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    a = 0
+    for k in range(puntos - 2):
+        inicio, fin = bordes[k], bordes[k + 1]
+        siguiente = slice(fin, bordes[k + 2]) if k + 2 < len(bordes) else slice(n - 1, n)
+        xc, yc = x[siguiente].mean(), y[siguiente].mean()
+        xb, yb = x[inicio:fin], y[inicio:fin]
+        area = np.abs((x[a] - xc) * (yb - y[a]) - (x[a] - xb) * (yc - y[a]))
+        a = inicio + int(np.argmax(area))
+        indices[k + 1] = a
+    return indices
+
+
+def reducir_serie(df, x, y, puntos):
+    """Filas de `df` que conserva lttb sobre las columnas x, y (todas si ya entran)"""
+    if len(df) <= puntos:
+        return df
+    return df.iloc[lttb(df[x], df[y], puntos)]
+
+
+def _bytes_estimados(valor):
+    """Bytes aproximados de un valor de traza: nbytes de los arreglos numéricos y largo de los textos"""
+    if isinstance(valor, np.ndarray) and valor.dtype != object:
+        return valor.nbytes
+    if isinstance(valor, dict):
+        return sum(_bytes_estimados(v) for v in valor.values())
+    if isinstance(valor, (list, tuple, np.ndarray)):
+        return sum(_bytes_estimados(v) for v in valor)
+    return len(valor) if isinstance(valor, str) else 8
+
+
+def bytes_figura(figura):
+    """Tamaño estimado de una figura sin serializarla: datos de las trazas más el layout"""
+    return BYTES_LAYOUT + sum(_bytes_estimados(traza.to_plotly_json()) for traza in figura.data)
+
+
+class CacheFiguras:
+    """
+    Figuras de Plotly ya armadas, por clave (gráfico, versión de datos,
+    período, parámetros), con desalojo LRU y un tope de memoria estimado
+    con bytes_figura. Se comparte entre sesiones, así que las figuras
+    guardadas no deben modificarse.
+
+    Ahorra las agregaciones y el armado de cada figura, no su serialización:
+    st.plotly_chart vuelve a llamar a to_json en cada rerun. Se guarda la
+    figura y no su JSON porque Streamlit igual reconstruye un go.Figure
+    (con validación) a partir de un dict antes de serializarlo.
+    """
+
+    def __init__(self, max_bytes=64 * 2**20):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self._figuras = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._figuras)
+
+    def obtener(self, clave):
+        """La figura de `clave` (y la marca como usada) o None"""
+        with self._lock:
+            entrada = self._figuras.get(clave)
+            if entrada is None:
+                self.fallos += 1
+                return None
+            self._figuras.move_to_end(clave)
+            self.aciertos += 1
+            return entrada[0]
+
+    def obtener_o_construir(self, clave, construir):
+        """
+        La figura de `clave`; si no está, la arma con construir() y la guarda.
+        construir debe incluir las agregaciones que alimentan la figura, para
+        que un acierto no las recalcule.
+        """
+        figura = self.obtener(clave)
+        if figura is None:
+            figura = self.guardar(clave, construir())
+        return figura
+
+    def guardar(self, clave, figura):
+        """Agrega la figura y desaloja las menos usadas hasta quedar bajo el tope"""
+        tamaño = bytes_figura(figura)
+        with self._lock:
+            if clave in self._figuras:
+                self.bytes -= self._figuras.pop(clave)[1]
+            if tamaño > self.max_bytes:
+                return figura
+            self._figuras[clave] = (figura, tamaño)
+            self.bytes += tamaño
+            while self.bytes > self.max_bytes:
+                _, (_, liberado) = self._figuras.popitem(last=False)
+                self.bytes -= liberado
+        return figura